@@ -1,11 +1,14 @@
 # case_intake_agent.py
 
-from crewai import Agent, LLM
+from crewai import Agent
+
+from agents.llm import GatewayLLM
 
 
 # agent specific LLM - can also be configured din .env file
-llm = LLM(
+llm = GatewayLLM(
     model="groq/llama-3.3-70b-versatile",
+    caller="case_intake",
     temperature=0
 )
 
@@ -1,8 +1,10 @@
-from crewai import Agent, LLM
-from tools.ipc_sections_search_tool import search_ipc_sections
+from crewai import Agent
+from agents.llm import GatewayLLM
+from tools.ipc_sections_search_tool import search_ipc_sections, search_ipc_sections_batch
 
-llm = LLM(
+llm = GatewayLLM(
     model="groq/llama-3.3-70b-versatile",
+    caller="ipc_section",
     temperature=0.3
 )
 
@@ -14,7 +16,7 @@ ipc_section_agent = Agent(
         "You specialize in mapping legal issues to applicable IPC sections with precision and clarity."
         "Your insights help lawyers and assistants quickly understand the statutory basis of a case."
     ),
-tools = [search_ipc_sections],
+tools = [search_ipc_sections, search_ipc_sections_batch],
 llm=llm,
 verbose=True,
 )
\ No newline at end of file
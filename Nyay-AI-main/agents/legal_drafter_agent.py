@@ -1,8 +1,11 @@
 # legal_drafter_agent.py
 
-from crewai import Agent, LLM
+from crewai import Agent
 
-llm = LLM(model="groq/llama-3.3-70b-versatile", temperature=0.4)
+from agents.llm import GatewayLLM
+
+# Streamed so the Legal Assistant page can show the draft as it is written
+llm = GatewayLLM(model="groq/llama-3.3-70b-versatile", caller="legal_drafter", temperature=0.4, stream=True)
 
 legal_drafter_agent = Agent(
     role="Legal Document Drafting Agent",
@@ -1,9 +1,11 @@
 # legal_precedent_agent.py
 
-from crewai import Agent, LLM
+from crewai import Agent
+
+from agents.llm import GatewayLLM
 from tools.legal_precedent_search_tool import search_legal_precedents
 
-llm = LLM(model="groq/llama-3.3-70b-versatile", temperature=0)
+llm = GatewayLLM(model="groq/llama-3.3-70b-versatile", caller="legal_precedent", temperature=0)
 
 legal_precedent_agent = Agent(
     role="Legal Precedent Agent",
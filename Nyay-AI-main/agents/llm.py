@@ -0,0 +1,120 @@
+# llm.py
+
+import os
+import threading
+
+from crewai import LLM
+from crewai.types.usage_metrics import UsageMetrics
+
+from cache.llm_response_cache import SAMPLING_PARAMS, get_llm_response_cache, llm_response_key, prompt_version
+from gateway.llm_gateway import estimate_tokens, get_llm_gateway
+
+# Gateway request of the LLM call running on the current thread; usage is
+# reported on the thread making the call, so concurrent calls stay separate
+_active = threading.local()
+# Cancellation flag of the crew branch running on the current thread
+_branch = threading.local()
+
+
+def set_branch_cancellation(cancelled: threading.Event | None):
+    """
+    Make LLM calls on the current thread refuse to start once `cancelled` is set.
+
+    A crew branch that timed out keeps running in its thread, so this stops
+    it from taking further gateway slots and budget for an answer nobody reads.
+
+    Args:
+        cancelled (threading.Event | None): Flag of the branch; None clears it.
+    """
+    _branch.cancelled = cancelled
+
+
+class GatewayLLM(LLM):
+    """
+    Groq LLM whose calls go through the process-wide LLM gateway.
+
+    Every agent uses this class, so all crews share the gateway's connection
+    pool, request and token budgets, 429 backoff and retries. `caller` names
+    the agent for its per-caller concurrency limit (LLM_CONCURRENCY_<CALLER>).
+
+    Text completions are served from the persistent LLM response cache when
+    `cache_responses` is True, or by default when the temperature is 0 and
+    the completion is therefore deterministic. Callers listed in
+    LLM_RESPONSE_CACHE_CALLERS (comma-separated) are cached whatever their
+    temperature. A cache hit sends no request and uses no budget.
+    """
+
+    caller: str = "crew"
+    cache_responses: bool | None = None
+
+    def _prepare_completion_params(self, *args, **kwargs) -> dict:
+        params = super()._prepare_completion_params(*args, **kwargs)
+        # Reuse the gateway's pooled connections instead of LiteLLM's own clients
+        params["client"] = get_llm_gateway().litellm_client()
+        return params
+
+    def caches_responses(self) -> bool:
+        """Whether this LLM's completions go through the response cache."""
+        if self.cache_responses is not None:
+            return self.cache_responses
+        opted_in = {name.strip() for name in os.getenv("LLM_RESPONSE_CACHE_CALLERS", "").split(",")}
+        return self.temperature == 0 or self.caller in opted_in
+
+    def call(
+        self,
+        messages,
+        tools: list[dict] | None = None,
+        callbacks: list | None = None,
+        available_functions: dict | None = None,
+        from_task=None,
+        from_agent=None,
+        response_model=None,
+    ):
+        kwargs = {
+            "tools": tools,
+            "callbacks": callbacks,
+            "available_functions": available_functions,
+            "from_task": from_task,
+            "from_agent": from_agent,
+            "response_model": response_model,
+        }
+        cancelled = getattr(_branch, "cancelled", None)
+        if cancelled is not None and cancelled.is_set():
+            raise RuntimeError(f"❌ The {self.caller} branch was cancelled after timing out.")
+
+        # CrewAI calls itself again to retry without unsupported parameters
+        if getattr(_active, "request", None) is not None:
+            return super().call(messages, **kwargs)
+
+        # Structured outputs are parsed objects, and with `available_functions` the LLM
+        # runs tools itself and returns their output, so neither is cacheable text
+        cacheable = response_model is None and not available_functions and self.caches_responses()
+        cache = get_llm_response_cache() if cacheable else None
+        key = None
+        if cache is not None:
+            params = {name: getattr(self, name, None) for name in SAMPLING_PARAMS}
+            key = llm_response_key(self.model, messages, tools, params, prompt_version(from_agent, from_task))
+            cached = cache.get(key, caller=self.caller)
+            if cached is not None:
+                return cached
+
+        completion_tokens = self.max_tokens or int(os.getenv("LLM_COMPLETION_TOKEN_ESTIMATE", "1000"))
+        estimated = estimate_tokens(messages, completion_tokens)
+        with get_llm_gateway().request(self.caller, estimated) as request:
+            _active.request = request
+            try:
+                response = request.send(super().call, messages, **kwargs)
+            finally:
+                _active.request = None
+
+        # Tool calls handed back for the executor to run are not final text
+        if key is not None and isinstance(response, str) and response.strip():
+            cache.put(key, response, tokens=request.used_tokens or estimated)
+        return response
+
+    def _track_token_usage_internal(self, usage_data) -> None:
+        super()._track_token_usage_internal(usage_data)
+        request = getattr(_active, "request", None)
+        metrics = UsageMetrics.from_provider_dict(usage_data) if request is not None else None
+        if metrics is not None:
+            request.record_usage(metrics.total_tokens)
@@ -1,37 +1,110 @@
 import streamlit as st
 from dotenv import load_dotenv
-from crew import legal_assistant_crew
-import requests
+from crew import stream_legal_assistant
+from cache.llm_response_cache import get_llm_response_cache
+from cache.location_cache import get_poi_cache
+from cache.precedent_search_cache import get_precedent_search_cache
+from retrieval.ipc_retriever import warm_ipc_retriever
+from scanner.extraction import PREVIEW_CHARS, iter_document_chunks, read_preview
+from scanner.report import get_pdf_report, render_text_report, report_key
+from scanner.risk_analyzer import analyze_document
+from legal_help.geocoding import geocode_location
+from legal_help.overpass import search_legal_help
 import folium
 from streamlit_folium import st_folium
-from geopy.geocoders import Nominatim
-from geopy.distance import geodesic
 import time
-import PyPDF2
-import docx
-import io
-from groq import Groq
 import os
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_LEFT, TA_CENTER
 from datetime import datetime
 
 load_dotenv()
 
 st.set_page_config(page_title="NYAY AI", page_icon="⚖️", layout="wide")
 
+
+@st.cache_resource(show_spinner="⏳ Loading IPC search index...")
+def load_ipc_retriever():
+    """Warm the shared IPC retriever once per server process."""
+    return warm_ipc_retriever()
+
+
+LEGAL_STEP_TITLES = {
+    "case_intake": "🧾 Case Summary",
+    "ipc_section": "📚 Applicable IPC Sections",
+    "legal_precedent": "🏛️ Relevant Precedents",
+    "legal_drafter": "📄 Final Output",
+}
+
+
+def final_answer_text(text):
+    """Strip the agent's reasoning preamble from a streamed answer, if present."""
+    marker = "Final Answer:"
+    return text.split(marker, 1)[1].strip() if marker in text else text
+
+
+def run_legal_assistant_live(user_input, rerun_from=None):
+    """Run the crew while rendering each step's output, and the draft token by token, as it arrives."""
+    status = st.status("🔎 Analyzing your case and preparing legal output...", expanded=True)
+    placeholders = {name: status.empty() for name in LEGAL_STEP_TITLES}
+    streamed = {}
+
+    for event in stream_legal_assistant(user_input, rerun_from=rerun_from):
+        if event["type"] == "token":
+            streamed[event["task"]] = streamed.get(event["task"], "") + event["text"]
+            if event["task"] in placeholders:
+                placeholders[event["task"]].markdown(
+                    f"**{LEGAL_STEP_TITLES[event['task']]}** ✍️\n\n{final_answer_text(streamed[event['task']])}"
+                )
+        elif event["type"] == "task_completed":
+            title = LEGAL_STEP_TITLES.get(event["task"], event["task"])
+            status.update(label=f"✅ {title} ready")
+            if event["task"] in placeholders:
+                placeholders[event["task"]].markdown(f"**{title}**\n\n{event['raw']}")
+        elif event["type"] == "result":
+            status.update(label="✅ Analysis complete", state="complete", expanded=False)
+            return event["result"]
+
 # Sidebar navigation
 page = st.sidebar.selectbox("Navigate", ["Legal Assistant", "Document Scanner", "Find Legal Help Nearby"])
 
+precedent_cache = get_precedent_search_cache()
+if precedent_cache is not None:
+    with st.sidebar.expander("📊 Precedent search cache"):
+        stats = precedent_cache.stats()
+        st.metric("Hit rate", f"{stats['hit_rate']:.0%}")
+        st.metric("Web searches saved", stats["upstream_calls_saved"])
+        st.caption(
+            f"{stats['hits']} fresh, {stats['stale_hits']} stale, {stats['misses']} missed, "
+            f"{stats['coalesced']} coalesced; {stats['upstream_calls']} web searches made"
+        )
+
+llm_response_cache = get_llm_response_cache()
+if llm_response_cache is not None:
+    with st.sidebar.expander("📊 LLM response cache"):
+        stats = llm_response_cache.stats()
+        st.metric("Hit rate", f"{stats['hit_rate']:.0%}")
+        st.metric("Tokens saved", f"{stats['tokens_saved']:,}")
+        st.caption(f"{stats['hits']} hits, {stats['misses']} misses; {stats['entries']} responses stored")
+
+poi_cache = get_poi_cache()
+if poi_cache is not None and page == "Find Legal Help Nearby":
+    with st.sidebar.expander("📊 Location cache"):
+        stats = poi_cache.stats()
+        st.metric("Hit rate", f"{stats['hit_rate']:.0%}")
+        st.metric("Cached tiles", stats["entries"])
+
 # ===========================
 # PAGE 1: Legal Assistant
 # ===========================
 if page == "Legal Assistant":
     st.title("⚖️ NYAY AI - Your Personal Legal Assistant")
+
+    # Only this page needs the IPC index, so a missing index must not break the others
+    try:
+        load_ipc_retriever()
+    except Exception as e:
+        st.error(f"❌ The IPC search index could not be loaded: {str(e)}")
+        st.stop()
+
     st.markdown(
         "Enter a legal problem in plain English. This assistant will help you:\n"
         "- Understand the legal issue\n"
@@ -48,13 +121,45 @@ if page == "Legal Assistant":
         if not user_input.strip():
             st.warning("Please enter a legal issue to analyze.")
         else:
-            with st.spinner("🔎 Analyzing your case and preparing legal output..."):
-                result = legal_assistant_crew.kickoff(inputs={"user_input": user_input})
+            result = run_legal_assistant_live(user_input)
+
+            # Keep the result across reruns so the draft can be regenerated
+            st.session_state.legal_result = {"user_input": user_input, **result}
+            st.rerun()
+
+    # Display results if they exist in session state
+    if st.session_state.get('legal_result'):
+        result = st.session_state.legal_result
+
+        st.success("✅ NYAY AI completed the workflow!")
+        if result["cached"]:
+            st.caption("⚡ Served instantly from cache - an identical case was analyzed recently.")
+        else:
+            if result.get("match") == "similar":
+                st.caption(
+                    f"♻️ Case analysis reused from a very similar ({result['similarity']:.0%}) case; "
+                    "the draft was written for your case."
+                )
+            timings = result["timings"]
+            st.caption(
+                f"⏱️ First result in {timings['first_output_seconds']:.1f}s, completed in {timings['total_seconds']:.1f}s "
+                f"({timings['mode']} mode, {len(timings['cached'])} step(s) reused from cache)"
+            )
+            for task_name, reason in timings["errors"].items():
+                st.warning(f"⚠️ {task_name.replace('_', ' ').title()} step failed ({reason}); the draft was prepared without it.")
+
+        for task in result["tasks"][:-1]:
+            with st.expander(LEGAL_STEP_TITLES.get(task["name"], task["name"])):
+                st.markdown(task["raw"])
 
-            st.success("✅ NYAY AI completed the workflow!")
+        st.subheader("📄 Final Output")
+        st.markdown(result["final_output"])
 
-            st.subheader("📄 Final Output")
-            st.markdown(result if isinstance(result, str) else str(result))
+        # Only the drafter reruns; intake, IPC and precedent outputs come from the task cache
+        if st.button("✍️ Regenerate Legal Draft"):
+            regenerated = run_legal_assistant_live(result["user_input"], rerun_from="legal_drafter")
+            st.session_state.legal_result = {"user_input": result["user_input"], **regenerated}
+            st.rerun()
 
 # ===========================
 # PAGE 2: Document Scanner
@@ -87,89 +192,99 @@ elif page == "Document Scanner":
     if uploaded_file is not None:
         # Extract text based on file type
         try:
-            file_text = ""
-            
-            if uploaded_file.type == "application/pdf":
-                pdf_reader = PyPDF2.PdfReader(io.BytesIO(uploaded_file.read()))
-                for page in pdf_reader.pages:
-                    file_text += page.extract_text() + "\n"
-            
-            elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                doc = docx.Document(io.BytesIO(uploaded_file.read()))
-                for para in doc.paragraphs:
-                    file_text += para.text + "\n"
-            
-            elif uploaded_file.type == "text/plain":
-                file_text = uploaded_file.read().decode('utf-8')
-            
-            if not file_text.strip():
+            # Only the first pages are read on upload, for the preview; the rest is extracted
+            # while the first analysis runs. Both are kept, as Streamlit reruns the script
+            # on every widget interaction
+            if st.session_state.get("scan_preview_file") != uploaded_file.file_id:
+                uploaded_file.seek(0)
+                preview_chunks, complete = read_preview(uploaded_file, uploaded_file.type)
+                st.session_state.scan_preview = "\n".join(preview_chunks)
+                st.session_state.scan_preview_complete = complete
+                st.session_state.scan_preview_file = uploaded_file.file_id
+                if complete:
+                    st.session_state.scanned_chunks = preview_chunks
+                    st.session_state.scanned_file_id = uploaded_file.file_id
+            extracted = st.session_state.get("scanned_file_id") == uploaded_file.file_id
+            preview = st.session_state.scan_preview
+
+            # A preview without text means the whole document was read and is empty
+            if not preview.strip():
                 st.error("❌ Could not extract text from the document. Please try another file.")
             else:
                 st.success(f"✅ Document uploaded: **{uploaded_file.name}**")
                 
                 # Show document preview
                 with st.expander("📖 Document Preview", expanded=False):
-                    st.text_area("Content", file_text[:2000] + ("..." if len(file_text) > 2000 else ""), height=200)
+                    more = not st.session_state.scan_preview_complete or len(preview) > PREVIEW_CHARS
+                    st.text_area("Content", preview[:PREVIEW_CHARS] + ("..." if more else ""), height=200)
                 
-                # Analyze button
-                if st.button("🔍 Analyze Document", type="primary", use_container_width=True):
+                # Analyze button; results stay on screen across reruns (e.g. preparing a download)
+                analyze_clicked = st.button("🔍 Analyze Document", type="primary", use_container_width=True)
+                if analyze_clicked or st.session_state.get("scan_report_file") == uploaded_file.file_id:
                     with st.spinner("🤖 AI is analyzing your document for legal risks..."):
                         try:
-                            # Initialize Groq client
-                            client = Groq(api_key=os.getenv("OPENAI_API_KEY"))
-                            
-                            # Create analysis prompt
-                            prompt = f"""You are a legal expert analyzing a document for potential legal risks. 
-
-Analyze the following document line by line and classify each significant line/clause into one of three risk categories:
-
-🟢 SAFE - No legal risks detected, standard language
-🟡 MODERATE - Needs review, ambiguous terms, or minor concerns
-🔴 HIGH RISK - Serious legal issues, unfavorable terms, or problematic clauses
-
-For each line you classify, provide:
-1. The line/clause text (keep it concise, max 100 chars)
-2. Risk level (SAFE, MODERATE, or HIGH)
-3. Brief explanation (1-2 sentences)
-
-Format your response as a JSON array like this:
-[
-  {{"line": "clause text", "risk": "SAFE", "explanation": "why"}},
-  {{"line": "clause text", "risk": "MODERATE", "explanation": "why"}},
-  {{"line": "clause text", "risk": "HIGH", "explanation": "why"}}
-]
-
-Only analyze substantive legal clauses. Skip headers, page numbers, and formatting elements.
-
-DOCUMENT TO ANALYZE:
-{file_text[:8000]}"""
-
-                            # Call Groq API
-                            completion = client.chat.completions.create(
-                                model="llama-3.3-70b-versatile",
-                                messages=[
-                                    {"role": "system", "content": "You are a legal expert who analyzes documents for legal risks. Always respond with valid JSON."},
-                                    {"role": "user", "content": prompt}
-                                ],
-                                temperature=0.3,
-                                max_tokens=8000,
-                            )
-                            
-                            response_text = completion.choices[0].message.content
-                            
-                            # Parse JSON response
-                            import json
-                            
-                            # Extract JSON from response (handle markdown code blocks)
-                            if "```json" in response_text:
-                                json_text = response_text.split("```json")[1].split("```")[0].strip()
-                            elif "```" in response_text:
-                                json_text = response_text.split("```")[1].split("```")[0].strip()
-                            else:
-                                json_text = response_text.strip()
-                            
-                            analysis_results = json.loads(json_text)
-                            
+                            if analyze_clicked:
+                                # The whole document is analyzed in overlapping clause chunks, several at a time
+                                progress = st.progress(0.0)
+                                # Verdicts stream in as the AI writes them, so show a running tally
+                                live_counts = st.empty()
+                                streamed = {"SAFE": 0, "MODERATE": 0, "HIGH": 0}
+
+                                def count_verdict(verdict):
+                                    risk = str(verdict.get("risk", "")).upper()
+                                    if risk in streamed:
+                                        streamed[risk] += 1
+                                        live_counts.caption(
+                                            f"🟢 {streamed['SAFE']} · 🟡 {streamed['MODERATE']} · 🔴 {streamed['HIGH']} "
+                                            f"clauses classified so far"
+                                        )
+
+                                # Pages go straight from extraction to analysis and are kept as they pass
+                                document_chunks = st.session_state.scanned_chunks if extracted else []
+
+                                def extract_chunks():
+                                    uploaded_file.seek(0)
+                                    for chunk in iter_document_chunks(uploaded_file, uploaded_file.type):
+                                        document_chunks.append(chunk)
+                                        yield chunk
+
+                                report = analyze_document(
+                                    document_chunks if extracted else extract_chunks(),
+                                    workers=int(os.getenv("SCANNER_WORKERS", "4")),
+                                    on_progress=lambda done, total: progress.progress(
+                                        done / total, text=f"Analyzed {done} of {total} sections"
+                                    ),
+                                    on_verdict=count_verdict,
+                                )
+                                progress.empty()
+                                live_counts.empty()
+                                st.session_state.scanned_chunks = document_chunks
+                                st.session_state.scanned_file_id = uploaded_file.file_id
+                                st.session_state.scan_report = report
+                                st.session_state.scan_report_file = uploaded_file.file_id
+                                st.session_state.scan_report_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                            report = st.session_state.scan_report
+                            analysis_results = report["results"]
+
+                            if report["failed_chunks"]:
+                                st.warning(
+                                    f"⚠️ {len(report['failed_chunks'])} of {report['chunks']} sections could not be analyzed "
+                                    f"({report['failed_chunks'][0]['error']}). Results below cover the rest of the document."
+                                )
+                            if report["unanalyzed_clauses"]:
+                                st.warning(
+                                    f"⚠️ {len(report['unanalyzed_clauses'])} clauses were cut off in the AI response "
+                                    f"and could not be analyzed."
+                                )
+                            if not analysis_results:
+                                raise ValueError("the AI returned no clause verdicts")
+                            reused = report["cached_clauses"] + report["duplicate_clauses"]
+                            if reused:
+                                st.caption(
+                                    f"♻️ {reused} of {report['clauses']} clauses matched previously analyzed "
+                                    f"or repeated text and were not re-sent to the AI."
+                                )
+
                             # Display results
                             st.success("✅ Analysis complete!")
                             
@@ -221,223 +336,39 @@ DOCUMENT TO ANALYZE:
                             # Download report
                             st.subheader("📥 Download Analysis Report")
                             
-                            # Generate PDF with color-coded highlights
-                            def create_pdf_report(analysis_results, filename, doc_name):
-                                """Generate a color-coded PDF report"""
-                                buffer = io.BytesIO()
-                                doc = SimpleDocTemplate(buffer, pagesize=letter,
-                                                      rightMargin=72, leftMargin=72,
-                                                      topMargin=72, bottomMargin=18)
-                                
-                                # Container for the 'Flowable' objects
-                                elements = []
-                                
-                                # Define styles
-                                styles = getSampleStyleSheet()
-                                title_style = ParagraphStyle(
-                                    'CustomTitle',
-                                    parent=styles['Heading1'],
-                                    fontSize=24,
-                                    textColor=colors.HexColor('#1a1a1a'),
-                                    spaceAfter=30,
-                                    alignment=TA_CENTER
-                                )
-                                
-                                heading_style = ParagraphStyle(
-                                    'CustomHeading',
-                                    parent=styles['Heading2'],
-                                    fontSize=16,
-                                    textColor=colors.HexColor('#2c3e50'),
-                                    spaceAfter=12,
-                                    spaceBefore=12
-                                )
-                                
-                                # Risk level styles with background colors
-                                safe_style = ParagraphStyle(
-                                    'Safe',
-                                    parent=styles['Normal'],
-                                    fontSize=10,
-                                    leading=14,
-                                    backColor=colors.HexColor('#d4edda'),
-                                    borderColor=colors.HexColor('#28a745'),
-                                    borderWidth=1,
-                                    borderPadding=8,
-                                    spaceAfter=10
-                                )
-                                
-                                moderate_style = ParagraphStyle(
-                                    'Moderate',
-                                    parent=styles['Normal'],
-                                    fontSize=10,
-                                    leading=14,
-                                    backColor=colors.HexColor('#fff3cd'),
-                                    borderColor=colors.HexColor('#ffc107'),
-                                    borderWidth=1,
-                                    borderPadding=8,
-                                    spaceAfter=10
-                                )
-                                
-                                high_style = ParagraphStyle(
-                                    'High',
-                                    parent=styles['Normal'],
-                                    fontSize=10,
-                                    leading=14,
-                                    backColor=colors.HexColor('#f8d7da'),
-                                    borderColor=colors.HexColor('#dc3545'),
-                                    borderWidth=1,
-                                    borderPadding=8,
-                                    spaceAfter=10
-                                )
-                                
-                                explanation_style = ParagraphStyle(
-                                    'Explanation',
-                                    parent=styles['Normal'],
-                                    fontSize=9,
-                                    textColor=colors.HexColor('#555555'),
-                                    leftIndent=20,
-                                    spaceAfter=15
-                                )
-                                
-                                # Title
-                                elements.append(Paragraph("⚖️ NYAY AI", title_style))
-                                elements.append(Paragraph("Legal Document Risk Analysis Report", styles['Heading2']))
-                                elements.append(Spacer(1, 0.3*inch))
-                                
-                                # Document info
-                                info_data = [
-                                    ['Document:', doc_name],
-                                    ['Analysis Date:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
-                                    ['Total Clauses:', str(len(analysis_results))]
-                                ]
-                                
-                                info_table = Table(info_data, colWidths=[2*inch, 4*inch])
-                                info_table.setStyle(TableStyle([
-                                    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f0f0f0')),
-                                    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                                    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                                    ('FONTSIZE', (0, 0), (-1, -1), 10),
-                                    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-                                    ('TOPPADDING', (0, 0), (-1, -1), 8),
-                                    ('GRID', (0, 0), (-1, -1), 1, colors.grey)
-                                ]))
-                                elements.append(info_table)
-                                elements.append(Spacer(1, 0.3*inch))
-                                
-                                # Summary statistics
-                                safe_count = sum(1 for r in analysis_results if r['risk'] == 'SAFE')
-                                moderate_count = sum(1 for r in analysis_results if r['risk'] == 'MODERATE')
-                                high_count = sum(1 for r in analysis_results if r['risk'] == 'HIGH')
-                                
-                                summary_data = [
-                                    ['Risk Level', 'Count', 'Percentage'],
-                                    ['🟢 Safe', str(safe_count), f"{safe_count/len(analysis_results)*100:.1f}%"],
-                                    ['🟡 Moderate Risk', str(moderate_count), f"{moderate_count/len(analysis_results)*100:.1f}%"],
-                                    ['🔴 High Risk', str(high_count), f"{high_count/len(analysis_results)*100:.1f}%"]
-                                ]
-                                
-                                summary_table = Table(summary_data, colWidths=[2.5*inch, 1.5*inch, 1.5*inch])
-                                summary_table.setStyle(TableStyle([
-                                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-                                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                                    ('FONTSIZE', (0, 0), (-1, 0), 12),
-                                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                                    ('BACKGROUND', (0, 1), (-1, 1), colors.HexColor('#d4edda')),
-                                    ('BACKGROUND', (0, 2), (-1, 2), colors.HexColor('#fff3cd')),
-                                    ('BACKGROUND', (0, 3), (-1, 3), colors.HexColor('#f8d7da')),
-                                    ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-                                    ('FONTSIZE', (0, 1), (-1, -1), 10),
-                                    ('TOPPADDING', (0, 1), (-1, -1), 8),
-                                    ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-                                ]))
-                                elements.append(summary_table)
-                                elements.append(Spacer(1, 0.4*inch))
-                                
-                                # Detailed findings
-                                elements.append(Paragraph("DETAILED FINDINGS", heading_style))
-                                elements.append(Spacer(1, 0.2*inch))
-                                
-                                # Group by risk level and display
-                                for risk_level, risk_name, style_to_use in [
-                                    ("HIGH", "🔴 HIGH RISK ITEMS", high_style),
-                                    ("MODERATE", "🟡 MODERATE RISK ITEMS", moderate_style),
-                                    ("SAFE", "🟢 SAFE ITEMS", safe_style)
-                                ]:
-                                    filtered = [r for r in analysis_results if r['risk'] == risk_level]
-                                    
-                                    if filtered:
-                                        elements.append(Paragraph(f"{risk_name} ({len(filtered)})", heading_style))
-                                        elements.append(Spacer(1, 0.1*inch))
-                                        
-                                        for idx, item in enumerate(filtered, 1):
-                                            # Clause text with background color
-                                            clause_text = f"<b>{idx}.</b> {item['line']}"
-                                            elements.append(Paragraph(clause_text, style_to_use))
-                                            
-                                            # Explanation
-                                            explanation_text = f"<i>💡 Analysis:</i> {item['explanation']}"
-                                            elements.append(Paragraph(explanation_text, explanation_style))
-                                        
-                                        elements.append(Spacer(1, 0.2*inch))
-                                
-                                # Build PDF
-                                doc.build(elements)
-                                buffer.seek(0)
-                                return buffer
-                            
-                            # Create PDF
-                            pdf_buffer = create_pdf_report(analysis_results, uploaded_file.name, uploaded_file.name)
-                            
+                            # The PDF is rendered only on request, and once per identical report
+                            analysis_date = st.session_state.scan_report_date
+                            report_name = f"legal_analysis_{uploaded_file.name.split('.')[0]}_{int(time.time())}"
                             col1, col2 = st.columns(2)
                             
                             with col1:
-                                st.download_button(
-                                    label="📄 Download Color-Coded PDF Report",
-                                    data=pdf_buffer,
-                                    file_name=f"legal_analysis_{uploaded_file.name.split('.')[0]}_{int(time.time())}.pdf",
-                                    mime="application/pdf",
-                                    use_container_width=True
-                                )
+                                pdf_key = report_key(analysis_results, uploaded_file.name, analysis_date)
+                                if st.session_state.get("pdf_report_key") != pdf_key:
+                                    if st.button("📄 Prepare Color-Coded PDF Report", use_container_width=True):
+                                        with st.spinner("🖨️ Rendering PDF report..."):
+                                            st.session_state.pdf_report = get_pdf_report(
+                                                analysis_results, uploaded_file.name, analysis_date
+                                            )
+                                        st.session_state.pdf_report_key = pdf_key
+                                if st.session_state.get("pdf_report_key") == pdf_key:
+                                    st.download_button(
+                                        label="📄 Download Color-Coded PDF Report",
+                                        data=st.session_state.pdf_report,
+                                        file_name=f"{report_name}.pdf",
+                                        mime="application/pdf",
+                                        use_container_width=True
+                                    )
                             
                             with col2:
                                 # Also provide text version
-                                report_text = f"""NYAY AI - Legal Document Risk Analysis Report
-Document: {uploaded_file.name}
-Analysis Date: {time.strftime('%Y-%m-%d %H:%M:%S')}
-
-SUMMARY
-========
-Total Clauses Analyzed: {len(analysis_results)}
-Safe: {safe_count}
-Moderate Risk: {moderate_count}
-High Risk: {high_count}
-
-DETAILED FINDINGS
-=================
-
-"""
-                                for risk_level in ["HIGH", "MODERATE", "SAFE"]:
-                                    filtered = [r for r in analysis_results if r['risk'] == risk_level]
-                                    if filtered:
-                                        report_text += f"\n{risk_level} RISK ITEMS ({len(filtered)})\n{'-' * 50}\n\n"
-                                        for idx, item in enumerate(filtered, 1):
-                                            report_text += f"{idx}. {item['line']}\n"
-                                            report_text += f"   Analysis: {item['explanation']}\n\n"
-                                
                                 st.download_button(
                                     label="📝 Download Text Report",
-                                    data=report_text,
-                                    file_name=f"legal_analysis_{uploaded_file.name.split('.')[0]}_{int(time.time())}.txt",
+                                    data=render_text_report(analysis_results, uploaded_file.name, analysis_date),
+                                    file_name=f"{report_name}.txt",
                                     mime="text/plain",
                                     use_container_width=True
                                 )
                             
-                        except json.JSONDecodeError as e:
-                            st.error("❌ Error parsing AI response. Please try again.")
-                            with st.expander("Debug: View AI Response"):
-                                st.code(response_text)
                         except Exception as e:
                             st.error(f"❌ Analysis error: {str(e)}")
                             st.info("💡 Make sure your OPENAI_API_KEY (Groq) is set correctly in your .env file")
@@ -477,156 +408,25 @@ elif page == "Find Legal Help Nearby":
             
             with st.spinner("🔎 Locating and searching for nearby legal services..."):
                 try:
-                    # Initialize geocoder
-                    geolocator = Nominatim(user_agent="nyay_ai_legal_v3", timeout=10)
-                    
-                    # Geocode the location
-                    location = geolocator.geocode(location_input, country_codes='in')
+                    # Geocode the location (cached per normalized location text)
+                    location = geocode_location(location_input)
                     
                     if not location:
                         st.error("❌ Could not find the location. Please try with:\n- Full address\n- City name\n- Pincode")
                     else:
-                        user_lat, user_lon = location.latitude, location.longitude
-                        st.success(f"✅ Location found: **{location.address}**")
-                        
-                        # Function to query Overpass API with better error handling
-                        def query_overpass(lat, lon, radius_km, tags, max_retries=2):
-                            """Query OpenStreetMap Overpass API with retry logic"""
-                            overpass_url = "https://overpass-api.de/api/interpreter"
-                            radius_m = radius_km * 1000
-                            
-                            # Simplified query for faster response
-                            tag_queries = []
-                            for tag in tags:
-                                tag_queries.append(f'node[{tag}](around:{radius_m},{lat},{lon});')
-                                tag_queries.append(f'way[{tag}](around:{radius_m},{lat},{lon});')
-                            
-                            query = f"""
-                            [out:json][timeout:15];
-                            (
-                              {' '.join(tag_queries)}
-                            );
-                            out body center 100;
-                            """
-                            
-                            for attempt in range(max_retries):
-                                try:
-                                    response = requests.post(
-                                        overpass_url, 
-                                        data={'data': query}, 
-                                        timeout=20
-                                    )
-                                    if response.status_code == 200:
-                                        return response.json()
-                                    elif response.status_code == 429:
-                                        time.sleep(2)  # Rate limited, wait and retry
-                                        continue
-                                    else:
-                                        return {'elements': []}
-                                except requests.exceptions.Timeout:
-                                    if attempt < max_retries - 1:
-                                        time.sleep(1)
-                                        continue
-                                    return {'elements': []}
-                                except Exception:
-                                    return {'elements': []}
-                            
-                            return {'elements': []}
-                        
-                        # Define search categories
-                        search_categories = {
-                            "👨‍⚖️ Lawyers": {
-                                "tags": ['office=lawyer'],
-                                "icon": ("blue", "briefcase"),
-                            },
-                            "🤝 Legal Aid": {
-                                "tags": ['office=ngo', 'amenity=social_facility'],
-                                "icon": ("green", "hands-helping"),
-                            },
-                            "🚔 Police": {
-                                "tags": ['amenity=police'],
-                                "icon": ("darkblue", "shield-alt"),
-                            },
-                            "🏛️ Courts": {
-                                "tags": ['amenity=courthouse'],
-                                "icon": ("purple", "landmark"),
-                            }
-                        }
-                        
-                        # Store all results
-                        all_results = {}
-                        total_found = 0
-                        
-                        # Search each category with progress updates
-                        progress_bar = st.progress(0)
-                        status_text = st.empty()
-                        
-                        for idx, (category_name, category_info) in enumerate(search_categories.items()):
-                            status_text.text(f"Searching for {category_name}...")
-                            
-                            # Query API
-                            data = query_overpass(user_lat, user_lon, search_radius, category_info['tags'])
-                            places = []
-                            
-                            for element in data.get('elements', []):
-                                try:
-                                    # Get coordinates
-                                    if 'lat' in element and 'lon' in element:
-                                        place_lat, place_lon = element['lat'], element['lon']
-                                    elif 'center' in element:
-                                        place_lat, place_lon = element['center']['lat'], element['center']['lon']
-                                    else:
-                                        continue
-                                    
-                                    # Get place details
-                                    tags = element.get('tags', {})
-                                    name = tags.get('name', tags.get('operator', 'Unnamed'))
-                                    
-                                    # Build address
-                                    address_parts = []
-                                    for key in ['addr:street', 'addr:city', 'addr:state']:
-                                        if key in tags and tags[key]:
-                                            address_parts.append(tags[key])
-                                    address = ', '.join(address_parts) if address_parts else 'Not available'
-                                    
-                                    phone = tags.get('phone', tags.get('contact:phone', 'Not available'))
-                                    website = tags.get('website', tags.get('contact:website', ''))
-                                    
-                                    # Calculate distance
-                                    distance = geodesic((user_lat, user_lon), (place_lat, place_lon)).km
-                                    
-                                    if distance <= search_radius:
-                                        places.append({
-                                            'name': name,
-                                            'address': address,
-                                            'phone': phone,
-                                            'website': website,
-                                            'distance': round(distance, 2),
-                                            'lat': place_lat,
-                                            'lon': place_lon,
-                                            'icon': category_info['icon']
-                                        })
-                                except:
-                                    continue
-                            
-                            # Sort by distance
-                            places.sort(key=lambda x: x['distance'])
-                            all_results[category_name] = places
-                            total_found += len(places)
-                            
-                            # Update progress
-                            progress_bar.progress((idx + 1) / len(search_categories))
-                            time.sleep(0.5)  # Prevent rate limiting
+                        user_lat, user_lon = location['lat'], location['lon']
+                        st.success(f"✅ Location found: **{location['address']}**")
                         
-                        progress_bar.empty()
-                        status_text.empty()
+                        # All categories come back from a single Overpass request
+                        all_results = search_legal_help(user_lat, user_lon, search_radius)
+                        total_found = sum(len(places) for places in all_results.values())
                         
                         # Store results in session state
                         st.session_state.search_results = {
                             'user_lat': user_lat,
                             'user_lon': user_lon,
                             'radius': search_radius,
-                            'location_name': location.address,
+                            'location_name': location['address'],
                             'all_results': all_results,
                             'total_found': total_found
                         }
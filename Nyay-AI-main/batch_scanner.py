@@ -0,0 +1,72 @@
+# batch_scanner.py
+#
+# Command-line bulk scan of a folder of contracts with the Document
+# Scanner's extraction and risk analysis. Results are appended to
+# <output>/results.jsonl, which is also the checkpoint: rerunning the same
+# command skips documents already scanned. Text and PDF reports go to
+# <output>/reports/.
+#
+# Example:
+#   python batch_scanner.py contracts/ --output scans/2026-10 --documents 4 --chunk-workers 4
+
+import argparse
+import os
+from collections.abc import Iterable
+
+from dotenv import load_dotenv
+
+from scanner.batch import scan_directory
+
+
+def main(argv: Iterable[str] | None = None):
+    """Command-line entry point."""
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Scan a folder of PDF/DOCX/TXT documents for legal risks.")
+    parser.add_argument("folder", help="Folder of documents, scanned recursively")
+    parser.add_argument("--output", required=True, help="Folder for results.jsonl, summary.json and reports/")
+    parser.add_argument("--documents", type=int, default=4, help="Documents processed concurrently")
+    parser.add_argument("--chunk-workers", type=int, default=int(os.getenv("SCANNER_WORKERS", "4")),
+                        help="Concurrent LLM requests per document")
+    parser.add_argument("--pdf-workers", type=int, default=1, help="PDF report rendering processes")
+    parser.add_argument("--no-pdf", action="store_true", help="Write text reports only")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the clause verdict cache")
+    parser.add_argument("--limit", type=int, default=None, help="Scan at most this many new documents")
+    args = parser.parse_args(argv)
+
+    if not os.getenv("OPENAI_API_KEY"):
+        raise EnvironmentError("❌ Set OPENAI_API_KEY (Groq) in your environment or .env file.")
+
+    def report_progress(record: dict, totals: dict):
+        done = totals["documents"] + totals["failed"]
+        if record["status"] == "ok":
+            print(
+                f"⏳ [{done}] {record['path']}: {record['clauses']} clauses, {record['tokens']} tokens, "
+                f"{record['seconds']:.1f}s", flush=True,
+            )
+        else:
+            print(f"❌ [{done}] {record['path']}: {record['error']}", flush=True)
+
+    totals = scan_directory(
+        args.folder,
+        args.output,
+        document_workers=args.documents,
+        chunk_workers=args.chunk_workers,
+        pdf_workers=args.pdf_workers,
+        write_pdf=not args.no_pdf,
+        use_cache=not args.no_cache,
+        limit=args.limit,
+        on_document=report_progress,
+    )
+    print(
+        f"✅ Scanned {totals['documents']} documents ({totals['failed']} failed, {totals['skipped']} already done) "
+        f"in {totals['seconds']:.1f}s: {totals['documents_per_minute']:.1f} documents/min, "
+        f"{totals['clauses']} clauses, {totals['tokens']:,} tokens "
+        f"({totals['cached_clauses']} clauses answered from cache)"
+    )
+    if totals["pdf_failures"]:
+        print(f"⚠️ {totals['pdf_failures']} PDF reports could not be rendered; text reports were written.")
+
+
+if __name__ == "__main__":
+    main()
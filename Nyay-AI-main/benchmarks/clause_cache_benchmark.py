@@ -0,0 +1,95 @@
+# clause_cache_benchmark.py
+#
+# Scan a stream of synthetic contracts that share most of their boilerplate
+# (indemnity, arbitration, governing law, ...) against the local stub LLM
+# server, with and without the clause verdict cache, and compare tokens and
+# latency.
+#
+# Run from the project root:
+#   python -m benchmarks.clause_cache_benchmark --contracts 20 --boilerplate 0.7
+
+import argparse
+import os
+import random
+import tempfile
+
+from groq import Groq
+
+from benchmarks.stub_llm_server import StubLLMServer
+
+
+WORDS = (
+    "the supplier shall deliver goods services within the agreed period failing which the buyer may "
+    "terminate this agreement and recover liquidated damages subject to force majeure and notice"
+).split()
+
+
+def synthetic_contracts(count: int, clauses: int, boilerplate: float, seed: int = 5) -> list[str]:
+    """
+    Generate contracts whose clauses are drawn from a shared boilerplate pool with probability `boilerplate`.
+
+    Args:
+        count (int): Number of contracts.
+        clauses (int): Clauses per contract.
+        boilerplate (float): Share of clauses taken from the shared pool.
+        seed (int): Random seed so runs are comparable.
+
+    Returns:
+        list[str]: Contract texts with numbered clauses.
+    """
+    rng = random.Random(seed)
+    pool = [" ".join(rng.choices(WORDS, k=rng.randint(40, 80))).capitalize() + "." for _ in range(60)]
+    contracts = []
+    for _ in range(count):
+        body = []
+        for number in range(1, clauses + 1):
+            if rng.random() < boilerplate:
+                clause = rng.choice(pool)
+            else:
+                clause = " ".join(rng.choices(WORDS, k=rng.randint(40, 80))).capitalize() + "."
+            body.append(f"{number}. {clause}")
+        contracts.append("\n\n".join(body))
+    return contracts
+
+
+def run_benchmark(contracts: int, clauses: int, boilerplate: float):
+    """
+    Scan the contracts twice, without and with the clause cache, and print totals.
+
+    Args:
+        contracts (int): Number of contracts to scan.
+        clauses (int): Clauses per contract.
+        boilerplate (float): Share of boilerplate clauses.
+    """
+    texts = synthetic_contracts(contracts, clauses, boilerplate)
+    server = StubLLMServer(max_concurrency=16).start()
+    client = Groq(api_key="stub", base_url=server.base_url, max_retries=0)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # The analyzer resolves its cache location on first use
+        os.environ["NYAY_CACHE_DIR"] = cache_dir
+        from scanner.risk_analyzer import analyze_document
+
+        print(f"{contracts} contracts x {clauses} clauses, {boilerplate:.0%} boilerplate")
+        print(f"{'mode':>10} {'requests':>9} {'tokens':>9} {'seconds':>8} {'sent clauses':>13}")
+        for use_cache in (False, True):
+            requests_before = server.requests
+            tokens = seconds = sent = 0
+            for text in texts:
+                report = analyze_document(text, client=client, workers=8, use_cache=use_cache)
+                tokens += report["tokens"]
+                seconds += report["seconds"]
+                sent += report["clauses"] - report["cached_clauses"] - report["duplicate_clauses"]
+            label = "cache" if use_cache else "no cache"
+            print(f"{label:>10} {server.requests - requests_before:>9} {tokens:>9} {seconds:>8.1f} {sent:>13}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--contracts", type=int, default=20)
+    parser.add_argument("--clauses", type=int, default=60)
+    parser.add_argument("--boilerplate", type=float, default=0.7)
+    args = parser.parse_args()
+
+    run_benchmark(args.contracts, args.clauses, args.boilerplate)
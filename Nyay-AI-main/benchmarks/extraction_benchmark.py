@@ -0,0 +1,108 @@
+# extraction_benchmark.py
+#
+# Compare PDF text extraction of the original page-by-page `+=` loop with
+# the streaming, page-parallel extractor on a large synthetic filing.
+#
+# Run from the project root:
+#   python -m benchmarks.extraction_benchmark --pages 500 --workers 1 4 8
+
+import argparse
+import io
+import os
+import random
+import tempfile
+import time
+
+import PyPDF2
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from scanner.extraction import iter_pdf_pages
+
+
+WORDS = (
+    "the petitioner submits that the impugned order is arbitrary and violative of article fourteen "
+    "the respondent shall file a counter affidavit within four weeks hearing adjourned court directs"
+).split()
+
+
+def write_synthetic_pdf(file_path: str, pages: int, lines_per_page: int = 48, seed: int = 3):
+    """
+    Write a text-layer PDF of `pages` pages of random filing text.
+
+    Args:
+        file_path (str): Destination PDF.
+        pages (int): Page count.
+        lines_per_page (int): Text lines per page.
+        seed (int): Random seed so runs are comparable.
+    """
+    rng = random.Random(seed)
+    pdf = canvas.Canvas(file_path, pagesize=A4)
+    for page in range(pages):
+        y = 800
+        for _ in range(lines_per_page):
+            pdf.drawString(40, y, " ".join(rng.choices(WORDS, k=12)))
+            y -= 16
+        pdf.drawString(280, 20, str(page + 1))
+        pdf.showPage()
+    pdf.save()
+
+
+def baseline_extract(file_path: str) -> str:
+    """The scanner's original extraction: read into BytesIO, concatenate page by page."""
+    with open(file_path, "rb") as file:
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file.read()))
+    file_text = ""
+    for page in pdf_reader.pages:
+        file_text += page.extract_text() + "\n"
+    return file_text
+
+
+def run_benchmark(pages: int, worker_counts: list[int]):
+    """
+    Extract the synthetic PDF with the baseline and with each worker count.
+
+    Args:
+        pages (int): Size of the synthetic PDF.
+        worker_counts (list[int]): Extraction processes to compare.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, "filing.pdf")
+        write_synthetic_pdf(pdf_path, pages)
+        print(f"{pages} pages, {os.path.getsize(pdf_path) / 1e6:.1f} MB")
+
+        start = time.perf_counter()
+        expected = baseline_extract(pdf_path)
+        baseline = time.perf_counter() - start
+        print(f"{'method':>18} {'seconds':>8} {'pages/s':>8} {'first page s':>13} {'speedup':>8}")
+        print(f"{'baseline +=':>18} {baseline:>8.2f} {pages / baseline:>8.1f} {'-':>13} {'1.0x':>8}")
+
+        for workers in worker_counts:
+            # Warm the process pool so its start-up cost is not counted per upload
+            list(iter_pdf_pages(pdf_path, workers=workers))
+
+            start = time.perf_counter()
+            first_page = None
+            chunks = []
+            with open(pdf_path, "rb") as upload:
+                for chunk in iter_pdf_pages(upload, workers=workers):
+                    if first_page is None:
+                        first_page = time.perf_counter() - start
+                    chunks.append(chunk)
+            text = "\n".join(chunks) + "\n"
+            seconds = time.perf_counter() - start
+
+            assert text == expected, "extracted text differs from the baseline"
+            print(
+                f"{f'streaming x{workers}':>18} {seconds:>8.2f} {pages / seconds:>8.1f} "
+                f"{first_page:>13.2f} {baseline / seconds:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, max(1, (os.cpu_count() or 2) - 1)])
+    args = parser.parse_args()
+
+    run_benchmark(args.pages, args.workers)
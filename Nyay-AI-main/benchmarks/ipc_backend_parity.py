@@ -0,0 +1,105 @@
+# ipc_backend_parity.py
+#
+# Check that the NumPy backend returns the same top-k IPC sections as the
+# Chroma collection, and report the NumPy search time (excluding embedding).
+# Build both indexes first with `python ipc_vectordb_builder.py`. Also checks
+# which explicit section references are read as IPC sections (no index needed).
+#
+# Run from the project root:  python -m benchmarks.ipc_backend_parity
+
+import statistics
+import sys
+import time
+
+from retrieval.ipc_retriever import create_ipc_retriever, find_section_references
+
+
+QUERIES = [
+    "Someone broke into my house at night and stole my jewellery",
+    "My husband's family is demanding dowry and harassing me",
+    "A shopkeeper cheated me by selling fake goods",
+    "My neighbour threatened to kill me",
+    "Road accident caused by a rash and negligent driver",
+    "A public servant asked me for a bribe",
+    "Someone forged my signature on a property document",
+    "I was wrongfully confined in a room by my employer",
+]
+
+# Queries naming sections, and the IPC sections the exact-match fast path must resolve
+SECTION_REFERENCE_CASES = [
+    ("section 379", ["379"]),
+    ("sections 379, 380 and 411", ["379", "380", "411"]),
+    ("booked u/s 498A", ["498A"]),
+    ("IPC 302", ["302"]),
+    ("charged under 420 IPC", ["420"]),
+    ("section 354 of the Indian Penal Code", ["354"]),
+    ("Act of theft under section 379", ["379"]),
+    ("The Act of cheating falls under section 420", ["420"]),
+    ("Is this a criminal act under section 506?", ["506"]),
+    ("section 138 of the Negotiable Instruments Act", []),
+    ("cheque bounce under section 138 NI Act", []),
+    ("section 125 CrPC", []),
+    ("section 13 of the Hindu Marriage Act", []),
+    ("Section 125 of the Code of Criminal Procedure", []),
+    ("section 138 N.I. Act and section 420 IPC", ["420"]),
+    ("sections 406 and 420 of IPC, also section 138 of the Negotiable Instruments Act", ["406", "420"]),
+]
+
+
+def check_section_references() -> bool:
+    """
+    Compare `find_section_references()` with SECTION_REFERENCE_CASES.
+
+    Returns:
+        bool: True when every case resolves to exactly the expected sections.
+    """
+    all_match = True
+    for query, expected in SECTION_REFERENCE_CASES:
+        actual = find_section_references(query)
+        if actual != expected:
+            all_match = False
+            print(f"❌ Section references for '{query}': expected={expected} actual={actual}")
+    if all_match:
+        print(f"✅ Section references resolved correctly in all {len(SECTION_REFERENCE_CASES)} cases")
+    return all_match
+
+
+def check_parity(top_k: int = 3) -> bool:
+    """
+    Compare section lists from both backends for every query.
+
+    Args:
+        top_k (int): Number of sections compared per query.
+
+    Returns:
+        bool: True when every query returns identical sections in identical order.
+    """
+    chroma = create_ipc_retriever("chroma")
+    numpy_retriever = create_ipc_retriever("numpy")
+
+    all_match = True
+    search_times = []
+    for query in QUERIES:
+        vector = numpy_retriever.embeddings.embed_query(query)
+
+        start = time.perf_counter()
+        numpy_docs = numpy_retriever.backend.similarity_search_by_vector(vector, k=top_k)
+        search_times.append((time.perf_counter() - start) * 1000)
+
+        chroma_docs = chroma.backend.similarity_search_by_vector(vector, k=top_k)
+
+        expected = [doc.metadata["section"] for doc in chroma_docs]
+        actual = [doc.metadata["section"] for doc in numpy_docs]
+        if expected != actual:
+            all_match = False
+            print(f"❌ Mismatch for '{query}': chroma={expected} numpy={actual}")
+
+    print(f"NumPy search: median={statistics.median(search_times):.3f} ms  max={max(search_times):.3f} ms")
+    if all_match:
+        print(f"✅ Both backends agree on all {len(QUERIES)} queries")
+    return all_match
+
+
+if __name__ == "__main__":
+    references_ok = check_section_references()
+    sys.exit(0 if check_parity() and references_ok else 1)
@@ -0,0 +1,55 @@
+# ipc_batch_search_benchmark.py
+#
+# Compare IPC lookup throughput of one-query-at-a-time search against the
+# batched `search_many` entry point for growing query counts.
+#
+# Run from the project root:  python -m benchmarks.ipc_batch_search_benchmark
+
+import time
+
+from retrieval.ipc_retriever import warm_ipc_retriever
+
+
+OFFENCES = [
+    "theft", "house trespass", "criminal intimidation", "cheating", "forgery",
+    "dowry death", "cruelty by husband", "kidnapping", "defamation", "bribery",
+    "rash driving", "criminal breach of trust", "extortion", "rioting",
+    "sexual harassment", "wrongful confinement",
+]
+
+
+def _queries(count: int) -> list[str]:
+    """Return `count` offence queries, cycling through the list when needed."""
+    return [f"{OFFENCES[i % len(OFFENCES)]} case {i}" for i in range(count)]
+
+
+def run_benchmark(counts: tuple[int, ...] = (1, 2, 4, 8, 16, 32), repeats: int = 3):
+    """
+    Print queries/second for sequential and batched search at each query count.
+
+    Args:
+        counts (tuple[int, ...]): Query counts to measure.
+        repeats (int): Runs per measurement; the fastest is kept.
+    """
+    retriever = warm_ipc_retriever()
+
+    print(f"{'queries':>8} {'sequential q/s':>16} {'batched q/s':>14} {'speedup':>8}")
+    for count in counts:
+        queries = _queries(count)
+
+        sequential = batched = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for query in queries:
+                retriever.search(query)
+            sequential = min(sequential, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            retriever.search_many(queries)
+            batched = min(batched, time.perf_counter() - start)
+
+        print(f"{count:>8} {count / sequential:>16.1f} {count / batched:>14.1f} {sequential / batched:>7.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
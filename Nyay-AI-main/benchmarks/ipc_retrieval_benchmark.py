@@ -0,0 +1,56 @@
+# ipc_retrieval_benchmark.py
+#
+# Compare per-query latency of a cold IPC lookup (model and vectorstore loaded
+# for every query, as the search tool used to do) against the shared warm
+# retriever.
+#
+# Run from the project root:  python -m benchmarks.ipc_retrieval_benchmark
+
+import statistics
+import time
+
+from retrieval.ipc_retriever import create_ipc_retriever, warm_ipc_retriever
+
+
+QUERIES = [
+    "Someone broke into my house at night and stole my jewellery",
+    "My husband's family is demanding dowry and harassing me",
+    "A shopkeeper cheated me by selling fake goods",
+    "My neighbour threatened to kill me",
+    "Road accident caused by a rash and negligent driver",
+]
+
+
+def _time_queries(search, queries: list[str]) -> list[float]:
+    """Run each query once and return the latencies in milliseconds."""
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def run_benchmark(rounds: int = 3):
+    """
+    Print median and worst-case latency for cold and warm retrieval.
+
+    Args:
+        rounds (int): How many times the query set is repeated for the warm path.
+    """
+    cold = _time_queries(lambda q: create_ipc_retriever().search(q), QUERIES)
+
+    retriever = warm_ipc_retriever()
+    warm = _time_queries(retriever.search, QUERIES * rounds)
+
+    for label, latencies in [("cold", cold), ("warm", warm)]:
+        print(
+            f"{label:>5}: n={len(latencies):<3} "
+            f"median={statistics.median(latencies):8.1f} ms  "
+            f"max={max(latencies):8.1f} ms"
+        )
+    print(f"✅ Warm retrieval is {statistics.median(cold) / statistics.median(warm):.0f}x faster per query")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,123 @@
+# mock_overpass_server.py
+#
+# Local stand-in for the Overpass API, for parity tests and benchmarks. It
+# serves a fixed set of Overpass-style elements and understands the union
+# queries built by `legal_help.overpass.build_union_query()`: per named set,
+# node/way tag selectors with an `around` filter, output with a limit.
+#
+# Point the app at it with OVERPASS_URL=http://127.0.0.1:<port>/api/interpreter,
+# or run it standalone on an Overpass JSON extract:
+#   python -m benchmarks.mock_overpass_server data/odisha.json --port 8766
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import numpy as np
+
+from cache.location_cache import element_position
+from legal_help.places import element_has_tag, haversine_km
+
+
+SET_STATEMENT = re.compile(r"\(([^()]*(?:\([^()]*\)[^()]*)*)\)->\.(\w+);")
+SELECTOR = re.compile(r"(node|way)\[([^\]=]+=[^\]]+)\]\(around:([\d.]+),([-\d.]+),([-\d.]+)\);")
+OUTPUT = re.compile(r"\.(\w+) out [\w ]*?(\d+);")
+
+
+class MockOverpassServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering POST .../api/interpreter from in-memory elements.
+
+    Args:
+        elements (list[dict]): Overpass-style nodes (`lat`/`lon`) and ways (`center`).
+        port (int): Port to listen on; 0 picks a free one.
+        latency (float): Seconds added to every response, mimicking the public instance.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, elements: list[dict], port: int = 0, latency: float = 0.0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.elements = [element for element in elements if element_position(element) is not None]
+        positions = np.array([element_position(element) for element in self.elements], dtype=np.float64).reshape(-1, 2)
+        self.lats, self.lons = positions[:, 0], positions[:, 1]
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    @property
+    def base_url(self) -> str:
+        """URL to set as OVERPASS_URL."""
+        return f"http://127.0.0.1:{self.server_address[1]}/api/interpreter"
+
+    def start(self) -> "MockOverpassServer":
+        """Serve on a daemon thread and return self."""
+        threading.Thread(target=self.serve_forever, name="mock-overpass", daemon=True).start()
+        return self
+
+    def run_query(self, query: str) -> list[dict]:
+        """
+        Evaluate a union query.
+
+        Each output statement emits its set in id order (nodes before ways),
+        up to its limit, like Overpass's default `out` sort.
+
+        Args:
+            query (str): Overpass QL from `build_union_query()`.
+
+        Returns:
+            list[dict]: Elements in output order.
+        """
+        sets = {}
+        for body, name in SET_STATEMENT.findall(query):
+            matched = set()
+            for kind, tag, radius_m, lat, lon in SELECTOR.findall(body):
+                within = haversine_km(float(lat), float(lon), self.lats, self.lons) <= float(radius_m) / 1000
+                for i in np.flatnonzero(within):
+                    element = self.elements[i]
+                    if element.get("type", "node") == kind and element_has_tag(element, tag):
+                        matched.add(i)
+            sets[name] = sorted(matched, key=lambda i: (self.elements[i].get("type") != "node", self.elements[i]["id"]))
+
+        output = []
+        for name, limit in OUTPUT.findall(query):
+            output.extend(self.elements[i] for i in sets.get(name, [])[: int(limit)])
+        return output
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        """Keep benchmark output clean."""
+
+    def do_POST(self):
+        server = self.server
+        form = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8"))
+        with server.lock:
+            server.requests += 1
+        time.sleep(server.latency)
+
+        payload = json.dumps({"version": 0.6, "generator": "mock-overpass", "elements": server.run_query(form["data"][0])})
+        body = payload.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("extract", help="Overpass JSON file with the elements to serve")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with open(args.extract, "r", encoding="utf-8") as file:
+        elements = json.load(file)["elements"]
+    server = MockOverpassServer(elements, args.port, latency=args.latency)
+    print(f"✅ Mock Overpass server listening on {server.base_url}")
+    server.serve_forever()
@@ -0,0 +1,133 @@
+# poi_index_parity.py
+#
+# Check that the offline POI index returns the same places, in the same
+# order, as the Overpass path (served by the local mock Overpass server),
+# and compare their latency. Uses a synthetic city extract unless an
+# Overpass JSON extract is given.
+#
+# Run from the project root:
+#   python -m benchmarks.poi_index_parity --places 3000 --queries 200
+#   python -m benchmarks.poi_index_parity --extract data/odisha.json --centre 20.296 85.824
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.mock_overpass_server import MockOverpassServer
+from legal_help.overpass import RESULTS_PER_CATEGORY, search_legal_help
+from legal_help.poi_index import POIIndex
+from poi_index_builder import build_poi_index
+
+
+TAGS = ["office=lawyer", "office=lawyer", "office=lawyer", "office=ngo", "amenity=social_facility", "amenity=police", "amenity=courthouse"]
+RADII = [2, 5, 10, 15, 20]
+
+
+def synthetic_extract(places: int, centre: tuple[float, float], spread_km: float = 40.0, seed: int = 3) -> list[dict]:
+    """
+    Generate Overpass-style legal-service elements scattered around a city centre.
+
+    Args:
+        places (int): Number of elements.
+        centre (tuple[float, float]): City centre latitude and longitude.
+        spread_km (float): Half-width of the square the elements fall in.
+        seed (int): Random seed so runs are comparable.
+
+    Returns:
+        list[dict]: Nodes and ways (with `center`) carrying one legal-service tag each.
+    """
+    rng = random.Random(seed)
+    elements = []
+    for number in range(1, places + 1):
+        lat = centre[0] + rng.uniform(-spread_km, spread_km) / 111.2
+        lon = centre[1] + rng.uniform(-spread_km, spread_km) / (111.2 * np.cos(np.radians(centre[0])))
+        key, value = rng.choice(TAGS).split("=")
+        tags = {key: value, "name": f"Place {number}", "addr:city": "Bhubaneswar"}
+        if rng.random() < 0.3:
+            elements.append({"type": "way", "id": number, "center": {"lat": lat, "lon": lon}, "tags": tags})
+        else:
+            elements.append({"type": "node", "id": number, "lat": lat, "lon": lon, "tags": tags})
+    return elements
+
+
+def ranking(results: dict[str, list[dict]]) -> dict[str, list[tuple[str, float]]]:
+    """Comparable form of a search result: (osm_id, distance) per category, nearest first."""
+    return {name: [(place["osm_id"], place["distance"]) for place in places] for name, places in results.items()}
+
+
+def run_parity(elements: list[dict], centre: tuple[float, float], queries: int, jitter_km: float = 10.0, seed: int = 9):
+    """
+    Run random searches through both paths and report mismatches and latency.
+
+    Categories where Overpass hit its per-category limit return an arbitrary
+    subset there, so they are counted separately rather than compared.
+
+    Args:
+        elements (list[dict]): Extract to serve and index.
+        centre (tuple[float, float]): Area the random searches are centred around.
+        queries (int): Number of searches.
+        jitter_km (float): How far search centres stray from `centre`.
+        seed (int): Random seed so runs are comparable.
+    """
+    rng = random.Random(seed)
+    server = MockOverpassServer(elements).start()
+    os.environ["OVERPASS_URL"] = server.base_url
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        extract_path = os.path.join(index_dir, "extract.json")
+        with open(extract_path, "w", encoding="utf-8") as file:
+            json.dump({"elements": elements}, file)
+        build_poi_index([extract_path], index_dir)
+        index = POIIndex.load(index_dir)
+
+        compared = mismatched = truncated = 0
+        index_ms, overpass_ms = [], []
+        for _ in range(queries):
+            lat = centre[0] + rng.uniform(-jitter_km, jitter_km) / 111.2
+            lon = centre[1] + rng.uniform(-jitter_km, jitter_km) / 111.2
+            radius = rng.choice(RADII)
+
+            started = time.perf_counter()
+            remote = search_legal_help(lat, lon, radius, use_cache=False, use_index=False)
+            overpass_ms.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            local = index.search(lat, lon, radius)
+            index_ms.append((time.perf_counter() - started) * 1000)
+
+            remote, local = ranking(remote), ranking(local)
+            for name in remote:
+                if len(remote[name]) >= RESULTS_PER_CATEGORY:
+                    truncated += 1
+                    continue
+                compared += 1
+                if remote[name] != local[name]:
+                    mismatched += 1
+                    print(f"❌ {name} at ({lat:.4f}, {lon:.4f}) r={radius}: {len(remote[name])} via Overpass, {len(local[name])} local")
+
+    server.shutdown()
+    print(f"{len(index)} indexed entries, {queries} searches")
+    print(f"category results compared: {compared}, mismatched: {mismatched}, skipped (Overpass limit hit): {truncated}")
+    print(f"{'path':>10} {'p50 ms':>8} {'p95 ms':>8}")
+    for label, samples in (("overpass", overpass_ms), ("index", index_ms)):
+        print(f"{label:>10} {np.percentile(samples, 50):>8.2f} {np.percentile(samples, 95):>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--extract", help="Overpass JSON extract; a synthetic city is generated if omitted")
+    parser.add_argument("--places", type=int, default=3000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--centre", type=float, nargs=2, default=[20.296, 85.824])
+    args = parser.parse_args()
+
+    if args.extract:
+        with open(args.extract, "r", encoding="utf-8") as file:
+            extract = json.load(file)["elements"]
+    else:
+        extract = synthetic_extract(args.places, tuple(args.centre))
+    run_parity(extract, tuple(args.centre), args.queries)
@@ -0,0 +1,94 @@
+# report_benchmark.py
+#
+# Measure PDF report rendering for large scans: a cold render (styles built
+# first), a render with the shared styles, a memoized repeat as on a
+# Streamlit rerun, and a batch of reports rendered serially versus in the
+# process pool.
+#
+# Run from the project root:
+#   python -m benchmarks.report_benchmark --clauses 1000 --batch 8 --workers 4
+
+import argparse
+import random
+import time
+
+from scanner import report
+from scanner.report import get_pdf_report, render_pdf_report, render_pdf_reports
+
+
+WORDS = (
+    "the licensee shall not assign sublicense or transfer any rights under this agreement without prior written "
+    "consent & any such attempt is void; liability is capped at fees paid in the preceding <12> months"
+).split()
+
+
+def synthetic_results(clauses: int, seed: int = 13) -> list[dict]:
+    """
+    Generate analyzer verdicts shaped like `analyze_document()` results.
+
+    Args:
+        clauses (int): Number of verdicts.
+        seed (int): Random seed so runs are comparable.
+
+    Returns:
+        list[dict]: Verdicts with `id`, `line`, `risk` and `explanation`.
+    """
+    rng = random.Random(seed)
+    return [
+        {
+            "id": number,
+            "line": " ".join(rng.choices(WORDS, k=16))[:100],
+            "risk": rng.choice(("SAFE", "SAFE", "MODERATE", "HIGH")),
+            "explanation": " ".join(rng.choices(WORDS, k=rng.randint(20, 45))).capitalize() + ".",
+        }
+        for number in range(1, clauses + 1)
+    ]
+
+
+def timed(function, *args) -> tuple[float, object]:
+    """Seconds taken by one call, and its result."""
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def run_benchmark(clauses: int, batch: int, workers: int):
+    """
+    Print rendering times for one large report and for a batch of them.
+
+    Args:
+        clauses (int): Verdicts per report.
+        batch (int): Reports in the batch comparison.
+        workers (int): Worker processes for the batch render.
+    """
+    results = synthetic_results(clauses)
+    date = "2026-01-01 00:00:00"
+
+    report._styles = None
+    cold, pdf = timed(render_pdf_report, results, "contract.pdf", date)
+    warm, _ = timed(render_pdf_report, results, "contract.pdf", date)
+    get_pdf_report(results, "contract.pdf", date)
+    memoized, _ = timed(get_pdf_report, results, "contract.pdf", date)
+
+    print(f"{clauses} clauses, {len(pdf) / 1024:.0f} KiB PDF")
+    print(f"{'render':>26} {'seconds':>8}")
+    print(f"{'cold (styles built)':>26} {cold:>8.3f}")
+    print(f"{'shared styles':>26} {warm:>8.3f}")
+    print(f"{'memoized repeat':>26} {memoized:>8.4f}")
+
+    jobs = [(synthetic_results(clauses, seed), f"contract-{seed}.pdf", date) for seed in range(batch)]
+    serial, _ = timed(render_pdf_reports, jobs, 1)
+    pooled, pdfs = timed(render_pdf_reports, jobs, workers)
+    print(f"{f'batch of {batch}, serial':>26} {serial:>8.3f}")
+    print(f"{f'batch of {batch}, {workers} workers':>26} {pooled:>8.3f}")
+    assert len(pdfs) == batch and all(item.startswith(b"%PDF") for item in pdfs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clauses", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    run_benchmark(args.clauses, args.batch, args.workers)
@@ -0,0 +1,100 @@
+# risk_analyzer_benchmark.py
+#
+# Measure end-to-end latency and coverage of the chunked risk analyzer on a
+# synthetic 100-page agreement against the local stub LLM server, for a few
+# worker counts. The stub rate-limits beyond its concurrency limit, so the
+# run also exercises the Retry-After backoff; with --truncate-rate a share of
+# responses is cut off mid-stream to exercise tail re-requests.
+#
+# Run from the project root:
+#   python -m benchmarks.risk_analyzer_benchmark --pages 100 --workers 1 4 8 16
+#   python -m benchmarks.risk_analyzer_benchmark --workers 8 --truncate-rate 0.3
+
+import argparse
+import os
+import random
+import time
+
+from groq import Groq
+
+from benchmarks.stub_llm_server import StubLLMServer
+from scanner.risk_analyzer import analyze_document
+
+
+WORDS = (
+    "the party shall indemnify and hold harmless the other party against all claims losses damages "
+    "arising out of breach of this agreement including reasonable attorney fees notice termination "
+    "arbitration governing law confidentiality payment within thirty days of invoice liability"
+).split()
+
+
+def synthetic_agreement(pages: int, clauses_per_page: int = 6, seed: int = 11) -> str:
+    """
+    Generate a numbered agreement of roughly `pages` pages.
+
+    Args:
+        pages (int): Approximate page count (~3,000 characters per page).
+        clauses_per_page (int): Numbered clauses per page.
+        seed (int): Random seed so runs are comparable.
+
+    Returns:
+        str: Agreement text.
+    """
+    rng = random.Random(seed)
+    lines = ["MASTER SERVICES AGREEMENT", ""]
+    for number in range(1, pages * clauses_per_page + 1):
+        lines.append(f"{number}. " + " ".join(rng.choices(WORDS, k=rng.randint(60, 100))).capitalize() + ".")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def run_benchmark(pages: int, worker_counts: list[int], max_concurrency: int, truncate_rate: float = 0.0):
+    """
+    Analyze the synthetic agreement once per worker count and print latency and coverage.
+
+    Args:
+        pages (int): Size of the synthetic agreement.
+        worker_counts (list[int]): Concurrent chunk workers to compare.
+        max_concurrency (int): Stub server concurrency before it answers 429.
+        truncate_rate (float): Share of stub responses cut off with finish_reason "length".
+    """
+    text = synthetic_agreement(pages)
+    server = StubLLMServer(max_concurrency=max_concurrency, truncate_rate=truncate_rate).start()
+    client = Groq(api_key="stub", base_url=server.base_url, max_retries=0)
+
+    print(f"{len(text):,} characters, stub concurrency limit {max_concurrency}, truncation rate {truncate_rate:.0%}")
+    print(
+        f"{'workers':>8} {'chunks':>7} {'clauses':>8} {'covered':>8} {'failed':>7} "
+        f"{'429s':>6} {'cut off':>8} {'first':>6} {'seconds':>8}"
+    )
+    for workers in worker_counts:
+        limited_before, truncated_before = server.rate_limited, server.truncated
+        started = time.perf_counter()
+        first = []
+        report = analyze_document(
+            text,
+            client=client,
+            workers=workers,
+            use_cache=False,
+            on_verdict=lambda verdict: first or first.append(time.perf_counter() - started),
+        )
+        covered = len({item["id"] for item in report["results"] if item["id"] is not None})
+        print(
+            f"{workers:>8} {report['chunks']:>7} {report['clauses']:>8} {covered / report['clauses']:>8.0%} "
+            f"{len(report['failed_chunks']):>7} {server.rate_limited - limited_before:>6} "
+            f"{server.truncated - truncated_before:>8} {first[0] if first else 0:>6.1f} {report['seconds']:>8.1f}"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    # The worker count under test must not be capped by the gateway
+    os.environ.setdefault("LLM_CONCURRENCY_SCANNER", str(max(args.workers)))
+    run_benchmark(args.pages, args.workers, args.max_concurrency, args.truncate_rate)
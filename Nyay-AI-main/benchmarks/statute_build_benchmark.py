@@ -0,0 +1,81 @@
+# statute_build_benchmark.py
+#
+# Measure documents/second of the streaming statute build pipeline on a
+# synthetic corpus (100k sections by default) for a few worker counts.
+#
+# Run from the project root:
+#   python -m benchmarks.statute_build_benchmark --sections 100000 --workers 1 2 4
+
+import argparse
+import json
+import os
+import random
+import tempfile
+
+from statute_corpus_builder import build_statute_vectordb
+
+
+WORDS = (
+    "whoever dishonestly takes movable property out of the possession of any person without consent "
+    "shall be punished with imprisonment of either description for a term which may extend to three years "
+    "or with fine or with both offence cognizable bailable court magistrate police officer complaint"
+).split()
+
+
+def write_synthetic_corpus(file_path: str, sections: int, seed: int = 7):
+    """
+    Write a JSONL corpus of random statute sections.
+
+    Args:
+        file_path (str): Destination JSONL file.
+        sections (int): Number of sections to generate.
+        seed (int): Random seed so runs are comparable.
+    """
+    rng = random.Random(seed)
+    with open(file_path, "w", encoding="utf-8") as file:
+        for i in range(sections):
+            record = {
+                "chapter": i // 50 + 1,
+                "chapter_title": f"Chapter {i // 50 + 1}",
+                "Section": i + 1,
+                "section_title": " ".join(rng.choices(WORDS, k=6)),
+                # Roughly the length distribution of real IPC section descriptions
+                "section_desc": " ".join(rng.choices(WORDS, k=rng.randint(20, 200))),
+            }
+            file.write(json.dumps(record) + "\n")
+
+
+def run_benchmark(sections: int, worker_counts: list[int], batch_size: int):
+    """
+    Build the synthetic corpus once per worker count and print throughput.
+
+    Args:
+        sections (int): Size of the synthetic corpus.
+        worker_counts (list[int]): Worker process counts to compare.
+        batch_size (int): Documents per embedding batch.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_path = os.path.join(tmp_dir, "synthetic.jsonl")
+        write_synthetic_corpus(corpus_path, sections)
+
+        print(f"{'workers':>8} {'docs':>8} {'seconds':>9} {'docs/s':>9}")
+        for workers in worker_counts:
+            stats = build_statute_vectordb(
+                [("synthetic", corpus_path)],
+                os.path.join(tmp_dir, f"chroma_{workers}"),
+                "synthetic",
+                batch_size=batch_size,
+                workers=workers,
+                on_progress=None,
+            )
+            print(f"{workers:>8} {stats['embedded']:>8} {stats['seconds']:>9.1f} {stats['docs_per_second']:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sections", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, max(1, (os.cpu_count() or 2) - 1)])
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    run_benchmark(args.sections, args.workers, args.batch_size)
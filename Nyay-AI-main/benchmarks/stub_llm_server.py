@@ -0,0 +1,202 @@
+# stub_llm_server.py
+#
+# Local stand-in for the Groq chat completions API, for benchmarks. It
+# answers risk-analysis prompts with one verdict per numbered clause ("[12] ...")
+# after a simulated latency, and returns 429 with a Retry-After header when
+# more requests are in flight than the configured concurrency limit.
+# Requests with "stream": true are answered as server-sent events, and a
+# share of responses can be cut off with finish_reason "length" to exercise
+# truncation handling.
+#
+# Point the scanner at it with GROQ_BASE_URL=http://127.0.0.1:<port>, or run
+# it standalone:  python -m benchmarks.stub_llm_server --port 8765
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+CLAUSE_LINE = re.compile(r"^\[(\d+)\] (.*)$", re.MULTILINE)
+RISKS = ("SAFE", "MODERATE", "HIGH")
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering POST .../chat/completions.
+
+    Args:
+        port (int): Port to listen on; 0 picks a free one.
+        base_latency (float): Seconds added to every completion.
+        seconds_per_clause (float): Extra seconds per clause, mimicking output token time.
+        max_concurrency (int): Requests served at once before answering 429.
+        retry_after (float): Retry-After seconds sent with 429 responses.
+        truncate_rate (float): Share of responses cut off part-way with finish_reason "length".
+        seed (int): Random seed for truncation points.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port: int = 0,
+        base_latency: float = 0.4,
+        seconds_per_clause: float = 0.02,
+        max_concurrency: int = 8,
+        retry_after: float = 0.2,
+        truncate_rate: float = 0.0,
+        seed: int = 7,
+    ):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.base_latency = base_latency
+        self.seconds_per_clause = seconds_per_clause
+        self.max_concurrency = max_concurrency
+        self.retry_after = retry_after
+        self.truncate_rate = truncate_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self.prompt_chars = 0
+        self.truncated = 0
+
+    @property
+    def base_url(self) -> str:
+        """URL to pass as the Groq client's base_url."""
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "StubLLMServer":
+        """Serve on a daemon thread and return self."""
+        threading.Thread(target=self.serve_forever, name="stub-llm", daemon=True).start()
+        return self
+
+
+def stub_verdicts(prompt: str) -> list[dict]:
+    """One deterministic verdict per numbered clause in the prompt."""
+    return [
+        {
+            "id": int(clause_id),
+            "line": text[:100],
+            "risk": RISKS[len(text) % len(RISKS)],
+            "explanation": "Stub verdict.",
+        }
+        for clause_id, text in CLAUSE_LINE.findall(prompt)
+    ]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        """Keep benchmark output clean."""
+
+    def _send(self, status: int, body: dict, headers: dict | None = None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_stream(self, completion_id: str, model: str, content: str, finish_reason: str, usage: dict, delay: float):
+        """Send content as OpenAI-style server-sent events, spreading `delay` over the pieces."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        pieces = [content[start:start + 24] for start in range(0, len(content), 24)] or [""]
+        base = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+        for number, piece in enumerate(pieces):
+            time.sleep(delay / len(pieces))
+            delta = {"role": "assistant", "content": piece} if number == 0 else {"content": piece}
+            self._send_event({**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+        self._send_event({
+            **base,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}],
+            "x_groq": {"id": completion_id, "usage": usage},
+        })
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def _send_event(self, event: dict):
+        self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+
+        with server.lock:
+            server.requests += 1
+            if server.in_flight >= server.max_concurrency:
+                server.rate_limited += 1
+                limited = True
+            else:
+                server.in_flight += 1
+                limited = False
+        if limited:
+            self._send(
+                429,
+                {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                {"retry-after": str(server.retry_after)},
+            )
+            return
+
+        try:
+            prompt = body["messages"][-1]["content"]
+            verdicts = stub_verdicts(prompt)
+            content = json.dumps(verdicts)
+            finish_reason = "stop"
+            with server.lock:
+                server.prompt_chars += sum(len(message["content"]) for message in body["messages"])
+                if content and server.random.random() < server.truncate_rate:
+                    server.truncated += 1
+                    content = content[:server.random.randrange(len(content))]
+                    finish_reason = "length"
+                completion_id = f"stub-{server.requests}"
+            usage = {
+                "prompt_tokens": len(prompt) // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": (len(prompt) + len(content)) // 4,
+            }
+            delay = server.base_latency + server.seconds_per_clause * len(verdicts)
+            if body.get("stream"):
+                self._send_stream(completion_id, body.get("model", "stub"), content, finish_reason, usage, delay)
+                return
+
+            time.sleep(delay)
+            self._send(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": finish_reason,
+                }],
+                "usage": usage,
+            })
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.4)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubLLMServer(
+        args.port,
+        base_latency=args.latency,
+        max_concurrency=args.max_concurrency,
+        truncate_rate=args.truncate_rate,
+    )
+    print(f"✅ Stub LLM server listening on {server.base_url}")
+    server.serve_forever()
@@ -0,0 +1,139 @@
+# clause_risk_cache.py
+
+import hashlib
+import json
+import os
+import re
+import threading
+
+from cache.sqlite_store import SQLiteStore, default_cache_dir
+
+
+# Leading clause numbering differs between contracts that share the same boilerplate
+CLAUSE_NUMBER = re.compile(r"^\s*(?:\d+(?:\.\d+)*[.)]?|\([a-z0-9]{1,4}\)|(?:clause|section|article)\s+[\divxlc]+[.:]?)\s+")
+QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+
+def normalize_clause(text: str) -> str:
+    """
+    Canonical form of a clause: numbering removed, quotes unified, lowercase, single-spaced.
+
+    Args:
+        text (str): Clause text as extracted.
+
+    Returns:
+        str: Normalized clause text.
+    """
+    text = " ".join(text.translate(QUOTES).lower().split())
+    return CLAUSE_NUMBER.sub("", text, count=1)
+
+
+class ClauseRiskCache:
+    """
+    Persistent store of per-clause risk verdicts keyed by normalized clause hash.
+
+    Keys are scoped to a `version` string derived from the analysis prompt and
+    model, so changing either invalidates every earlier verdict. Clauses the
+    model chose not to classify (headers, signatures) are remembered too, so
+    they are not sent again either, but only for `skipped_ttl_seconds`: a
+    skip can also come from a transient failure, which must not stick.
+    """
+
+    def __init__(self, path: str, version: str, max_entries: int = 200_000, skipped_ttl_seconds: float | None = 24 * 3600):
+        self.version = version
+        self.skipped_ttl_seconds = skipped_ttl_seconds
+        self._store = SQLiteStore(path, table="clause_verdicts", max_entries=max_entries)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, clause: str) -> str:
+        """Cache key of a clause under the current prompt/model version."""
+        return hashlib.sha256(f"{self.version}\n{normalize_clause(clause)}".encode("utf-8")).hexdigest()
+
+    def get(self, clause: str) -> dict | None:
+        """
+        Look up the verdict for a clause.
+
+        Args:
+            clause (str): Clause text.
+
+        Returns:
+            dict | None: `risk`, `explanation` and `line`, with `risk` None for
+                clauses the model skipped; None when the clause is unseen.
+        """
+        blob = self._store.get(self.key(clause))
+        with self._lock:
+            if blob is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(blob)
+
+    def put(self, clause: str, verdict: dict | None):
+        """
+        Remember the verdict for a clause.
+
+        Args:
+            clause (str): Clause text.
+            verdict (dict | None): Verdict with `risk`, `explanation` and `line`,
+                or None when the model did not classify the clause (kept for
+                `skipped_ttl_seconds`; not stored at all when that is 0).
+        """
+        ttl = None
+        value = {"risk": None, "explanation": "", "line": ""}
+        if verdict is not None:
+            value = {key: verdict[key] for key in ("risk", "explanation", "line")}
+        elif self.skipped_ttl_seconds is not None and self.skipped_ttl_seconds <= 0:
+            return
+        else:
+            ttl = self.skipped_ttl_seconds
+        self._store.set(self.key(clause), json.dumps(value, ensure_ascii=False).encode("utf-8"), ttl=ttl)
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters.
+
+        Returns:
+            dict: `hits`, `misses`, `hit_rate` and stored `entries`/`bytes`.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+        stats.update(self._store.stats())
+        return stats
+
+
+_clause_caches: dict[str, ClauseRiskCache] = {}
+_clause_cache_lock = threading.Lock()
+
+
+def get_clause_risk_cache(version: str) -> ClauseRiskCache | None:
+    """
+    Return the process-wide clause cache for a prompt/model version, or None when CLAUSE_CACHE_ENABLED is "false".
+
+    Sized by CLAUSE_CACHE_MAX_ENTRIES (default 200000). Skipped clauses expire
+    after CLAUSE_CACHE_SKIPPED_TTL_HOURS (default 24; 0 never stores them).
+
+    Args:
+        version (str): Prompt/model fingerprint, e.g. from `risk_analyzer.prompt_version()`.
+
+    Returns:
+        ClauseRiskCache | None: The shared cache for that version.
+    """
+    if os.getenv("CLAUSE_CACHE_ENABLED", "true").lower() == "false":
+        return None
+
+    with _clause_cache_lock:
+        if version not in _clause_caches:
+            _clause_caches[version] = ClauseRiskCache(
+                os.path.join(default_cache_dir(), "clause_verdicts.sqlite"),
+                version=version,
+                max_entries=int(os.getenv("CLAUSE_CACHE_MAX_ENTRIES", "200000")),
+                skipped_ttl_seconds=float(os.getenv("CLAUSE_CACHE_SKIPPED_TTL_HOURS", "24")) * 3600,
+            )
+        return _clause_caches[version]
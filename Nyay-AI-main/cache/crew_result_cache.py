@@ -0,0 +1,246 @@
+# crew_result_cache.py
+
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Iterable
+
+import numpy as np
+
+from cache.embedding_cache import normalize_query
+from cache.sqlite_store import SQLiteStore, default_cache_dir
+
+
+def serialize_crew_output(result) -> dict:
+    """
+    Convert a CrewOutput into plain JSON-serializable data.
+
+    Args:
+        result (CrewOutput): Value returned by `Crew.kickoff()`.
+
+    Returns:
+        dict: `final_output` plus one `tasks` entry per task with its raw output.
+    """
+    return {
+        "final_output": getattr(result, "raw", None) or str(result),
+        "tasks": [
+            {
+                "name": task_output.name,
+                "agent": task_output.agent,
+                "description": task_output.description,
+                "raw": task_output.raw,
+            }
+            for task_output in getattr(result, "tasks_output", [])
+        ],
+    }
+
+
+def crew_version(crew) -> str:
+    """
+    Fingerprint of everything about a crew that shapes its output.
+
+    Covers each task's name, description and expected-output templates and
+    context, and its agent's role, goal, backstory, model, sampling settings
+    and tools, so changing a prompt or model retires the cached results.
+
+    Args:
+        crew (Crew): The crew whose results are cached.
+
+    Returns:
+        str: Short hex digest.
+    """
+    tasks = []
+    for task in crew.tasks:
+        agent = task.agent
+        llm = getattr(agent, "llm", None)
+        tasks.append({
+            "name": task.name,
+            "description": task._original_description or task.description,
+            "expected_output": task._original_expected_output or task.expected_output,
+            "context": [dep.name for dep in task.context] if isinstance(task.context, list) else None,
+            "agent": {
+                "role": agent._original_role or agent.role,
+                "goal": agent._original_goal or agent.goal,
+                "backstory": agent._original_backstory or agent.backstory,
+                "model": getattr(llm, "model", None),
+                "temperature": getattr(llm, "temperature", None),
+                "tools": sorted(tool.name for tool in agent.tools or []),
+            },
+        })
+    return hashlib.sha256(json.dumps(tasks, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+class CrewResultCache:
+    """
+    Response cache in front of the legal assistant crew.
+
+    Exact repeats are found by a hash of the crew version and the normalized
+    case description. Near-duplicates are found by cosine similarity of the
+    description embeddings against every cached entry of the same crew
+    version, accepted above `similarity_threshold`. A near-duplicate is a
+    different case, so it only hands back the task outputs the caller names
+    as reusable, never the final output.
+    Entries carry a TTL and the store is capped by entry count with LRU eviction.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        embeddings=None,
+        similarity_threshold: float = 0.97,
+        ttl_seconds: float = 24 * 3600,
+        max_entries: int = 500,
+    ):
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self._results = SQLiteStore(path, table="crew_results", max_entries=max_entries)
+        self._vectors = SQLiteStore(path, table="crew_result_vectors", max_entries=max_entries)
+
+        self._lock = threading.Lock()
+        self._index = {key: np.frombuffer(blob, dtype=np.float32) for key, blob in self._vectors.items()}
+        self._matrix = None
+        self._matrix_keys = []
+
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(user_input: str, version: str) -> str:
+        """Exact-match key: hash of the crew version and the normalized case description."""
+        return hashlib.sha256(f"{version}\n{normalize_query(user_input)}".encode("utf-8")).hexdigest()
+
+    def _embed(self, user_input: str) -> np.ndarray:
+        """Unit-length embedding of the normalized case description."""
+        vector = np.asarray(self.embeddings.embed_query(normalize_query(user_input)), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _load(self, key: str) -> dict | None:
+        """Decoded cache entry, or None if missing or expired."""
+        blob = self._results.get(key)
+        return json.loads(blob) if blob is not None else None
+
+    def _similar(self, vector: np.ndarray) -> list[tuple[str, float]]:
+        """Cached entries at or above the similarity threshold and their cosine similarity, best first."""
+        with self._lock:
+            if self._matrix is None:
+                self._matrix_keys = list(self._index)
+                self._matrix = np.stack(list(self._index.values())) if self._index else None
+            keys, matrix = self._matrix_keys, self._matrix
+        if matrix is None:
+            return []
+        scores = matrix @ vector
+        best = np.flatnonzero(scores >= self.similarity_threshold)
+        return [(keys[i], float(scores[i])) for i in best[np.argsort(-scores[best])]]
+
+    def lookup(self, user_input: str, version: str = "", similar_tasks: Iterable[str] = ()) -> dict | None:
+        """
+        Find a cached result for this case description.
+
+        Args:
+            user_input (str): Case description as submitted.
+            version (str): Crew version from `crew_version()`.
+            similar_tasks (Iterable[str]): Tasks whose outputs may be reused
+                from a near-duplicate case; with none, only exact repeats match.
+
+        Returns:
+            dict | None: Cached entry with `tasks`, `match` ("exact" or
+                "similar") and `similarity`, or None on a miss. Exact matches
+                also carry `final_output`; similar ones carry only the
+                `similar_tasks` outputs.
+        """
+        entry = self._load(self._key(user_input, version))
+        if entry is not None:
+            self.exact_hits += 1
+            return {**entry, "match": "exact", "similarity": 1.0}
+
+        similar_tasks = set(similar_tasks)
+        if similar_tasks and self.embeddings is not None and self.similarity_threshold < 1.0:
+            for key, similarity in self._similar(self._embed(user_input)):
+                entry = self._load(key)
+                # The entry may have expired or been evicted since the index was built
+                if entry is None or entry.get("version") != version:
+                    continue
+                tasks = [task for task in entry["tasks"] if task["name"] in similar_tasks]
+                self.similar_hits += 1
+                return {"tasks": tasks, "user_input": entry["user_input"], "match": "similar", "similarity": similarity}
+
+        self.misses += 1
+        return None
+
+    def store(self, user_input: str, output: dict, version: str = ""):
+        """
+        Cache the output of a crew run.
+
+        Args:
+            user_input (str): Case description the crew was run on.
+            output (dict): Result of `serialize_crew_output()`.
+            version (str): Crew version from `crew_version()`.
+        """
+        key = self._key(user_input, version)
+        entry = {**output, "user_input": user_input, "version": version}
+        self._results.set(key, json.dumps(entry, ensure_ascii=False).encode("utf-8"), ttl=self.ttl_seconds)
+
+        if self.embeddings is not None:
+            vector = self._embed(user_input)
+            self._vectors.set(key, vector.tobytes(), ttl=self.ttl_seconds)
+            with self._lock:
+                self._index[key] = vector
+                # Drop vectors whose results were evicted so the index stays bounded
+                if len(self._index) > (self._results.max_entries or len(self._index)):
+                    live = set(self._results.keys())
+                    self._index = {k: v for k, v in self._index.items() if k in live}
+                self._matrix = None
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters.
+
+        Returns:
+            dict: `exact_hits`, `similar_hits`, `misses`, `hit_rate` and stored `entries`.
+        """
+        lookups = self.exact_hits + self.similar_hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_rate": (self.exact_hits + self.similar_hits) / lookups if lookups else 0.0,
+            "entries": self._results.stats()["entries"],
+        }
+
+
+_crew_cache = None
+_crew_cache_lock = threading.Lock()
+
+
+def get_crew_result_cache(embeddings=None) -> CrewResultCache | None:
+    """
+    Return the process-wide crew result cache, or None when CREW_CACHE_ENABLED is "false".
+
+    Configured by CREW_CACHE_SIMILARITY (default 0.97; 1.0 disables near-duplicate
+    matching), CREW_CACHE_TTL_HOURS (default 24) and CREW_CACHE_MAX_ENTRIES (default 500).
+
+    Args:
+        embeddings: Embeddings used for near-duplicate matching on first creation.
+
+    Returns:
+        CrewResultCache | None: The shared cache.
+    """
+    global _crew_cache
+    if os.getenv("CREW_CACHE_ENABLED", "true").lower() == "false":
+        return None
+
+    if _crew_cache is None:
+        with _crew_cache_lock:
+            if _crew_cache is None:
+                _crew_cache = CrewResultCache(
+                    os.path.join(default_cache_dir(), "crew_results.sqlite"),
+                    embeddings=embeddings,
+                    similarity_threshold=float(os.getenv("CREW_CACHE_SIMILARITY", "0.97")),
+                    ttl_seconds=float(os.getenv("CREW_CACHE_TTL_HOURS", "24")) * 3600,
+                    max_entries=int(os.getenv("CREW_CACHE_MAX_ENTRIES", "500")),
+                )
+    return _crew_cache
@@ -0,0 +1,169 @@
+# embedding_cache.py
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from cache.sqlite_store import SQLiteStore, default_cache_dir
+
+
+def normalize_query(text: str) -> str:
+    """
+    Canonical form of a query used as the cache key: lowercase, single-spaced, trimmed.
+
+    Args:
+        text (str): Raw query text.
+
+    Returns:
+        str: Normalized query text.
+    """
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+class QueryEmbeddingCache:
+    """
+    Two-tier cache of query embeddings keyed by normalized query text.
+
+    A bounded in-memory LRU sits in front of a size-capped SQLite file that
+    survives restarts. Disk hits are promoted into memory.
+    """
+
+    def __init__(self, path: str, namespace: str, memory_entries: int = 1024, max_disk_bytes: int = 64 * 1024 * 1024):
+        self.namespace = namespace
+        self.memory_entries = memory_entries
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = SQLiteStore(path, table="query_embeddings", max_bytes=max_disk_bytes)
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        """Cache key scoped to the embedding model, so switching models never returns stale vectors."""
+        return hashlib.sha256(f"{self.namespace}\n{normalize_query(text)}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: list[float]):
+        """Insert into the memory tier, evicting the least recently used entry when full. Caller holds the lock."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, text: str) -> list[float] | None:
+        """
+        Look up a query embedding.
+
+        Args:
+            text (str): Query text.
+
+        Returns:
+            list[float] | None: The cached embedding, or None on a miss.
+        """
+        key = self._key(text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+
+        blob = self._disk.get(key)
+        with self._lock:
+            if blob is None:
+                self.misses += 1
+                return None
+            vector = np.frombuffer(blob, dtype=np.float32).tolist()
+            self._remember(key, vector)
+            self.disk_hits += 1
+            return vector
+
+    def put(self, text: str, vector: list[float]):
+        """
+        Store a query embedding in both tiers.
+
+        Args:
+            text (str): Query text.
+            vector (list[float]): Its embedding.
+        """
+        key = self._key(text)
+        with self._lock:
+            self._remember(key, list(vector))
+        self._disk.set(key, np.asarray(vector, dtype=np.float32).tobytes())
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters and tier sizes.
+
+        Returns:
+            dict: Counters plus `hit_rate`, `memory_entries` and disk `entries`/`bytes`.
+        """
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            stats = {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+        stats.update(self._disk.stats())
+        return stats
+
+
+class CachedEmbeddings:
+    """
+    LangChain-compatible embeddings wrapper that serves query vectors from a
+    `QueryEmbeddingCache`. Cache hits skip model inference entirely; misses in
+    a batch are embedded together in one model call.
+    """
+
+    def __init__(self, embeddings, cache: QueryEmbeddingCache):
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_query(self, text: str) -> list[float]:
+        vector = self.cache.get(text)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.put(text, vector)
+        return vector
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = [self.cache.get(text) for text in texts]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = self.embeddings.embed_documents([texts[i] for i in missing])
+            for i, vector in zip(missing, computed):
+                self.cache.put(texts[i], vector)
+                vectors[i] = vector
+        return vectors
+
+
+def cached_query_embeddings(embeddings):
+    """
+    Wrap query embeddings with the persistent cache unless EMBEDDING_CACHE_ENABLED is "false".
+
+    Sizing comes from EMBEDDING_CACHE_MEMORY_ENTRIES (default 1024) and
+    EMBEDDING_CACHE_MAX_MB (default 64); the file lives in the shared cache directory.
+
+    Args:
+        embeddings: LangChain embeddings used for queries.
+
+    Returns:
+        The wrapped embeddings, or the original object when caching is disabled.
+    """
+    if os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "false":
+        return embeddings
+
+    cache = QueryEmbeddingCache(
+        os.path.join(default_cache_dir(), "query_embeddings.sqlite"),
+        namespace=getattr(embeddings, "model_name", type(embeddings).__name__),
+        memory_entries=int(os.getenv("EMBEDDING_CACHE_MEMORY_ENTRIES", "1024")),
+        max_disk_bytes=int(float(os.getenv("EMBEDDING_CACHE_MAX_MB", "64")) * 1024 * 1024),
+    )
+    return CachedEmbeddings(embeddings, cache)
@@ -0,0 +1,173 @@
+# llm_response_cache.py
+
+import hashlib
+import json
+import os
+import threading
+
+from cache.sqlite_store import SQLiteStore, default_cache_dir
+
+
+# Request settings that change what the model answers
+SAMPLING_PARAMS = (
+    "temperature", "top_p", "n", "max_tokens", "max_completion_tokens", "stop", "seed",
+    "presence_penalty", "frequency_penalty", "logit_bias", "response_format", "reasoning_effort",
+)
+
+
+def prompt_version(agent=None, task=None) -> str:
+    """
+    Fingerprint of the agent backstory and task description templates behind a call.
+
+    Editing either one retires every response cached for it, even where the
+    rendered prompt would happen to come out the same.
+
+    Args:
+        agent (BaseAgent | None): Agent making the call.
+        task (Task | None): Task being executed.
+
+    Returns:
+        str: Short hex digest.
+    """
+    backstory = (getattr(agent, "_original_backstory", None) or getattr(agent, "backstory", "")) if agent else ""
+    description = (getattr(task, "_original_description", None) or getattr(task, "description", "")) if task else ""
+    return hashlib.sha256(f"{backstory}\n{description}".encode("utf-8")).hexdigest()[:16]
+
+
+def llm_response_key(model: str, messages, tools, params: dict, version: str) -> str:
+    """
+    Content address of a chat completion request.
+
+    Args:
+        model (str): Model name, e.g. "groq/llama-3.3-70b-versatile".
+        messages (str | list[dict]): The full message list (a string is one user message).
+        tools (list | None): Tool schemas offered to the model.
+        params (dict): Sampling settings, see SAMPLING_PARAMS.
+        version (str): From `prompt_version()`.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    payload = {"model": model, "messages": messages, "tools": tools, "params": params, "version": version}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Persistent cache of deterministic LLM completions with LRU eviction.
+
+    Keys come from `llm_response_key()`, so a response is only reused for the
+    exact same model, messages, tools, sampling settings and prompt version.
+    Each entry remembers the tokens its original call used, which a hit counts
+    as saved.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float | None = 30 * 24 * 3600, max_entries: int = 5000, max_bytes: int | None = None):
+        self.ttl_seconds = ttl_seconds
+        self._store = SQLiteStore(path, table="llm_responses", max_entries=max_entries, max_bytes=max_bytes)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.tokens_saved = 0
+        self.callers: dict[str, dict] = {}
+
+    def _count(self, caller: str, hit: bool, tokens: int = 0):
+        with self._lock:
+            counters = self.callers.setdefault(caller, {"hits": 0, "misses": 0, "tokens_saved": 0})
+            if hit:
+                self.hits += 1
+                self.tokens_saved += tokens
+                counters["hits"] += 1
+                counters["tokens_saved"] += tokens
+            else:
+                self.misses += 1
+                counters["misses"] += 1
+
+    def get(self, key: str, caller: str = "llm") -> str | None:
+        """
+        Look up a completion.
+
+        Args:
+            key (str): Key from `llm_response_key()`.
+            caller (str): Who is asking, for the per-caller counters.
+
+        Returns:
+            str | None: The cached response text, or None on a miss.
+        """
+        blob = self._store.get(key)
+        if blob is None:
+            self._count(caller, hit=False)
+            return None
+        entry = json.loads(blob)
+        self._count(caller, hit=True, tokens=entry.get("tokens") or 0)
+        return entry["response"]
+
+    def put(self, key: str, response: str, tokens: int | None = None):
+        """
+        Store a completion.
+
+        Args:
+            key (str): Key from `llm_response_key()`.
+            response (str): Response text.
+            tokens (int | None): Tokens the call used, counted as saved on every hit.
+        """
+        entry = {"response": response, "tokens": tokens or 0}
+        self._store.set(key, json.dumps(entry, ensure_ascii=False).encode("utf-8"), ttl=self.ttl_seconds)
+        with self._lock:
+            self.stores += 1
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters and token savings.
+
+        Returns:
+            dict: `hits`, `misses`, `stores`, `hit_rate`, `tokens_saved`,
+                per-caller `callers` counters and stored `entries`/`bytes`.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "tokens_saved": self.tokens_saved,
+                "callers": {caller: dict(counters) for caller, counters in self.callers.items()},
+            }
+        stats.update(self._store.stats())
+        return stats
+
+
+_llm_response_cache = None
+_llm_response_cache_lock = threading.Lock()
+
+
+def get_llm_response_cache() -> LLMResponseCache | None:
+    """
+    Return the process-wide LLM response cache, or None when LLM_RESPONSE_CACHE_ENABLED is "false".
+
+    Configured by LLM_RESPONSE_CACHE_TTL_HOURS (default 720; 0 keeps entries
+    until evicted), LLM_RESPONSE_CACHE_MAX_ENTRIES (default 5000) and
+    LLM_RESPONSE_CACHE_MAX_MB (default 100).
+
+    Returns:
+        LLMResponseCache | None: The shared cache.
+    """
+    global _llm_response_cache
+    if os.getenv("LLM_RESPONSE_CACHE_ENABLED", "true").lower() == "false":
+        return None
+
+    if _llm_response_cache is None:
+        with _llm_response_cache_lock:
+            if _llm_response_cache is None:
+                ttl_hours = float(os.getenv("LLM_RESPONSE_CACHE_TTL_HOURS", "720"))
+                _llm_response_cache = LLMResponseCache(
+                    os.path.join(default_cache_dir(), "llm_responses.sqlite"),
+                    ttl_seconds=ttl_hours * 3600 if ttl_hours > 0 else None,
+                    max_entries=int(os.getenv("LLM_RESPONSE_CACHE_MAX_ENTRIES", "5000")),
+                    max_bytes=int(float(os.getenv("LLM_RESPONSE_CACHE_MAX_MB", "100")) * 1024 * 1024),
+                )
+    return _llm_response_cache
@@ -0,0 +1,322 @@
+# location_cache.py
+
+import json
+import math
+import os
+import re
+import threading
+
+from cache.sqlite_store import SQLiteStore, default_cache_dir
+
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+EARTH_RADIUS_KM = 6371.0088
+
+# Searches this close together count as the same centre
+SAME_CENTRE_KM = 0.05
+
+
+def normalize_location(text: str) -> str:
+    """
+    Canonical form of a typed location: lowercase, punctuation folded to spaces, single-spaced.
+
+    "Bhubaneswar, Odisha" and "bhubaneswar  odisha" share a cache entry.
+
+    Args:
+        text (str): Location as typed by the user.
+
+    Returns:
+        str: Normalized location.
+    """
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def geohash(lat: float, lon: float, precision: int = 5) -> str:
+    """
+    Geohash of a point; precision 5 is a tile of roughly 4.9 x 4.9 km.
+
+    Args:
+        lat (float): Latitude.
+        lon (float): Longitude.
+        precision (int): Characters in the hash.
+
+    Returns:
+        str: Geohash string.
+    """
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, use_lon = [], 0, 0, True
+    while len(chars) < precision:
+        bounds, value = (lon_range, lon) if use_lon else (lat_range, lat)
+        middle = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        use_lon = not use_lon
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlambda = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def element_position(element: dict) -> tuple[float, float] | None:
+    """Coordinates of an Overpass node, or of a way's `center`."""
+    if "lat" in element and "lon" in element:
+        return element["lat"], element["lon"]
+    if "center" in element:
+        return element["center"]["lat"], element["center"]["lon"]
+    return None
+
+
+class GeocodeCache:
+    """
+    Persistent cache of geocoding results keyed by normalized location text.
+
+    Locations the geocoder could not find are cached too, so repeated typos
+    do not count against the geocoding service's usage limits.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 30 * 24 * 3600, max_entries: int = 20000):
+        self.ttl_seconds = ttl_seconds
+        self._store = SQLiteStore(path, table="geocodes", max_entries=max_entries)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, hit: bool):
+        """Record a lookup."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, location: str) -> tuple[bool, dict | None]:
+        """
+        Look up a location.
+
+        Args:
+            location (str): Location as typed.
+
+        Returns:
+            tuple[bool, dict | None]: Whether it was cached, and its `lat`,
+                `lon` and `address` (None when it is known not to exist).
+        """
+        blob = self._store.get(normalize_location(location))
+        self._count(blob is not None)
+        if blob is None:
+            return False, None
+        return True, json.loads(blob)
+
+    def put(self, location: str, result: dict | None):
+        """
+        Remember a geocoding result.
+
+        Args:
+            location (str): Location as typed.
+            result (dict | None): `lat`, `lon` and `address`, or None if not found.
+        """
+        self._store.set(
+            normalize_location(location), json.dumps(result, ensure_ascii=False).encode("utf-8"), ttl=self.ttl_seconds
+        )
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters.
+
+        Returns:
+            dict: `hits`, `misses`, `hit_rate` and stored `entries`/`bytes`.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+        stats.update(self._store.stats())
+        return stats
+
+
+class POICache:
+    """
+    Persistent cache of Overpass results per geohash tile and category.
+
+    An entry holds the elements found within `radius_km` of the search centre
+    that produced it. A later search whose centre falls in the same tile is
+    answered from the entry when its circle lies inside the cached one,
+    filtering the elements by distance locally, so a 2 km search reuses an
+    earlier 10 km one. Entries cut off by the per-category result limit are
+    only reused for the same radius, since they are not a complete superset.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = 7 * 24 * 3600,
+        precision: int = 5,
+        max_entries: int = 20000,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.precision = precision
+        self._store = SQLiteStore(path, table="poi_tiles", max_entries=max_entries)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, hit: bool):
+        """Record a lookup."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def key(self, lat: float, lon: float, category: str) -> str:
+        """Cache key of the tile containing a point, for one category."""
+        return f"{geohash(lat, lon, self.precision)}:{category}"
+
+    def get(self, lat: float, lon: float, radius_km: float, category: str) -> list[dict] | None:
+        """
+        Elements of a category within `radius_km` of a point, if a cached search covers it.
+
+        Args:
+            lat (float): Search centre latitude.
+            lon (float): Search centre longitude.
+            radius_km (float): Search radius in kilometres.
+            category (str): Category name.
+
+        Returns:
+            list[dict] | None: Overpass elements, or None on a miss.
+        """
+        blob = self._store.get(self.key(lat, lon, category))
+        entry = json.loads(blob) if blob is not None else None
+        if entry is None or not self._covers(entry, lat, lon, radius_km):
+            self._count(False)
+            return None
+
+        self._count(True)
+        elements = []
+        for element in entry["elements"]:
+            position = element_position(element)
+            if position is not None and haversine_km(lat, lon, *position) <= radius_km:
+                elements.append(element)
+        return elements
+
+    def put(self, lat: float, lon: float, radius_km: float, category: str, elements: list[dict], complete: bool):
+        """
+        Remember the result of a search, unless the tile's entry already answers it.
+
+        Args:
+            lat (float): Search centre latitude.
+            lon (float): Search centre longitude.
+            radius_km (float): Search radius in kilometres.
+            category (str): Category name.
+            elements (list[dict]): Overpass elements found.
+            complete (bool): False when the result hit the per-category limit.
+        """
+        key = self.key(lat, lon, category)
+        blob = self._store.get(key)
+        if blob is not None:
+            # A wider entry centred elsewhere may not cover this centre; it is replaced then
+            existing = json.loads(blob)
+            if self._covers(existing, lat, lon, radius_km) and (existing["complete"] or not complete):
+                return
+        entry = {"lat": lat, "lon": lon, "radius_km": radius_km, "complete": complete, "elements": elements}
+        self._store.set(key, json.dumps(entry, ensure_ascii=False).encode("utf-8"), ttl=self.ttl_seconds)
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters.
+
+        Returns:
+            dict: `hits`, `misses`, `hit_rate` and stored `entries`/`bytes`.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+        stats.update(self._store.stats())
+        return stats
+
+    @staticmethod
+    def _covers(entry: dict, lat: float, lon: float, radius_km: float) -> bool:
+        """Whether a cached search answers a search at (lat, lon, radius_km) exactly."""
+        offset = haversine_km(entry["lat"], entry["lon"], lat, lon)
+        if not entry["complete"]:
+            return radius_km == entry["radius_km"] and offset <= SAME_CENTRE_KM
+        return offset + radius_km <= entry["radius_km"] + 1e-6
+
+
+_geocode_cache = None
+_poi_cache = None
+_location_cache_lock = threading.Lock()
+
+
+def _location_cache_path() -> str:
+    return os.path.join(default_cache_dir(), "locations.sqlite")
+
+
+def get_geocode_cache() -> GeocodeCache | None:
+    """
+    Return the process-wide geocoding cache, or None when LOCATION_CACHE_ENABLED is "false".
+
+    Configured by GEOCODE_CACHE_TTL_HOURS (default 720) and
+    GEOCODE_CACHE_MAX_ENTRIES (default 20000).
+
+    Returns:
+        GeocodeCache | None: The shared cache.
+    """
+    global _geocode_cache
+    if os.getenv("LOCATION_CACHE_ENABLED", "true").lower() == "false":
+        return None
+
+    if _geocode_cache is None:
+        with _location_cache_lock:
+            if _geocode_cache is None:
+                _geocode_cache = GeocodeCache(
+                    _location_cache_path(),
+                    ttl_seconds=float(os.getenv("GEOCODE_CACHE_TTL_HOURS", "720")) * 3600,
+                    max_entries=int(os.getenv("GEOCODE_CACHE_MAX_ENTRIES", "20000")),
+                )
+    return _geocode_cache
+
+
+def get_poi_cache() -> POICache | None:
+    """
+    Return the process-wide POI tile cache, or None when LOCATION_CACHE_ENABLED is "false".
+
+    Configured by POI_CACHE_TTL_HOURS (default 168), POI_CACHE_GEOHASH_PRECISION
+    (default 5, ~4.9 km tiles) and POI_CACHE_MAX_ENTRIES (default 20000).
+
+    Returns:
+        POICache | None: The shared cache.
+    """
+    global _poi_cache
+    if os.getenv("LOCATION_CACHE_ENABLED", "true").lower() == "false":
+        return None
+
+    if _poi_cache is None:
+        with _location_cache_lock:
+            if _poi_cache is None:
+                _poi_cache = POICache(
+                    _location_cache_path(),
+                    ttl_seconds=float(os.getenv("POI_CACHE_TTL_HOURS", "168")) * 3600,
+                    precision=int(os.getenv("POI_CACHE_GEOHASH_PRECISION", "5")),
+                    max_entries=int(os.getenv("POI_CACHE_MAX_ENTRIES", "20000")),
+                )
+    return _poi_cache
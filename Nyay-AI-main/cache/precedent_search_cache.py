@@ -0,0 +1,212 @@
+# precedent_search_cache.py
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+
+from cache.embedding_cache import normalize_query
+from cache.sqlite_store import SQLiteStore, default_cache_dir
+
+
+def canonical_precedent_query(query: str) -> str:
+    """
+    Canonical form of a precedent query: normalized, with punctuation folded to spaces.
+
+    "Home trespassing & theft - precedent cases in India" and
+    "home trespassing theft precedent cases in india" share a cache entry.
+
+    Args:
+        query (str): Query as issued by the agent.
+
+    Returns:
+        str: Canonical query text.
+    """
+    return normalize_query(re.sub(r"[^\w\s]", " ", query))
+
+
+class PrecedentSearchCache:
+    """
+    Persistent TTL cache with request coalescing in front of the web precedent search.
+
+    Entries are keyed by the canonical query and the trusted source list, so
+    changing LEGAL_SOURCES never serves results filtered for other domains.
+    Concurrent misses for the same key share one upstream call (single flight).
+    Within `stale_seconds` after expiry an entry is served immediately while
+    one background call refreshes it (stale-while-revalidate), and it is also
+    served if the upstream call fails.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = 72 * 3600,
+        stale_seconds: float = 7 * 24 * 3600,
+        stale_while_revalidate: bool = True,
+        max_entries: int = 2000,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.stale_while_revalidate = stale_while_revalidate
+        self._store = SQLiteStore(
+            path, table="precedent_searches", max_entries=max_entries, expired_grace=stale_seconds
+        )
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, Future] = {}
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.upstream_calls = 0
+        self.revalidations = 0
+        self.upstream_errors = 0
+
+    @staticmethod
+    def key(query: str, sources: list[str]) -> str:
+        """Cache key of a query against a source list."""
+        payload = json.dumps([canonical_precedent_query(query), sorted(sources)])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, counter: str):
+        """Increment a statistics counter."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _fetch(self, key: str, query: str, fetch: Callable[[str], list[dict]]) -> list[dict]:
+        """Single-flight upstream call: the first caller fetches, concurrent callers wait for its result."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            self._count("upstream_calls")
+            results = fetch(query)
+            self._store.set(key, json.dumps(results, ensure_ascii=False).encode("utf-8"), ttl=self.ttl_seconds)
+            future.set_result(results)
+            return results
+        except Exception as error:
+            self._count("upstream_errors")
+            future.set_exception(error)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _revalidate(self, key: str, query: str, fetch: Callable[[str], list[dict]]):
+        """Refresh a stale entry on a background thread unless a refresh is already running."""
+        with self._lock:
+            if key in self._in_flight:
+                return
+            self.revalidations += 1
+
+        def refresh():
+            try:
+                self._fetch(key, query, fetch)
+            except Exception:
+                # The stale entry keeps being served; the next lookup retries
+                pass
+
+        threading.Thread(target=refresh, name="precedent-revalidate", daemon=True).start()
+
+    def get_or_fetch(self, query: str, sources: list[str], fetch: Callable[[str], list[dict]]) -> list[dict]:
+        """
+        Return cached results for the query, calling `fetch` only when needed.
+
+        Args:
+            query (str): Precedent search query.
+            sources (list[str]): Trusted domains the results are filtered to.
+            fetch (Callable[[str], list[dict]]): Upstream search, called with the query.
+
+        Returns:
+            list[dict]: Search results.
+        """
+        key = self.key(query, sources)
+        entry = self._store.get_entry(key, include_expired=True)
+        stale = None
+        if entry is not None:
+            value, _, expires_at = entry
+            results = json.loads(value)
+            if expires_at is None or expires_at > time.time():
+                self._count("hits")
+                return results
+            if self.stale_while_revalidate:
+                self._count("stale_hits")
+                self._revalidate(key, query, fetch)
+                return results
+            stale = results
+
+        self._count("misses")
+        try:
+            return self._fetch(key, query, fetch)
+        except Exception:
+            # Stale-if-error: an outdated answer beats a failed crew run
+            if stale is not None:
+                return stale
+            raise
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters and upstream call savings.
+
+        Returns:
+            dict: Counters plus `hit_rate`, `upstream_calls_saved` and stored `entries`.
+        """
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            stats = {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "upstream_calls": self.upstream_calls,
+                "revalidations": self.revalidations,
+                "upstream_errors": self.upstream_errors,
+                "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+                # Lookups answered without an upstream call of their own
+                "upstream_calls_saved": self.hits + self.stale_hits + self.coalesced,
+            }
+        stats.update(self._store.stats())
+        return stats
+
+
+_precedent_cache = None
+_precedent_cache_lock = threading.Lock()
+
+
+def get_precedent_search_cache() -> PrecedentSearchCache | None:
+    """
+    Return the process-wide precedent search cache, or None when PRECEDENT_CACHE_ENABLED is "false".
+
+    Configured by PRECEDENT_CACHE_TTL_HOURS (default 72), PRECEDENT_CACHE_STALE_HOURS
+    (default 168; how long after expiry an entry may still be served),
+    PRECEDENT_CACHE_SWR (default true) and PRECEDENT_CACHE_MAX_ENTRIES (default 2000).
+
+    Returns:
+        PrecedentSearchCache | None: The shared cache.
+    """
+    global _precedent_cache
+    if os.getenv("PRECEDENT_CACHE_ENABLED", "true").lower() == "false":
+        return None
+
+    if _precedent_cache is None:
+        with _precedent_cache_lock:
+            if _precedent_cache is None:
+                _precedent_cache = PrecedentSearchCache(
+                    os.path.join(default_cache_dir(), "precedent_searches.sqlite"),
+                    ttl_seconds=float(os.getenv("PRECEDENT_CACHE_TTL_HOURS", "72")) * 3600,
+                    stale_seconds=float(os.getenv("PRECEDENT_CACHE_STALE_HOURS", "168")) * 3600,
+                    stale_while_revalidate=os.getenv("PRECEDENT_CACHE_SWR", "true").lower() != "false",
+                    max_entries=int(os.getenv("PRECEDENT_CACHE_MAX_ENTRIES", "2000")),
+                )
+    return _precedent_cache
@@ -0,0 +1,193 @@
+# sqlite_store.py
+
+import os
+import sqlite3
+import threading
+import time
+
+
+def default_cache_dir() -> str:
+    """
+    Directory for persistent caches, from NYAY_CACHE_DIR or `.nyay_cache` in the project root.
+
+    Returns:
+        str: Existing cache directory path.
+    """
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    cache_dir = os.getenv("NYAY_CACHE_DIR") or os.path.join(project_root, ".nyay_cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+class SQLiteStore:
+    """
+    Persistent key/value store on SQLite with optional TTL and LRU eviction.
+
+    Values are raw bytes; callers choose the encoding. Entries can be capped by
+    count and by total value size, in which case the least recently accessed
+    entries are evicted first. One connection is shared behind a lock, and WAL
+    mode lets several processes (e.g. Streamlit workers) use the same file.
+    Expired entries are purged once they are older than their TTL plus
+    `expired_grace` seconds, which lets callers still serve them as stale.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str = "entries",
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        expired_grace: float = 0.0,
+    ):
+        if not table.isidentifier():
+            raise ValueError(f"❌ Invalid cache table name '{table}'.")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.expired_grace = expired_grace
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                expires_at REAL
+            )
+            """
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str, include_expired: bool = False) -> bytes | None:
+        """
+        Return the stored value and mark it as recently used.
+
+        Args:
+            key (str): Entry key.
+            include_expired (bool): Return the value even if its TTL has passed.
+
+        Returns:
+            bytes | None: The value, or None on a miss.
+        """
+        entry = self.get_entry(key, include_expired=include_expired)
+        return entry[0] if entry else None
+
+    def get_entry(self, key: str, include_expired: bool = False) -> tuple[bytes, float, float | None] | None:
+        """
+        Return the stored value with its creation and expiry times.
+
+        Args:
+            key (str): Entry key.
+            include_expired (bool): Return the entry even if its TTL has passed.
+
+        Returns:
+            tuple[bytes, float, float | None] | None: (value, created_at, expires_at), or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at, expires_at = row
+            if expires_at is not None and expires_at <= now and not include_expired:
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return bytes(value), created_at, expires_at
+
+    def set(self, key: str, value: bytes, ttl: float | None = None):
+        """
+        Store a value, replacing any previous one, then enforce the size caps.
+
+        Args:
+            key (str): Entry key.
+            value (bytes): Value to store.
+            ttl (float | None): Seconds until the entry expires; None keeps it until evicted.
+        """
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, size, created_at, accessed_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now, expires_at),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def delete(self, key: str):
+        """Remove an entry if present."""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def keys(self) -> list[str]:
+        """All keys currently stored, including expired ones."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(f"SELECT key FROM {self.table}")]
+
+    def items(self) -> list[tuple[str, bytes]]:
+        """
+        All unexpired entries, without touching their recency.
+
+        Returns:
+            list[tuple[str, bytes]]: (key, value) pairs.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, value FROM {self.table} WHERE expires_at IS NULL OR expires_at > ?", (time.time(),)
+            ).fetchall()
+        return [(key, bytes(value)) for key, value in rows]
+
+    def stats(self) -> dict:
+        """
+        Entry count and total stored bytes.
+
+        Returns:
+            dict: `entries` and `bytes`.
+        """
+        with self._lock:
+            entries, size = self._conn.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}").fetchone()
+        return {"entries": entries, "bytes": size}
+
+    def _evict(self, now: float):
+        """Drop expired entries, then least recently used ones until within the caps. Caller holds the lock."""
+        self._conn.execute(
+            f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (now - self.expired_grace,)
+        )
+
+        if self.max_entries is not None:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+        if self.max_bytes is not None:
+            total = self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+            if total > self.max_bytes:
+                # Walk from the least recently used entry until enough bytes are freed
+                freed, doomed = 0, []
+                for key, size in self._conn.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed_at ASC"):
+                    if total - freed <= self.max_bytes:
+                        break
+                    doomed.append((key,))
+                    freed += size
+                self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", doomed)
@@ -0,0 +1,120 @@
+# task_cache.py
+
+import hashlib
+import json
+import os
+import threading
+
+from cache.sqlite_store import SQLiteStore, default_cache_dir
+
+
+def task_cache_key(task, context: str) -> str:
+    """
+    Content address of a task execution.
+
+    Covers everything that can change the task's output: its interpolated
+    description and expected output, the upstream context it receives, and the
+    executing agent's prompt, model, sampling settings and tools.
+
+    Args:
+        task (Task): CrewAI task, already interpolated with the crew inputs.
+        context (str): Aggregated raw outputs of its context tasks.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    agent = task.agent
+    llm = getattr(agent, "llm", None)
+    payload = {
+        "task": {
+            "name": task.name,
+            "description": task.description,
+            "expected_output": task.expected_output,
+        },
+        "context": context,
+        "agent": {
+            "role": agent.role,
+            "goal": agent.goal,
+            "backstory": agent.backstory,
+            "model": getattr(llm, "model", None),
+            "temperature": getattr(llm, "temperature", None),
+            "tools": sorted(tool.name for tool in agent.tools or []),
+        },
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class TaskOutputCache:
+    """
+    Persistent, content-addressed cache of individual task outputs.
+
+    Keys come from `task_cache_key()`, so a cached output is reused only when
+    the task, its upstream outputs and its agent configuration are unchanged.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 24 * 3600, max_entries: int = 2000):
+        self.ttl_seconds = ttl_seconds
+        self._store = SQLiteStore(path, table="task_outputs", max_entries=max_entries)
+
+    def get(self, key: str) -> dict | None:
+        """
+        Look up a task output.
+
+        Args:
+            key (str): Key from `task_cache_key()`.
+
+        Returns:
+            dict | None: Stored TaskOutput fields, or None on a miss.
+        """
+        blob = self._store.get(key)
+        return json.loads(blob) if blob is not None else None
+
+    def put(self, key: str, output) -> dict:
+        """
+        Store a task output.
+
+        Args:
+            key (str): Key from `task_cache_key()`.
+            output (TaskOutput): Output of the executed task.
+
+        Returns:
+            dict: The stored TaskOutput fields.
+        """
+        fields = {
+            "name": output.name,
+            "description": output.description,
+            "expected_output": output.expected_output,
+            "summary": output.summary,
+            "raw": output.raw,
+            "agent": output.agent,
+        }
+        self._store.set(key, json.dumps(fields, ensure_ascii=False).encode("utf-8"), ttl=self.ttl_seconds)
+        return fields
+
+
+_task_cache = None
+_task_cache_lock = threading.Lock()
+
+
+def get_task_output_cache() -> TaskOutputCache | None:
+    """
+    Return the process-wide task output cache, or None when TASK_CACHE_ENABLED is "false".
+
+    Configured by TASK_CACHE_TTL_HOURS (default 24) and TASK_CACHE_MAX_ENTRIES (default 2000).
+
+    Returns:
+        TaskOutputCache | None: The shared cache.
+    """
+    global _task_cache
+    if os.getenv("TASK_CACHE_ENABLED", "true").lower() == "false":
+        return None
+
+    if _task_cache is None:
+        with _task_cache_lock:
+            if _task_cache is None:
+                _task_cache = TaskOutputCache(
+                    os.path.join(default_cache_dir(), "task_outputs.sqlite"),
+                    ttl_seconds=float(os.getenv("TASK_CACHE_TTL_HOURS", "24")) * 3600,
+                    max_entries=int(os.getenv("TASK_CACHE_MAX_ENTRIES", "2000")),
+                )
+    return _task_cache
@@ -1,19 +1,410 @@
 # crew.py
 
+import os
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
 from crewai import Crew
+from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.formatter import aggregate_raw_outputs_from_task_outputs
 
 from agents.case_intake_agent import case_intake_agent
 from agents.ipc_section_agent import ipc_section_agent
 from agents.legal_precedent_agent import legal_precedent_agent
 from agents.legal_drafter_agent import legal_drafter_agent
+from agents.llm import set_branch_cancellation
+from cache.crew_result_cache import crew_version, get_crew_result_cache, serialize_crew_output
+from cache.task_cache import get_task_output_cache, task_cache_key
+from retrieval.ipc_retriever import get_ipc_retriever
 from tasks.case_intake_task import case_intake_task
 from tasks.ipc_section_task import ipc_section_task
 from tasks.legal_precedent_task import legal_precedent_task
 from tasks.legal_drafter_task import legal_drafter_task
 
+# Tasks whose outputs may be reused from a near-duplicate case. The legal
+# research carries over, but the intake summary names one case's parties and
+# facts and the draft is written from it, so both always run for the new case.
+NEAR_DUPLICATE_TASKS = ("ipc_section", "legal_precedent")
+
+# Event callback of the run executing on the current thread; stream chunks are
+# emitted synchronously on the thread making the LLM call, so concurrent runs stay separate
+_stream_target = threading.local()
+
+
+@crewai_event_bus.on(LLMStreamChunkEvent)
+def _forward_stream_chunk(source, event):
+    """Forward LLM tokens to the event callback of the run that requested them."""
+    on_event = getattr(_stream_target, "on_event", None)
+    if on_event is not None and event.chunk and event.tool_call is None:
+        on_event({"type": "token", "task": event.task_name, "text": event.chunk})
+
+
+class LegalAssistantCrew(Crew):
+    """
+    Crew whose task outputs are memoized and whose independent tasks can run concurrently.
+
+    Every task output is cached under a content address of its inputs, its
+    upstream context and its agent configuration, so retrying after a
+    downstream failure, or regenerating only the draft, reuses upstream results.
+
+    In parallel mode tasks are grouped into stages by their declared context:
+    after case intake, the IPC section and precedent branches fan out on a
+    thread pool, each with its own timeout, and are joined before drafting.
+
+    An optional `on_event` callback receives a `task_completed` event as soon
+    as each task output is available and `token` events for agents whose LLM
+    streams, which lets the UI render results progressively.
+    """
+
+    @property
+    def task_names(self) -> list[str]:
+        """Names of the crew's tasks in execution order."""
+        return [task.name for task in self.tasks]
+
+    def _dependencies(self, task) -> list:
+        """Tasks whose output this task receives: its declared context, else every earlier task."""
+        if isinstance(task.context, list):
+            return task.context
+        return self.tasks[:self.tasks.index(task)]
+
+    def _execute_task(
+        self,
+        task,
+        context: str,
+        key: str,
+        cache,
+        on_event=None,
+        cancelled=None,
+        publish_lock=None,
+    ) -> tuple[TaskOutput, float]:
+        """
+        Execute one task, cache its output, publish its completion and report how long it took.
+
+        Once `cancelled` is set (the branch timed out), the task makes no
+        further LLM calls and its tokens, output and completion are dropped.
+        The flag is set and checked under `publish_lock`, so nothing is
+        published after the caller has reported the timeout.
+        """
+        cancelled = cancelled or threading.Event()
+        publish_lock = publish_lock or threading.Lock()
+
+        def publish(event: dict):
+            with publish_lock:
+                if not cancelled.is_set():
+                    on_event(event)
+
+        start = time.perf_counter()
+        _stream_target.on_event = publish if on_event is not None else None
+        set_branch_cancellation(cancelled)
+        try:
+            output = task.execute_sync(agent=task.agent, context=context, tools=task.agent.tools)
+        finally:
+            _stream_target.on_event = None
+            set_branch_cancellation(None)
+        with publish_lock:
+            if not cancelled.is_set():
+                if cache is not None:
+                    cache.put(key, output)
+                if on_event is not None:
+                    on_event({"type": "task_completed", "task": task.name, "raw": output.raw, "cached": False})
+        return output, time.perf_counter() - start
+
+    def kickoff_memoized(
+        self,
+        inputs: dict,
+        rerun_from: str | None = None,
+        parallel: bool | None = None,
+        branch_timeouts: dict[str, float] | None = None,
+        timings: dict | None = None,
+        on_event: Callable[[dict], None] | None = None,
+        reuse: dict[str, str] | None = None,
+    ) -> CrewOutput:
+        """
+        Run the tasks, reusing cached task outputs where possible.
+
+        Args:
+            inputs (dict): Crew inputs, e.g. {"user_input": ...}.
+            rerun_from (str | None): Name of the first task to execute fresh;
+                it and every later task bypass the cache. Upstream tasks are
+                still served from cache when available.
+            parallel (bool | None): Run independent tasks concurrently. Defaults
+                to the CREW_PARALLEL environment variable, then True.
+            branch_timeouts (dict[str, float] | None): Per-task timeout in seconds
+                for concurrently running branches. Defaults to
+                CREW_BRANCH_TIMEOUT_SECONDS (180) for every branch.
+            timings (dict | None): If given, filled with `total_seconds`, per-task
+                `tasks` seconds, `cached` task names, branch `errors` and `mode`.
+            on_event (Callable[[dict], None] | None): Receives `task_completed`
+                events (`task`, `raw`, `cached`, optional `error`) and streamed
+                `token` events (`task`, `text`). Called from worker threads.
+            reuse (dict[str, str] | None): Raw outputs to use for these tasks
+                instead of running them, e.g. from a near-duplicate case.
+                Ignored for tasks at or after `rerun_from`.
+
+        Returns:
+            CrewOutput: Output of the final task plus every task output.
+        """
+        if rerun_from is not None and rerun_from not in self.task_names:
+            raise ValueError(f"❌ Unknown task '{rerun_from}'. Use one of {self.task_names}.")
+        if parallel is None:
+            parallel = os.getenv("CREW_PARALLEL", "true").lower() != "false"
+        default_timeout = float(os.getenv("CREW_BRANCH_TIMEOUT_SECONDS", "180"))
+        branch_timeouts = branch_timeouts or {}
+
+        cache = get_task_output_cache()
+        fresh = set(self.task_names[self.task_names.index(rerun_from):]) if rerun_from else set()
+        reuse = {name: raw for name, raw in (reuse or {}).items() if name not in fresh}
+        self._interpolate_inputs(inputs)
+
+        start = time.perf_counter()
+        outputs: dict[str, TaskOutput] = {}
+        task_seconds: dict[str, float] = {}
+        cached_names: list[str] = []
+        errors: dict[str, str] = {}
+
+        # Timed-out branches cannot be killed, so never wait for the pool on exit;
+        # they are flagged instead, and whatever they produce later is dropped
+        pool = ThreadPoolExecutor(max_workers=len(self.tasks), thread_name_prefix="crew-branch")
+        publish_lock = threading.Lock()
+        try:
+            remaining = list(self.tasks)
+            while remaining:
+                if parallel:
+                    stage = [
+                        task for task in remaining
+                        if all(dep.name in outputs for dep in self._dependencies(task))
+                    ]
+                else:
+                    stage = remaining[:1]
+                if not stage:
+                    raise RuntimeError("❌ Task context graph has a cycle.")
+
+                running = {}
+                for task in stage:
+                    context = aggregate_raw_outputs_from_task_outputs(
+                        [outputs[dep.name] for dep in self._dependencies(task)]
+                    )
+                    key = task_cache_key(task, context)
+
+                    cached = cache.get(key) if cache is not None and task.name not in fresh else None
+                    if cached is None and task.name in reuse:
+                        # Stored like an executed output so regenerating the draft finds it
+                        cached = {"description": task.description, "name": task.name, "agent": task.agent.role, "raw": reuse[task.name]}
+                        if cache is not None:
+                            cache.put(key, TaskOutput(**cached))
+                    if cached is not None:
+                        outputs[task.name] = task.output = TaskOutput(**cached)
+                        task_seconds[task.name] = 0.0
+                        cached_names.append(task.name)
+                        if on_event is not None:
+                            on_event({"type": "task_completed", "task": task.name, "raw": task.output.raw, "cached": True})
+                    else:
+                        cancelled = threading.Event()
+                        running[task.name] = (
+                            task,
+                            pool.submit(self._execute_task, task, context, key, cache, on_event, cancelled, publish_lock),
+                            cancelled,
+                        )
+
+                # A failed branch must not take down the others when several run side by side
+                is_fan_out = len(stage) > 1
+                stage_start = time.monotonic()
+                for name, (task, future, cancelled) in running.items():
+                    timeout = branch_timeouts.get(name, default_timeout) if is_fan_out else None
+                    wait_for = None if timeout is None else max(0.0, stage_start + timeout - time.monotonic())
+                    try:
+                        outputs[name], task_seconds[name] = future.result(timeout=wait_for)
+                    except Exception as error:
+                        if not is_fan_out:
+                            raise
+                        if isinstance(error, FutureTimeoutError):
+                            with publish_lock:
+                                cancelled.set()
+                        reason = "timed out" if isinstance(error, FutureTimeoutError) else str(error) or type(error).__name__
+                        errors[name] = reason
+                        task_seconds[name] = time.monotonic() - stage_start
+                        outputs[name] = TaskOutput(
+                            description=task.description,
+                            name=name,
+                            agent=task.agent.role,
+                            raw=f"⚠️ The {name.replace('_', ' ')} step was unavailable for this request ({reason}).",
+                        )
+                        if on_event is not None:
+                            on_event({
+                                "type": "task_completed", "task": name, "raw": outputs[name].raw,
+                                "cached": False, "error": reason,
+                            })
+
+                stage_names = {task.name for task in stage}
+                remaining = [task for task in remaining if task.name not in stage_names]
+        finally:
+            pool.shutdown(wait=False)
+
+        if timings is not None:
+            timings.update({
+                "total_seconds": time.perf_counter() - start,
+                "tasks": task_seconds,
+                "cached": cached_names,
+                "errors": errors,
+                "mode": "parallel" if parallel else "sequential",
+            })
 
-legal_assistant_crew = Crew(
+        completed = [outputs[name] for name in self.task_names]
+        return CrewOutput(
+            raw=completed[-1].raw,
+            tasks_output=completed,
+            token_usage=self.calculate_usage_metrics(),
+        )
+
+    def rerun_from(self, task_name: str, inputs: dict) -> CrewOutput:
+        """
+        Re-execute `task_name` and everything after it, reusing cached upstream outputs.
+
+        Args:
+            task_name (str): e.g. "legal_drafter" to regenerate only the draft.
+            inputs (dict): The crew inputs of the original run.
+
+        Returns:
+            CrewOutput: Output of the rerun.
+        """
+        return self.kickoff_memoized(inputs, rerun_from=task_name)
+
+    def copy(self) -> "LegalAssistantCrew":
+        """
+        Independent crew with copies of the agents and tasks.
+
+        Tasks hold per-run state (interpolated descriptions, outputs), so runs
+        that overlap in time, such as Streamlit sessions or batch workers,
+        each need their own copy.
+
+        Returns:
+            LegalAssistantCrew: A crew with its own agent and task objects.
+        """
+        clone = super().copy()
+        for copied, original in zip(clone.agents, self.agents):
+            # Copying an LLM rebuilds it as a plain crewai LLM; the clients are safe to share
+            copied.llm = original.llm
+        for copied, original in zip(clone.tasks, self.tasks):
+            # Copies drop the templates, so restore them in case this crew already ran
+            copied.description = original._original_description or original.description
+            copied.expected_output = original._original_expected_output or original.expected_output
+        return LegalAssistantCrew(agents=clone.agents, tasks=clone.tasks, verbose=self.verbose)
+
+
+legal_assistant_crew = LegalAssistantCrew(
     agents=[case_intake_agent, ipc_section_agent, legal_precedent_agent, legal_drafter_agent],
     tasks=[case_intake_task, ipc_section_task, legal_precedent_task, legal_drafter_task],
     verbose=True
-)
\ No newline at end of file
+)
+
+
+def run_legal_assistant(
+    user_input: str,
+    rerun_from: str | None = None,
+    on_event: Callable[[dict], None] | None = None,
+    crew: LegalAssistantCrew | None = None,
+) -> dict:
+    """
+    Run the legal assistant crew on a case description, serving repeats from cache.
+
+    Args:
+        user_input (str): The user's legal issue in plain English.
+        rerun_from (str | None): Task name to regenerate from; skips the
+            whole-result cache and reuses cached upstream task outputs.
+        on_event (Callable[[dict], None] | None): Progress callback, see
+            `LegalAssistantCrew.kickoff_memoized()`. Cache hits publish every
+            task at once.
+        crew (LegalAssistantCrew | None): Crew to run, e.g. a per-thread
+            `legal_assistant_crew.copy()` reused across a worker's runs.
+            Defaults to a fresh copy of `legal_assistant_crew`, since tasks
+            hold per-run state that concurrent sessions must not share.
+
+    Returns:
+        dict: `final_output`, per-task `tasks` outputs, `cached` (an identical
+            case was served from cache) and wall-clock `timings`. Results
+            served or built from the whole-result cache also carry `match`
+            ("exact" or "similar") and `similarity`; for a similar case only
+            the NEAR_DUPLICATE_TASKS outputs are reused and the draft is written fresh.
+    """
+    start = time.perf_counter()
+    crew = crew if crew is not None else legal_assistant_crew.copy()
+    version = crew_version(crew)
+
+    # Near-duplicate matching reuses the already warm IPC query embeddings
+    cache = get_crew_result_cache(embeddings=get_ipc_retriever().embeddings)
+
+    similar = None
+    if cache is not None and rerun_from is None:
+        cached = cache.lookup(user_input, version, similar_tasks=NEAR_DUPLICATE_TASKS)
+        if cached is not None and cached["match"] == "exact":
+            if on_event is not None:
+                for task in cached["tasks"]:
+                    on_event({"type": "task_completed", "task": task["name"], "raw": task["raw"], "cached": True})
+            return {**cached, "cached": True, "timings": {"total_seconds": time.perf_counter() - start}}
+        similar = cached
+
+    timings = {}
+    result = crew.kickoff_memoized(
+        inputs={"user_input": user_input},
+        rerun_from=rerun_from,
+        timings=timings,
+        on_event=on_event,
+        reuse={task["name"]: task["raw"] for task in similar["tasks"]} if similar is not None else None,
+    )
+    output = serialize_crew_output(result)
+
+    # Never cache a result that is missing a branch, so the next request retries it
+    if cache is not None and not timings["errors"]:
+        cache.store(user_input, output, version)
+
+    if similar is not None:
+        output.update(match="similar", similarity=similar["similarity"])
+    return {**output, "cached": False, "timings": timings}
+
+
+def stream_legal_assistant(user_input: str, rerun_from: str | None = None) -> Iterator[dict]:
+    """
+    Run the legal assistant on a background thread and yield its progress as it happens.
+
+    Args:
+        user_input (str): The user's legal issue in plain English.
+        rerun_from (str | None): Task name to regenerate from, as in `run_legal_assistant()`.
+
+    Yields:
+        dict: `task_completed` and `token` events (see `LegalAssistantCrew.kickoff_memoized()`),
+            then one `result` event whose `result` is the `run_legal_assistant()` return value.
+            `first_output_seconds` on the result timings measures time to the first completed task.
+
+    Raises:
+        Exception: Whatever the crew run raised.
+    """
+    events = queue.Queue()
+    start = time.perf_counter()
+
+    def worker():
+        try:
+            result = run_legal_assistant(user_input, rerun_from=rerun_from, on_event=events.put)
+            events.put({"type": "result", "result": result})
+        except Exception as error:
+            events.put({"type": "error", "error": error})
+
+    threading.Thread(target=worker, name="legal-assistant-run", daemon=True).start()
+
+    first_output_seconds = None
+    while True:
+        event = events.get()
+        if event["type"] == "error":
+            raise event["error"]
+        if event["type"] == "task_completed" and first_output_seconds is None:
+            first_output_seconds = time.perf_counter() - start
+        if event["type"] == "result":
+            event["result"]["timings"]["first_output_seconds"] = first_output_seconds
+            yield event
+            return
+        yield event
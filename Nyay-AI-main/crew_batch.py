@@ -0,0 +1,359 @@
+# crew_batch.py
+#
+# Headless bulk run of the Legal Assistant crew over an intake queue: a
+# JSONL file with one {"id": ..., "user_input": ...} case per line. Cases
+# run concurrently, each worker on its own copy of the crew, and all of them
+# draw from the process-wide Groq and Tavily rate limiters. Every task output
+# is appended to the output JSONL as soon as it is ready, followed by one
+# result line per case, so the output doubles as the checkpoint: rerunning
+# the same command skips cases that already finished.
+#
+# Example:
+#   python crew_batch.py intake/queue.jsonl --output runs/queue.results.jsonl --concurrency 4 --retries 3
+
+import argparse
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from dotenv import load_dotenv
+
+from cache.llm_response_cache import get_llm_response_cache
+from crew import legal_assistant_crew, run_legal_assistant
+from gateway.llm_gateway import get_llm_gateway
+from quota.rate_limiter import get_rate_limiter
+
+
+RATE_LIMITS = (("groq", "requests"), ("groq", "tokens"), ("tavily", "requests"))
+MAX_BACKOFF_SECONDS = 60.0
+
+
+def read_cases(path: str) -> Iterator[dict]:
+    """
+    Cases from a JSONL intake file.
+
+    Args:
+        path (str): One JSON object per line with `user_input` and an optional
+            `id` (defaults to the line number). Blank lines are skipped.
+
+    Yields:
+        dict: `id` and `user_input`, or `id` and `error` for an unusable line.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as error:
+                yield {"id": line_number, "error": f"invalid JSON: {error}"}
+                continue
+            case_id = record.get("id", line_number) if isinstance(record, dict) else line_number
+            user_input = record.get("user_input") if isinstance(record, dict) else None
+            if not isinstance(user_input, str) or not user_input.strip():
+                yield {"id": case_id, "error": "missing user_input"}
+            else:
+                yield {"id": case_id, "user_input": user_input}
+
+
+class CaseLog:
+    """
+    Append-only JSONL of task outputs and case results that doubles as the resume point.
+
+    A case counts as done once an "ok" result line with its id exists; failed
+    and partial cases run again on the next invocation. Lines are flushed and
+    fsynced as they are written, so a killed run loses at most the cases in flight.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.done: set[str] = set()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A run killed mid-write leaves a partial last line
+                        continue
+                    if record.get("type") == "result":
+                        if record.get("status") == "ok":
+                            self.done.add(str(record["id"]))
+                        else:
+                            self.done.discard(str(record["id"]))
+        self._file = open(path, "a", encoding="utf-8")
+
+    def is_done(self, case_id) -> bool:
+        """Whether a case already finished successfully."""
+        return str(case_id) in self.done
+
+    def write(self, record: dict):
+        """Append one line and make it durable."""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            if record.get("type") == "result" and record.get("status") == "ok":
+                self.done.add(str(record["id"]))
+
+    def close(self):
+        """Close the output file."""
+        self._file.close()
+
+
+def percentile(samples: list[float], q: float) -> float | None:
+    """Nearest-rank percentile (q in 0-100) of the samples, or None if there are none."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def run_case(
+    case: dict,
+    log: CaseLog,
+    crew,
+    max_retries: int = 3,
+    base_delay: float = 2.0,
+) -> dict:
+    """
+    Run one case, retrying failures and partial results with jittered exponential backoff.
+
+    Each task output is written to the log as it completes. A retry reuses
+    every task output the earlier attempt already produced (task output
+    cache), so only the failed branch and what depends on it run again.
+
+    Args:
+        case (dict): `id` and `user_input` from `read_cases()`.
+        log (CaseLog): Output receiving "task" lines; the caller writes the result.
+        crew (LegalAssistantCrew): The calling worker's own crew copy.
+        max_retries (int): Extra attempts after the first.
+        base_delay (float): Backoff before the first retry, in seconds.
+
+    Returns:
+        dict: The case's "result" record; status "ok", "partial" (a branch was
+            still unavailable after the last attempt) or "failed".
+    """
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        attempt += 1
+
+        def write_task(event: dict, attempt: int = attempt):
+            if event["type"] == "task_completed":
+                log.write({"type": "task", "id": case["id"], "attempt": attempt, **{
+                    key: value for key, value in event.items() if key != "type"
+                }})
+
+        record = {"type": "result", "id": case["id"]}
+        try:
+            result = run_legal_assistant(case["user_input"], on_event=write_task, crew=crew)
+        except Exception as error:
+            record.update(status="failed", error=str(error) or type(error).__name__)
+        else:
+            errors = result["timings"].get("errors", {})
+            record.update(
+                status="partial" if errors else "ok",
+                final_output=result["final_output"],
+                cached=result["cached"],
+                errors=errors,
+                task_seconds=result["timings"].get("tasks", {}),
+            )
+
+        if record["status"] == "ok" or attempt > max_retries:
+            break
+        time.sleep(min(MAX_BACKOFF_SECONDS, base_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+
+    record.update(attempts=attempt, seconds=round(time.perf_counter() - start, 3))
+    return record
+
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    concurrency: int = 4,
+    max_retries: int = 3,
+    base_delay: float = 2.0,
+    limit: int | None = None,
+    verbose: bool = False,
+    on_case: Callable[[dict, dict], None] | None = None,
+) -> dict:
+    """
+    Run the Legal Assistant crew over every pending case of an intake file.
+
+    Up to `concurrency` cases run at once, each with its independent branches
+    fanned out. LLM calls go through the shared LLM gateway (budgets
+    GROQ_REQUESTS_PER_MINUTE and GROQ_TOKENS_PER_MINUTE, off unless set) and
+    Tavily calls wait on TAVILY_REQUESTS_PER_MINUTE. A summary is written next to the output
+    as <output>.summary.json.
+
+    Args:
+        input_path (str): JSONL intake file, see `read_cases()`.
+        output_path (str): JSONL receiving "task" and "result" lines.
+        concurrency (int): Cases run concurrently.
+        max_retries (int): Extra attempts per failed or partial case.
+        base_delay (float): Backoff before the first retry, in seconds.
+        limit (int | None): Run at most this many pending cases.
+        verbose (bool): Keep CrewAI's per-agent console output.
+        on_case (Callable[[dict, dict], None] | None): Called with each
+            case's result record and the running totals.
+
+    Returns:
+        dict: Totals: `cases`, `ok`, `partial`, `failed`, `skipped`, `cached`,
+            `retries`, `seconds`, `cases_per_minute`, latency percentiles
+            `latency_p50`/`latency_p95`/`latency_p99` (seconds per case,
+            retries included), `rate_limits` (waits per API budget),
+            `llm_calls` (LLM gateway counters per agent) and, when the LLM
+            response cache is enabled, `llm_cache` (its hits and tokens saved).
+    """
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    log = CaseLog(output_path)
+    totals = {"cases": 0, "ok": 0, "partial": 0, "failed": 0, "skipped": 0, "cached": 0, "retries": 0}
+    latencies = []
+
+    pending = []
+    for case in read_cases(input_path):
+        if log.is_done(case["id"]):
+            totals["skipped"] += 1
+        elif limit is None or len(pending) < limit:
+            pending.append(case)
+
+    # Tasks carry per-run state, so every worker thread gets its own crew
+    crews = threading.local()
+
+    def run_on_worker(case: dict) -> dict:
+        if "error" in case:
+            return {"type": "result", "id": case["id"], "status": "failed", "error": case["error"], "attempts": 0, "seconds": 0.0}
+        if not hasattr(crews, "crew"):
+            crews.crew = legal_assistant_crew.copy()
+            crews.crew.verbose = verbose
+            for agent in crews.crew.agents:
+                agent.verbose = verbose
+        return run_case(case, log, crews.crew, max_retries=max_retries, base_delay=base_delay)
+
+    start = time.perf_counter()
+    workers = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="crew-case")
+    try:
+        cases = iter(pending)
+        running = set()
+        while True:
+            # Submit lazily so an interrupt leaves nothing queued behind the cases in flight
+            while len(running) < max(1, concurrency):
+                case = next(cases, None)
+                if case is None:
+                    break
+                running.add(workers.submit(run_on_worker, case))
+            if not running:
+                break
+
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                record = future.result()
+                totals["cases"] += 1
+                totals[record["status"]] += 1
+                totals["cached"] += int(bool(record.get("cached")))
+                totals["retries"] += max(0, record["attempts"] - 1)
+                if record["attempts"]:
+                    latencies.append(record["seconds"])
+                log.write(record)
+                if on_case:
+                    on_case(record, totals)
+    finally:
+        workers.shutdown(wait=True, cancel_futures=True)
+        log.close()
+
+    totals["seconds"] = round(time.perf_counter() - start, 3)
+    totals["cases_per_minute"] = round(totals["cases"] / totals["seconds"] * 60, 2) if totals["seconds"] else 0.0
+    for q in (50, 95, 99):
+        totals[f"latency_p{q}"] = percentile(latencies, q)
+    totals["rate_limits"] = {
+        f"{name} {unit}": limiter.stats()
+        for name, unit in RATE_LIMITS
+        if (limiter := get_rate_limiter(name, unit)) is not None
+    }
+    totals["llm_calls"] = get_llm_gateway().stats()["callers"]
+    llm_cache = get_llm_response_cache()
+    if llm_cache is not None:
+        totals["llm_cache"] = llm_cache.stats()
+    with open(f"{os.path.splitext(output_path)[0]}.summary.json", "w", encoding="utf-8") as file:
+        json.dump(totals, file, indent=2)
+    return totals
+
+
+def main(argv: Iterable[str] | None = None):
+    """Command-line entry point."""
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Run the Legal Assistant crew over a JSONL file of cases.")
+    parser.add_argument("cases", help="JSONL file with one {\"id\", \"user_input\"} case per line")
+    parser.add_argument("--output", required=True, help="JSONL file for task outputs and case results")
+    parser.add_argument("--concurrency", type=int, default=4, help="Cases run concurrently")
+    parser.add_argument("--retries", type=int, default=3, help="Extra attempts per failed or partial case")
+    parser.add_argument("--backoff", type=float, default=2.0, help="Seconds before the first retry, doubled per retry")
+    parser.add_argument("--limit", type=int, default=None, help="Run at most this many pending cases")
+    parser.add_argument("--verbose", action="store_true", help="Show CrewAI's agent output")
+    args = parser.parse_args(argv)
+
+    if not os.getenv("GROQ_API_KEY"):
+        raise EnvironmentError("❌ Set GROQ_API_KEY in your environment or .env file.")
+
+    def report_progress(record: dict, totals: dict):
+        if record["status"] == "failed":
+            print(f"❌ [{totals['cases']}] case {record['id']}: {record['error']}", flush=True)
+        else:
+            icon = "✅" if record["status"] == "ok" else "⚠️"
+            print(
+                f"{icon} [{totals['cases']}] case {record['id']}: {record['status']} in {record['seconds']:.1f}s "
+                f"({record['attempts']} attempt{'s' if record['attempts'] != 1 else ''}"
+                f"{', cached' if record.get('cached') else ''})", flush=True,
+            )
+
+    totals = run_batch(
+        args.cases,
+        args.output,
+        concurrency=args.concurrency,
+        max_retries=args.retries,
+        base_delay=args.backoff,
+        limit=args.limit,
+        verbose=args.verbose,
+        on_case=report_progress,
+    )
+
+    def seconds(value: float | None) -> str:
+        return "n/a" if value is None else f"{value:.1f}s"
+
+    print(
+        f"✅ Ran {totals['cases']} cases ({totals['ok']} ok, {totals['partial']} partial, {totals['failed']} failed, "
+        f"{totals['skipped']} already done) in {totals['seconds']:.1f}s: {totals['cases_per_minute']:.1f} cases/min, "
+        f"{totals['retries']} retries, {totals['cached']} served from cache"
+    )
+    print(
+        f"⏳ Latency per case: p50 {seconds(totals['latency_p50'])}, p95 {seconds(totals['latency_p95'])}, "
+        f"p99 {seconds(totals['latency_p99'])}"
+    )
+    for name, stats in totals["rate_limits"].items():
+        print(f"⏳ {name}: {stats['acquired']} acquired, {stats['waits']} waited {stats['waited_seconds']:.1f}s in total")
+    for caller, stats in totals["llm_calls"].items():
+        print(
+            f"⏳ {caller}: {stats['requests']} LLM requests, {stats['retries']} retries "
+            f"({stats['rate_limited']} rate limited), {stats['tokens']:,} tokens"
+        )
+    if "llm_cache" in totals:
+        stats = totals["llm_cache"]
+        print(
+            f"✅ LLM response cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%}), {stats['tokens_saved']:,} tokens saved"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+# llm_gateway.py
+#
+# The single path to Groq for the whole process. The crew agents (through
+# LiteLLM) and the Document Scanner (through the Groq SDK) share one pooled
+# HTTP client, one requests-per-minute and one tokens-per-minute budget, and
+# one view of the server's rate limiting: a 429 anywhere pauses every caller
+# for the Retry-After period and slows the request budget down until calls
+# succeed again. Failed calls are retried with jittered exponential backoff,
+# and each caller ("scanner", "case_intake", ...) has its own cap on
+# concurrent requests so a bulk scan cannot starve the Legal Assistant.
+
+import os
+import random
+import re
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+import httpx
+from groq import APIConnectionError, APITimeoutError, Groq
+
+from quota.rate_limiter import get_rate_limiter
+
+
+# Rough characters per token for budgeting before the real usage is known
+CHARS_PER_TOKEN = 4
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+# Groq's reset headers look like "7.66s", "2m59.56s" or "450ms"
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+DURATION_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def estimate_tokens(content, completion_tokens: int = 0) -> int:
+    """
+    Approximate token count of a prompt plus the expected completion.
+
+    Args:
+        content (str | list[dict]): Prompt text or chat messages.
+        completion_tokens (int): Completion tokens to budget for.
+
+    Returns:
+        int: Estimated tokens.
+    """
+    if isinstance(content, str):
+        characters = len(content)
+    else:
+        characters = sum(len(str(message.get("content") or "")) for message in content)
+    return characters // CHARS_PER_TOKEN + completion_tokens
+
+
+def parse_duration(value: str | None) -> float | None:
+    """Seconds in a Retry-After ("12") or Groq reset ("1m2.5s") header value."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        parts = DURATION_PART.findall(value)
+        return sum(float(number) * DURATION_SECONDS[unit] for number, unit in parts) if parts else None
+
+
+def retry_after(error: Exception) -> float | None:
+    """
+    Seconds the server asked us to wait, from a Groq SDK or LiteLLM error.
+
+    Uses Retry-After, falling back to the later of Groq's request and token
+    budget reset headers.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or getattr(error, "litellm_response_headers", None) or {}
+    delay = parse_duration(headers.get("retry-after"))
+    if delay is None:
+        resets = [parse_duration(headers.get(name)) for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")]
+        resets = [reset for reset in resets if reset is not None]
+        delay = max(resets) if resets else None
+    return delay
+
+
+def status_code(error: Exception) -> int | None:
+    """HTTP status of a failed call, if it got that far."""
+    code = getattr(error, "status_code", None)
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, server errors, timeouts and dropped connections are worth retrying."""
+    if isinstance(error, (APIConnectionError, APITimeoutError, httpx.TransportError)):
+        return True
+    code = status_code(error)
+    if code is not None:
+        return code in RETRYABLE_STATUS
+    # LiteLLM reports connection failures and timeouts without a status
+    return type(error).__name__ in ("APIConnectionError", "Timeout", "ServiceUnavailableError", "InternalServerError")
+
+
+class GatewayRequest:
+    """
+    One logical LLM request holding a concurrency slot and a token reservation.
+
+    Created by `LLMGateway.request()`. `send()` performs the HTTP call with
+    retries; `record_usage()` settles the token budget with the real usage.
+    """
+
+    def __init__(self, gateway: "LLMGateway", caller: str, estimated_tokens: int):
+        self.gateway = gateway
+        self.caller = caller
+        self.estimated_tokens = estimated_tokens
+        self.used_tokens: int | None = None
+        self.attempts = 0
+
+    def send(self, function: Callable, *args, max_retries: int | None = None, base_delay: float | None = None, **kwargs):
+        """
+        Call `function(*args, **kwargs)` under the request budget, retrying transient failures.
+
+        Every attempt takes a request from the budget and waits out any pause
+        a 429 has put on the gateway. Retries back off exponentially with
+        jitter, never sooner than the server's Retry-After.
+
+        Args:
+            function (Callable): The client call, e.g. `client.chat.completions.create`.
+            max_retries (int | None): Defaults to LLM_MAX_RETRIES (5).
+            base_delay (float | None): First backoff in seconds; defaults to LLM_RETRY_BASE_SECONDS (1).
+
+        Returns:
+            Whatever `function` returns.
+        """
+        gateway = self.gateway
+        max_retries = gateway.max_retries if max_retries is None else max_retries
+        base_delay = gateway.base_delay if base_delay is None else base_delay
+        for attempt in range(max_retries + 1):
+            gateway.wait_for_turn(self.caller)
+            self.attempts += 1
+            try:
+                result = function(*args, **kwargs)
+            except Exception as error:
+                retryable = is_retryable(error)
+                gateway.record_failure(self.caller, error, retrying=retryable and attempt < max_retries)
+                if attempt == max_retries or not retryable:
+                    raise
+                # Retry-After is a floor; jittered backoff keeps callers from retrying in lockstep
+                backoff = base_delay * 2 ** attempt * random.uniform(0.5, 1.5)
+                time.sleep(max(retry_after(error) or 0.0, backoff))
+            else:
+                gateway.record_success(self.caller)
+                return result
+
+    def record_usage(self, tokens: int | None):
+        """Report the tokens the request really used (prompt and completion)."""
+        if tokens:
+            self.used_tokens = (self.used_tokens or 0) + tokens
+
+
+class LLMGateway:
+    """
+    Shared HTTP pool, budgets, backoff and per-caller concurrency for Groq calls.
+
+    Use `request()` around every call; `groq_client()` and `litellm_client()`
+    hand out clients on the shared connection pool.
+
+    Args:
+        max_connections (int): Pooled HTTP connections.
+        timeout (float): Read timeout in seconds.
+        caller_concurrency (int): Default concurrent requests per caller.
+        max_retries (int): Default retries per request.
+        base_delay (float): Default first backoff in seconds.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 32,
+        timeout: float = 60.0,
+        caller_concurrency: int = 8,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+    ):
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(timeout, connect=10.0),
+        )
+        self.caller_concurrency = caller_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self._lock = threading.Lock()
+        self._slots: dict[str, threading.BoundedSemaphore] = {}
+        self._stats: dict[str, dict] = {}
+        self._resume_at = 0.0
+        self._groq_client = None
+        self._litellm_client = None
+
+    def groq_client(self) -> Groq:
+        """
+        Groq SDK client on the shared pool, configured from OPENAI_API_KEY and the optional GROQ_BASE_URL.
+
+        The SDK's own retries are disabled; `GatewayRequest.send()` retries instead.
+        """
+        with self._lock:
+            if self._groq_client is None:
+                self._groq_client = Groq(
+                    api_key=os.getenv("OPENAI_API_KEY"),
+                    base_url=os.getenv("GROQ_BASE_URL") or None,
+                    max_retries=0,
+                    http_client=self.http_client,
+                )
+            return self._groq_client
+
+    def litellm_client(self):
+        """LiteLLM HTTP handler on the shared pool, passed to `litellm.completion(client=...)`."""
+        with self._lock:
+            if self._litellm_client is None:
+                from litellm.llms.custom_httpx.http_handler import HTTPHandler
+
+                self._litellm_client = HTTPHandler(client=self.http_client)
+            return self._litellm_client
+
+    def _caller_stats(self, caller: str) -> dict:
+        stats = self._stats.get(caller)
+        if stats is None:
+            stats = self._stats[caller] = {
+                "requests": 0, "attempts": 0, "retries": 0, "rate_limited": 0, "failed": 0,
+                "estimated_tokens": 0, "tokens": 0, "in_flight": 0,
+            }
+        return stats
+
+    def _slot(self, caller: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._slots.get(caller)
+            if slot is None:
+                limit = int(os.getenv(f"LLM_CONCURRENCY_{caller.upper()}", str(self.caller_concurrency)))
+                slot = self._slots[caller] = threading.BoundedSemaphore(max(1, limit))
+            return slot
+
+    @contextmanager
+    def request(self, caller: str, estimated_tokens: int = 0) -> Iterator[GatewayRequest]:
+        """
+        Hold one of the caller's concurrency slots and reserve tokens for a request.
+
+        The slot is held until the block exits, so a streamed response counts
+        as in flight until it has been read. On exit the token budget is
+        corrected by the difference between the estimate and the usage
+        reported with `GatewayRequest.record_usage()`.
+
+        Args:
+            caller (str): Who is calling, e.g. "scanner" or "case_intake";
+                capped by LLM_CONCURRENCY_<CALLER> concurrent requests.
+            estimated_tokens (int): Tokens to reserve, see `estimate_tokens()`.
+
+        Yields:
+            GatewayRequest: Use its `send()` for the HTTP call.
+        """
+        slot = self._slot(caller)
+        slot.acquire()
+        request = GatewayRequest(self, caller, estimated_tokens)
+        tokens = get_rate_limiter("groq", "tokens")
+        try:
+            with self._lock:
+                stats = self._caller_stats(caller)
+                stats["requests"] += 1
+                stats["in_flight"] += 1
+                stats["estimated_tokens"] += estimated_tokens
+            if tokens is not None and estimated_tokens:
+                tokens.acquire(estimated_tokens)
+            yield request
+        finally:
+            if tokens is not None and request.used_tokens is not None:
+                tokens.adjust(request.used_tokens - estimated_tokens)
+            with self._lock:
+                stats = self._caller_stats(caller)
+                stats["in_flight"] -= 1
+                stats["tokens"] += request.used_tokens or 0
+            slot.release()
+
+    def wait_for_turn(self, caller: str):
+        """Wait out a 429 pause, then take one request from the budget."""
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        requests = get_rate_limiter("groq", "requests")
+        if requests is not None:
+            requests.acquire()
+        with self._lock:
+            self._caller_stats(caller)["attempts"] += 1
+
+    def record_success(self, caller: str):
+        """Let a rate slowed down by earlier 429s creep back up."""
+        requests = get_rate_limiter("groq", "requests")
+        if requests is not None:
+            requests.recover()
+
+    def record_failure(self, caller: str, error: Exception, retrying: bool):
+        """Count a failed attempt; a 429 pauses every caller and slows the request budget."""
+        rate_limited = status_code(error) == 429
+        if rate_limited:
+            pause = retry_after(error) or self.base_delay
+            with self._lock:
+                self._resume_at = max(self._resume_at, time.monotonic() + pause)
+            requests = get_rate_limiter("groq", "requests")
+            if requests is not None:
+                requests.slow_down()
+        with self._lock:
+            stats = self._caller_stats(caller)
+            stats["rate_limited"] += int(rate_limited)
+            stats["retries" if retrying else "failed"] += 1
+
+    def stats(self) -> dict:
+        """Per-caller counters plus the state of the shared request and token budgets."""
+        with self._lock:
+            callers = {caller: dict(stats) for caller, stats in self._stats.items()}
+        budgets = {
+            unit: limiter.stats()
+            for unit in ("requests", "tokens")
+            if (limiter := get_rate_limiter("groq", unit)) is not None
+        }
+        return {"callers": callers, "budgets": budgets}
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """
+    Return the process-wide LLM gateway.
+
+    Configured by LLM_MAX_CONNECTIONS (default 32), LLM_TIMEOUT_SECONDS (60),
+    LLM_CALLER_CONCURRENCY (8, overridable per caller with
+    LLM_CONCURRENCY_<CALLER>), LLM_MAX_RETRIES (5) and LLM_RETRY_BASE_SECONDS
+    (1); request and token budgets are off unless GROQ_REQUESTS_PER_MINUTE
+    and GROQ_TOKENS_PER_MINUTE are set.
+
+    Returns:
+        LLMGateway: The shared gateway.
+    """
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway(
+                    max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "32")),
+                    timeout=float(os.getenv("LLM_TIMEOUT_SECONDS", "60")),
+                    caller_concurrency=int(os.getenv("LLM_CALLER_CONCURRENCY", "8")),
+                    max_retries=int(os.getenv("LLM_MAX_RETRIES", "5")),
+                    base_delay=float(os.getenv("LLM_RETRY_BASE_SECONDS", "1")),
+                )
+    return _gateway
@@ -1,13 +1,18 @@
 # ipc_vectordb_builder.py
 
+import hashlib
 import json
 import os
+import time
 
 from dotenv import load_dotenv
 from langchain_community.docstore.document import Document
 from langchain_chroma import Chroma
 from langchain_huggingface import HuggingFaceEmbeddings
 
+from retrieval.bm25_index import BM25Index
+from retrieval.numpy_index import NumpyVectorIndex
+
 
 def load_ipc_data(file_path: str) -> list[dict]:
     """
@@ -47,10 +52,74 @@ def prepare_documents(ipc_data: list[dict]) -> list[Document]:
     ]
 
 
+def document_id(doc: Document) -> str:
+    """
+    Stable vectorstore ID for an IPC document, derived from its section number.
+
+    Args:
+        doc (Document): Document produced by `prepare_documents()`.
+
+    Returns:
+        str: ID such as "ipc-379" or "ipc-498A".
+    """
+    return f"ipc-{doc.metadata['section']}"
+
+
+def document_hash(doc: Document) -> str:
+    """
+    Content hash of an IPC document; changes whenever its text or metadata change.
+
+    Args:
+        doc (Document): Document produced by `prepare_documents()`.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    payload = json.dumps({"page_content": doc.page_content, "metadata": doc.metadata}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_manifest(manifest_path: str) -> dict[str, str]:
+    """
+    Load the document ID -> content hash manifest of the last successful build.
+
+    Args:
+        manifest_path (str): Path to the manifest JSON file.
+
+    Returns:
+        dict[str, str]: Manifest entries, empty if no build has been recorded yet.
+    """
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_manifest(manifest_path: str, manifest: dict[str, str]):
+    """
+    Atomically write the build manifest.
+
+    Args:
+        manifest_path (str): Path to the manifest JSON file.
+        manifest (dict[str, str]): Document ID -> content hash.
+    """
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
 def build_ipc_vectordb():
     """
-    Build and persist a Chroma vectorstore for IPC sections.
+    Build or incrementally update the persisted Chroma vectorstore for IPC sections.
+
+    Each section is stored under a stable ID and its content hash is recorded in a
+    manifest next to the collection. Only added or changed sections are embedded
+    and upserted, and sections removed from the JSON are deleted, so a rebuild
+    with no changes does not load the embedding model at all.
     """
+    start = time.perf_counter()
+
     # Load environment variables
     load_dotenv()
     ipc_json_path = os.getenv("IPC_JSON_PATH")
@@ -60,21 +129,103 @@ def build_ipc_vectordb():
     if not all([ipc_json_path, persist_dir_path, collection_name]):
         raise EnvironmentError("❌ Missing one or more required environment variables.")
 
+    # Load and process data
+    ipc_data = load_ipc_data(ipc_json_path)
+    documents = {document_id(doc): doc for doc in prepare_documents(ipc_data)}
+    hashes = {doc_id: document_hash(doc) for doc_id, doc in documents.items()}
+
+    manifest_path = os.path.join(persist_dir_path, f"{collection_name}_manifest.json")
+    manifest = load_manifest(manifest_path)
+
+    # Reconcile against what is actually stored; this also clears out duplicates
+    # left behind by older builds that used random document IDs
+    vector_db = Chroma(collection_name=collection_name, persist_directory=persist_dir_path)
+    stored_ids = set(vector_db.get(include=[])["ids"])
+
+    removed_ids = sorted(stored_ids - documents.keys())
+    changed_ids = sorted(
+        doc_id for doc_id in documents
+        if doc_id not in stored_ids or manifest.get(doc_id) != hashes[doc_id]
+    )
+
+    if removed_ids:
+        vector_db.delete(ids=removed_ids)
+
+    if changed_ids:
+        # The embedding model is only loaded when there is something to embed
+        embeddings = HuggingFaceEmbeddings()
+        vector_db = Chroma(
+            collection_name=collection_name,
+            persist_directory=persist_dir_path,
+            embedding_function=embeddings
+        )
+        vector_db.add_documents([documents[doc_id] for doc_id in changed_ids], ids=changed_ids)
+
+    save_manifest(manifest_path, hashes)
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"✅ Vectorstore '{collection_name}' at '{persist_dir_path}' is up to date: "
+        f"{len(changed_ids)} embedded, {len(removed_ids)} removed, "
+        f"{len(documents) - len(changed_ids)} unchanged ({elapsed:.2f}s)"
+    )
+
+
+def build_ipc_numpy_index():
+    """
+    Build and persist the in-memory NumPy index used by the "numpy" search backend.
+    """
+    # Load environment variables
+    load_dotenv()
+    ipc_json_path = os.getenv("IPC_JSON_PATH")
+    index_dir_path = os.getenv("IPC_NUMPY_INDEX_PATH")
+
+    if not all([ipc_json_path, index_dir_path]):
+        raise EnvironmentError("❌ Missing one or more required environment variables.")
+
     # Load and process data
     ipc_data = load_ipc_data(ipc_json_path)
     documents = prepare_documents(ipc_data)
 
-    # Initialize embeddings and vectorstore
-    embeddings = HuggingFaceEmbeddings()
-    Chroma.from_documents(
-        documents=documents,
-        embedding=embeddings,
-        persist_directory=persist_dir_path,
-        collection_name=collection_name
+    # Reuse vectors from the previous build for sections whose content is unchanged
+    previous = NumpyVectorIndex.load(index_dir_path) if NumpyVectorIndex.exists(index_dir_path) else None
+    to_embed = previous.missing_documents(documents) if previous is not None else documents
+
+    embeddings = HuggingFaceEmbeddings() if to_embed else None
+    index = NumpyVectorIndex.from_documents(documents, embeddings, previous=previous)
+    index.save(index_dir_path)
+
+    print(f"✅ NumPy index with {len(documents)} sections saved at '{index_dir_path}' ({len(to_embed)} embedded)")
+
+
+def build_ipc_bm25_index():
+    """
+    Build and persist the BM25 inverted index used for hybrid IPC search.
+    """
+    # Load environment variables
+    load_dotenv()
+    ipc_json_path = os.getenv("IPC_JSON_PATH")
+    index_file_path = os.getenv("IPC_BM25_INDEX_PATH")
+
+    if not all([ipc_json_path, index_file_path]):
+        raise EnvironmentError("❌ Missing one or more required environment variables.")
+
+    # Index titles and descriptions; section numbers are matched exactly at query time
+    ipc_data = load_ipc_data(ipc_json_path)
+    index = BM25Index.from_texts(
+        [f"{entry['section_title']}\n{entry['section_desc']}" for entry in ipc_data],
+        [entry["Section"] for entry in ipc_data]
     )
+    index.save(index_file_path)
 
-    print(f"✅ Vectorstore successfully created in collection '{collection_name}' at '{persist_dir_path}'")
+    print(f"✅ BM25 index over {len(ipc_data)} sections saved at '{index_file_path}'")
 
 
 if __name__ == "__main__":
-    build_ipc_vectordb()
\ No newline at end of file
+    build_ipc_vectordb()
+
+    # The NumPy backend and hybrid search are optional; build them only when configured
+    if os.getenv("IPC_NUMPY_INDEX_PATH"):
+        build_ipc_numpy_index()
+    if os.getenv("IPC_BM25_INDEX_PATH"):
+        build_ipc_bm25_index()
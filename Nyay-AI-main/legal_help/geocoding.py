@@ -0,0 +1,55 @@
+# geocoding.py
+
+import threading
+
+from geopy.geocoders import Nominatim
+
+from cache.location_cache import get_geocode_cache
+
+
+USER_AGENT = "nyay_ai_legal_v3"
+
+_geolocator = None
+_geolocator_lock = threading.Lock()
+
+
+def get_geolocator() -> Nominatim:
+    """
+    Return the shared Nominatim geocoder.
+
+    Returns:
+        Nominatim: Geocoder restricted by the caller to Indian results.
+    """
+    global _geolocator
+    if _geolocator is None:
+        with _geolocator_lock:
+            if _geolocator is None:
+                _geolocator = Nominatim(user_agent=USER_AGENT, timeout=10)
+    return _geolocator
+
+
+def geocode_location(location: str, use_cache: bool = True) -> dict | None:
+    """
+    Resolve a typed location (city, address or pincode) in India to coordinates.
+
+    Results, including "not found", are cached by normalized location text,
+    so popular cities are geocoded once per GEOCODE_CACHE_TTL_HOURS.
+
+    Args:
+        location (str): Location as typed by the user.
+        use_cache (bool): Read and update the persistent geocoding cache.
+
+    Returns:
+        dict | None: `lat`, `lon` and `address`, or None if the location was not found.
+    """
+    cache = get_geocode_cache() if use_cache else None
+    if cache is not None:
+        cached, result = cache.get(location)
+        if cached:
+            return result
+
+    found = get_geolocator().geocode(location, country_codes="in")
+    result = {"lat": found.latitude, "lon": found.longitude, "address": found.address} if found else None
+    if cache is not None:
+        cache.put(location, result)
+    return result
@@ -0,0 +1,216 @@
+# overpass.py
+#
+# Nearby legal services from the OpenStreetMap Overpass API for the Find
+# Legal Help page. Every category is fetched in a single union query (one
+# output statement per category, so each keeps its own result limit) over a
+# pooled keep-alive session, and the elements are split back into
+# categories locally by their tags. Results are cached per geohash tile and
+# category, so repeat searches in a city never reach Overpass, and areas
+# covered by the offline POI index (poi_index.py) never need it at all.
+
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from cache.location_cache import get_poi_cache
+from legal_help.places import LEGAL_HELP_CATEGORIES, element_categories, element_to_place, nearest_places
+from legal_help.poi_index import get_poi_index
+
+
+OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+USER_AGENT = "nyay_ai_legal_v3"
+
+# Results kept per category, as in the per-category queries this replaces
+RESULTS_PER_CATEGORY = 100
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_overpass_session() -> requests.Session:
+    """
+    Return the process-wide keep-alive session used for Overpass requests.
+
+    Returns:
+        requests.Session: Shared session with a small connection pool.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.headers["User-Agent"] = USER_AGENT
+                session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=8))
+                session.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=8))
+                _session = session
+    return _session
+
+
+def build_union_query(
+    lat: float,
+    lon: float,
+    radius_km: float,
+    categories: dict[str, dict],
+    limit: int = RESULTS_PER_CATEGORY,
+    timeout: int = 25,
+) -> str:
+    """
+    Build one Overpass QL query covering every category.
+
+    Each category's nodes and ways are collected into a named set and output
+    with its own limit, so a busy category cannot crowd out the others.
+
+    Args:
+        lat (float): Search centre latitude.
+        lon (float): Search centre longitude.
+        radius_km (float): Search radius in kilometres.
+        categories (dict[str, dict]): Category name -> {"tags": ["key=value", ...]}.
+        limit (int): Elements output per category.
+        timeout (int): Server-side query timeout in seconds.
+
+    Returns:
+        str: Overpass QL query.
+    """
+    around = f"around:{radius_km * 1000:g},{lat},{lon}"
+    statements = [f"[out:json][timeout:{timeout}];"]
+    for number, category in enumerate(categories.values()):
+        selectors = " ".join(
+            f"{kind}[{tag}]({around});" for tag in category["tags"] for kind in ("node", "way")
+        )
+        statements.append(f"({selectors})->.c{number};")
+        statements.append(f".c{number} out body center {limit};")
+    return "\n".join(statements)
+
+
+def split_by_category(elements: list[dict], categories: dict[str, dict]) -> dict[str, list[dict]]:
+    """
+    Assign Overpass elements to every category whose tags they carry.
+
+    Args:
+        elements (list[dict]): Elements of a union query response.
+        categories (dict[str, dict]): Category name -> {"tags": [...]}.
+
+    Returns:
+        dict[str, list[dict]]: Elements per category, each element at most once per category.
+    """
+    split = {name: [] for name in categories}
+    seen = set()
+    for element in elements:
+        key = (element.get("type"), element.get("id"))
+        # Overlapping output sets repeat an element
+        if key in seen:
+            continue
+        seen.add(key)
+        for name in element_categories(element, categories):
+            split[name].append(element)
+    return split
+
+
+def query_overpass(
+    lat: float,
+    lon: float,
+    radius_km: float,
+    categories: dict[str, dict] = LEGAL_HELP_CATEGORIES,
+    max_retries: int = 2,
+    timeout: float = 30,
+) -> dict[str, list[dict]] | None:
+    """
+    Fetch the elements of all categories with one Overpass request.
+
+    Rate limiting (429) and gateway timeouts (504, the server's "too busy")
+    are retried after the server's Retry-After or a short jittered backoff.
+
+    Args:
+        lat (float): Search centre latitude.
+        lon (float): Search centre longitude.
+        radius_km (float): Search radius in kilometres.
+        categories (dict[str, dict]): Category name -> {"tags": [...]}.
+        max_retries (int): Retries after the first attempt.
+        timeout (float): HTTP timeout in seconds.
+
+    Returns:
+        dict[str, list[dict]] | None: Raw elements per category, or None
+            when the service could not be reached.
+    """
+    query = build_union_query(lat, lon, radius_km, categories)
+    url = os.getenv("OVERPASS_URL", OVERPASS_URL)
+    session = get_overpass_session()
+
+    for attempt in range(max_retries + 1):
+        try:
+            response = session.post(url, data={"data": query}, timeout=timeout)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+            response = None
+        else:
+            if response.status_code == 200:
+                return split_by_category(response.json().get("elements", []), categories)
+            if response.status_code not in (429, 502, 503, 504):
+                break
+        if attempt < max_retries:
+            try:
+                delay = float(response.headers["Retry-After"])
+            except (AttributeError, KeyError, ValueError):
+                delay = 2 ** attempt * random.uniform(0.5, 1.5)
+            time.sleep(delay)
+
+    return None
+
+
+def search_legal_help(
+    lat: float,
+    lon: float,
+    radius_km: float,
+    categories: dict[str, dict] = LEGAL_HELP_CATEGORIES,
+    use_cache: bool = True,
+    use_index: bool = True,
+) -> dict[str, list[dict]]:
+    """
+    Find legal services of every category around a location.
+
+    A prebuilt offline POI index (POI_INDEX_PATH) answers searches inside its
+    area without any network call. Elsewhere, categories answered by the POI
+    tile cache are filtered locally; the rest are fetched together in one
+    Overpass request and cached. Failed fetches are not cached.
+
+    Args:
+        lat (float): User latitude.
+        lon (float): User longitude.
+        radius_km (float): Search radius in kilometres.
+        categories (dict[str, dict]): Category name -> {"tags": [...], "icon": (color, icon)}.
+        use_cache (bool): Read and update the persistent POI tile cache.
+        use_index (bool): Answer from the offline POI index when it covers the search.
+
+    Returns:
+        dict[str, list[dict]]: Places within the radius per category, nearest
+            first, each with the category's `icon`.
+    """
+    index = get_poi_index() if use_index else None
+    if index is not None and index.covers(lat, lon, radius_km) and set(categories) <= set(index.categories):
+        return index.search(lat, lon, radius_km, categories)
+
+    cache = get_poi_cache() if use_cache else None
+    elements_by_category = {}
+    if cache is not None:
+        for name in categories:
+            cached = cache.get(lat, lon, radius_km, name)
+            if cached is not None:
+                elements_by_category[name] = cached
+
+    missing = {name: category for name, category in categories.items() if name not in elements_by_category}
+    if missing:
+        fetched = query_overpass(lat, lon, radius_km, missing)
+        for name in missing:
+            elements = fetched[name] if fetched is not None else []
+            elements_by_category[name] = elements
+            if cache is not None and fetched is not None:
+                cache.put(lat, lon, radius_km, name, elements, complete=len(elements) < RESULTS_PER_CATEGORY)
+
+    results = {}
+    for name, category in categories.items():
+        places = [place for place in map(element_to_place, elements_by_category[name]) if place is not None]
+        results[name] = nearest_places(places, lat, lon, radius_km, category["icon"])
+    return results
@@ -0,0 +1,123 @@
+# places.py
+#
+# Legal-help categories and the conversion of OpenStreetMap elements into
+# the places shown on the Find Legal Help page. Shared by the Overpass
+# client and the offline POI index, so both rank places identically.
+
+import numpy as np
+
+from cache.location_cache import EARTH_RADIUS_KM, element_position
+
+
+LEGAL_HELP_CATEGORIES = {
+    "👨‍⚖️ Lawyers": {
+        "tags": ["office=lawyer"],
+        "icon": ("blue", "briefcase"),
+    },
+    "🤝 Legal Aid": {
+        "tags": ["office=ngo", "amenity=social_facility"],
+        "icon": ("green", "hands-helping"),
+    },
+    "🚔 Police": {
+        "tags": ["amenity=police"],
+        "icon": ("darkblue", "shield-alt"),
+    },
+    "🏛️ Courts": {
+        "tags": ["amenity=courthouse"],
+        "icon": ("purple", "landmark"),
+    },
+}
+
+
+def element_has_tag(element: dict, tag: str) -> bool:
+    """Whether an element carries a "key=value" tag."""
+    key, _, value = tag.partition("=")
+    return element.get("tags", {}).get(key) == value
+
+
+def element_categories(element: dict, categories: dict[str, dict] = LEGAL_HELP_CATEGORIES) -> list[str]:
+    """
+    Names of every category whose tags an element carries.
+
+    Args:
+        element (dict): Overpass-style element with `tags`.
+        categories (dict[str, dict]): Category name -> {"tags": ["key=value", ...]}.
+
+    Returns:
+        list[str]: Matching category names, in category order.
+    """
+    return [
+        name for name, category in categories.items()
+        if any(element_has_tag(element, tag) for tag in category["tags"])
+    ]
+
+
+def element_to_place(element: dict) -> dict | None:
+    """
+    Turn an Overpass element into a place for the map and list.
+
+    Args:
+        element (dict): Node, or way with a `center`.
+
+    Returns:
+        dict | None: `osm_id`, `name`, `address`, `phone`, `website`, `lat`
+            and `lon`; None for elements without coordinates.
+    """
+    position = element_position(element)
+    if position is None:
+        return None
+
+    tags = element.get("tags", {})
+    address_parts = [tags[key] for key in ("addr:street", "addr:city", "addr:state") if tags.get(key)]
+    return {
+        "osm_id": f"{element.get('type', 'node')}/{element.get('id')}",
+        "name": tags.get("name", tags.get("operator", "Unnamed")),
+        "address": ", ".join(address_parts) if address_parts else "Not available",
+        "phone": tags.get("phone", tags.get("contact:phone", "Not available")),
+        "website": tags.get("website", tags.get("contact:website", "")),
+        "lat": position[0],
+        "lon": position[1],
+    }
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    Great-circle distances from one point to many, vectorized.
+
+    Args:
+        lat (float): Origin latitude.
+        lon (float): Origin longitude.
+        lats (np.ndarray): Target latitudes.
+        lons (np.ndarray): Target longitudes.
+
+    Returns:
+        np.ndarray: Distances in kilometres.
+    """
+    phi1 = np.radians(lat)
+    phi2 = np.radians(np.asarray(lats, dtype=np.float64))
+    dphi = phi2 - phi1
+    dlambda = np.radians(np.asarray(lons, dtype=np.float64) - lon)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def nearest_places(places: list[dict], lat: float, lon: float, radius_km: float, icon: tuple[str, str]) -> list[dict]:
+    """
+    Places within `radius_km` of a point, nearest first, with `distance` (km) and `icon`.
+
+    Args:
+        places (list[dict]): Places from `element_to_place()`.
+        lat (float): User latitude.
+        lon (float): User longitude.
+        radius_km (float): Search radius in kilometres.
+        icon (tuple[str, str]): Marker colour and icon of the category.
+
+    Returns:
+        list[dict]: Matching places.
+    """
+    if not places:
+        return []
+    distances = haversine_km(lat, lon, [place["lat"] for place in places], [place["lon"] for place in places])
+    within = np.flatnonzero(distances <= radius_km)
+    order = within[np.argsort(distances[within], kind="stable")]
+    return [{**places[i], "distance": round(float(distances[i]), 2), "icon": icon} for i in order]
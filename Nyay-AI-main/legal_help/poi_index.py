@@ -0,0 +1,252 @@
+# poi_index.py
+#
+# Offline index of legal-service points of interest (courts, lawyers, police,
+# legal aid) built from an OpenStreetMap extract by poi_index_builder.py.
+# Points are kept as parallel NumPy arrays sorted by a fixed-size lat/lon
+# grid cell, so a radius search reads a few contiguous slices per grid row
+# and ranks the candidates with one vectorized haversine pass.
+
+import json
+import math
+import os
+import threading
+
+import numpy as np
+from dotenv import load_dotenv
+
+from legal_help.places import LEGAL_HELP_CATEGORIES, haversine_km
+
+
+MANIFEST_FILE = "manifest.json"
+ARRAYS_FILE = "poi_index.npz"
+PLACES_FILE = "places.json"
+
+KM_PER_DEGREE_LAT = 111.2
+
+
+class POIIndex:
+    """
+    Grid-bucketed radius search over legal-service places.
+
+    Each row is one (place, category) pair; a place in two categories (e.g.
+    an NGO that is also a social facility listed as legal aid) appears once
+    per category. Rows are ordered by grid cell key `row * columns + column`,
+    so every grid row of a query's bounding box is one contiguous slice.
+
+    Args:
+        lats (np.ndarray): Latitude per row.
+        lons (np.ndarray): Longitude per row.
+        category_codes (np.ndarray): Index into `categories` per row.
+        places (list[dict]): Place details per row, from `element_to_place()`.
+        categories (list[str]): Category names.
+        bounds (tuple[float, float, float, float]): Area covered by the extract
+            as (min_lat, min_lon, max_lat, max_lon).
+        cell_degrees (float): Grid cell size in degrees.
+    """
+
+    def __init__(
+        self,
+        lats: np.ndarray,
+        lons: np.ndarray,
+        category_codes: np.ndarray,
+        places: list[dict],
+        categories: list[str],
+        bounds: tuple[float, float, float, float],
+        cell_degrees: float = 0.02,
+    ):
+        self.categories = list(categories)
+        self.bounds = tuple(bounds)
+        self.cell_degrees = cell_degrees
+        self.columns = math.ceil(360 / cell_degrees)
+
+        keys = self._cell_keys(np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64))
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.lats = np.asarray(lats, dtype=np.float64)[order]
+        self.lons = np.asarray(lons, dtype=np.float64)[order]
+        self.category_codes = np.asarray(category_codes, dtype=np.int8)[order]
+        self.places = [places[i] for i in order]
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def _cells(self, lats: np.ndarray | float, lons: np.ndarray | float) -> tuple:
+        """Grid row and column of points."""
+        rows = np.floor((np.asarray(lats) + 90.0) / self.cell_degrees).astype(np.int64)
+        columns = np.floor((np.asarray(lons) + 180.0) / self.cell_degrees).astype(np.int64)
+        return rows, columns
+
+    def _cell_keys(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        rows, columns = self._cells(lats, lons)
+        return rows * self.columns + columns
+
+    @staticmethod
+    def _degree_span(lat: float, radius_km: float) -> tuple[float, float]:
+        """Latitude and longitude half-widths of a radius, widened for the circle's polar edge."""
+        dlat = radius_km / KM_PER_DEGREE_LAT
+        edge = min(89.9, abs(lat) + dlat)
+        return dlat, radius_km / (KM_PER_DEGREE_LAT * math.cos(math.radians(edge)))
+
+    def covers(self, lat: float, lon: float, radius_km: float) -> bool:
+        """
+        Whether a search circle lies inside the area of the extract.
+
+        Args:
+            lat (float): Search centre latitude.
+            lon (float): Search centre longitude.
+            radius_km (float): Search radius in kilometres.
+
+        Returns:
+            bool: True when the index alone can answer the search.
+        """
+        dlat, dlon = self._degree_span(lat, radius_km)
+        min_lat, min_lon, max_lat, max_lon = self.bounds
+        return min_lat <= lat - dlat and lat + dlat <= max_lat and min_lon <= lon - dlon and lon + dlon <= max_lon
+
+    def candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """
+        Rows in grid cells overlapping the bounding box of a search circle.
+
+        Args:
+            lat (float): Search centre latitude.
+            lon (float): Search centre longitude.
+            radius_km (float): Search radius in kilometres.
+
+        Returns:
+            np.ndarray: Row indices, a superset of the rows within the radius.
+        """
+        dlat, dlon = self._degree_span(lat, radius_km)
+        (first_row, last_row), (first_column, last_column) = self._cells(
+            np.array([lat - dlat, lat + dlat]), np.array([lon - dlon, lon + dlon])
+        )
+        grid_rows = np.arange(first_row, last_row + 1, dtype=np.int64) * self.columns
+        starts = np.searchsorted(self.keys, grid_rows + first_column, side="left")
+        stops = np.searchsorted(self.keys, grid_rows + last_column, side="right")
+        if not len(starts):
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(start, stop) for start, stop in zip(starts, stops)])
+
+    def search(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        categories: dict[str, dict] = LEGAL_HELP_CATEGORIES,
+    ) -> dict[str, list[dict]]:
+        """
+        Places of each category within `radius_km`, nearest first.
+
+        Args:
+            lat (float): User latitude.
+            lon (float): User longitude.
+            radius_km (float): Search radius in kilometres.
+            categories (dict[str, dict]): Category name -> {"icon": (color, icon), ...}.
+
+        Returns:
+            dict[str, list[dict]]: Same shape as `overpass.search_legal_help()`:
+                places with `distance` (km) and the category's `icon`.
+        """
+        rows = self.candidates(lat, lon, radius_km)
+        distances = haversine_km(lat, lon, self.lats[rows], self.lons[rows])
+        within = distances <= radius_km
+        rows, distances = rows[within], distances[within]
+        codes = self.category_codes[rows]
+
+        results = {}
+        for name, category in categories.items():
+            code = self.categories.index(name) if name in self.categories else -1
+            selected = np.flatnonzero(codes == code)
+            selected = selected[np.argsort(distances[selected], kind="stable")]
+            results[name] = [
+                {**self.places[rows[i]], "distance": round(float(distances[i]), 2), "icon": category["icon"]}
+                for i in selected
+            ]
+        return results
+
+    def save(self, index_path: str, **manifest_fields):
+        """
+        Write the index to a directory.
+
+        Args:
+            index_path (str): Output directory.
+            **manifest_fields: Extra metadata for the manifest (e.g. sources).
+        """
+        os.makedirs(index_path, exist_ok=True)
+        np.savez(
+            os.path.join(index_path, ARRAYS_FILE),
+            lats=self.lats,
+            lons=self.lons,
+            category_codes=self.category_codes,
+        )
+        with open(os.path.join(index_path, PLACES_FILE), "w", encoding="utf-8") as file:
+            json.dump(self.places, file, ensure_ascii=False)
+        manifest = {
+            "categories": self.categories,
+            "bounds": list(self.bounds),
+            "cell_degrees": self.cell_degrees,
+            "count": len(self),
+            **manifest_fields,
+        }
+        # The manifest goes last and is replaced atomically: its presence marks a complete index
+        manifest_path = os.path.join(index_path, MANIFEST_FILE)
+        with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as file:
+            json.dump(manifest, file, ensure_ascii=False, indent=2)
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+
+    @classmethod
+    def load(cls, index_path: str) -> "POIIndex":
+        """
+        Load an index written by `save()`.
+
+        Args:
+            index_path (str): Directory written by poi_index_builder.py.
+
+        Returns:
+            POIIndex: The loaded index.
+        """
+        with open(os.path.join(index_path, MANIFEST_FILE), "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+        with open(os.path.join(index_path, PLACES_FILE), "r", encoding="utf-8") as file:
+            places = json.load(file)
+        arrays = np.load(os.path.join(index_path, ARRAYS_FILE))
+        return cls(
+            arrays["lats"],
+            arrays["lons"],
+            arrays["category_codes"],
+            places,
+            manifest["categories"],
+            manifest["bounds"],
+            manifest["cell_degrees"],
+        )
+
+    @staticmethod
+    def exists(index_path: str) -> bool:
+        """Whether a built index is present at `index_path`."""
+        return os.path.exists(os.path.join(index_path, MANIFEST_FILE))
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_poi_index() -> POIIndex | None:
+    """
+    Return the shared offline POI index, or None when none has been built.
+
+    The index is read from POI_INDEX_PATH.
+
+    Returns:
+        POIIndex | None: The process-wide index.
+    """
+    global _index
+    load_dotenv()
+
+    index_path = os.getenv("POI_INDEX_PATH")
+    if not index_path or not POIIndex.exists(index_path):
+        return None
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = POIIndex.load(index_path)
+    return _index
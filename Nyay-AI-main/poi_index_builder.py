@@ -0,0 +1,213 @@
+# poi_index_builder.py
+#
+# Build the offline legal-services POI index from an OpenStreetMap extract,
+# so the Find Legal Help page can answer searches without a public Overpass
+# instance. Accepted inputs:
+#   - Overpass JSON ({"elements": [...]}, ways with `center`)
+#   - OSM XML (.osm), streamed; way centres are computed from their nodes
+#   - PBF (.osm.pbf, e.g. Geofabrik's India extract), if pyosmium is installed
+#
+# Example:
+#   python poi_index_builder.py data/odisha-latest.osm.pbf --index data/poi_index
+
+import argparse
+import json
+import os
+import time
+import xml.etree.ElementTree as ET
+from collections.abc import Iterable, Iterator
+
+from dotenv import load_dotenv
+
+from legal_help.places import LEGAL_HELP_CATEGORIES, element_categories, element_to_place
+from legal_help.poi_index import POIIndex
+
+
+def _bbox_center(points: list[tuple[float, float]]) -> dict | None:
+    """Centre of the bounding box of a way's nodes, as Overpass reports it for `out center`."""
+    if not points:
+        return None
+    lats, lons = [point[0] for point in points], [point[1] for point in points]
+    return {"lat": (min(lats) + max(lats)) / 2, "lon": (min(lons) + max(lons)) / 2}
+
+
+def iter_overpass_json(path: str) -> Iterator[dict]:
+    """Elements of an Overpass JSON response saved to disk."""
+    with open(path, "r", encoding="utf-8") as file:
+        yield from json.load(file).get("elements", [])
+
+
+def _iter_osm_xml_top_level(path: str) -> Iterator[ET.Element]:
+    """
+    Stream the top-level elements (<bounds>, <node>, <way>, ...) of an OSM XML file.
+
+    Each element is complete when yielded and is dropped from the parse tree
+    as soon as the caller moves on, so memory does not grow with the file.
+    """
+    context = ET.iterparse(path, events=("start", "end"))
+    _, root = next(context)
+    depth = 0
+    for event, element in context:
+        if event == "start":
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 0:
+            yield element
+            root.clear()
+
+
+def _tag_dict(element: ET.Element) -> dict:
+    """The <tag> children of an OSM XML element as a dict."""
+    return {tag.get("k"): tag.get("v") for tag in element.findall("tag")}
+
+
+def iter_osm_xml(path: str, bounds: list) -> Iterator[dict]:
+    """
+    Tagged nodes and legal-service ways of an OSM XML file, as Overpass-style elements.
+
+    The file is read twice: first to find the nodes that legal-service ways
+    reference, then to emit elements, keeping only those nodes' coordinates
+    for the way centres. OSM XML lists all nodes before the ways.
+
+    Args:
+        path (str): .osm file.
+        bounds (list): Receives (min_lat, min_lon, max_lat, max_lon) from the
+            file's <bounds> element, if present.
+    """
+    referenced: set[int] = set()
+    for element in _iter_osm_xml_top_level(path):
+        if element.tag == "way" and element_categories({"tags": _tag_dict(element)}):
+            referenced.update(int(nd.get("ref")) for nd in element.findall("nd"))
+
+    coordinates: dict[int, tuple[float, float]] = {}
+    for element in _iter_osm_xml_top_level(path):
+        if element.tag == "bounds":
+            bounds[:] = [float(element.get(key)) for key in ("minlat", "minlon", "maxlat", "maxlon")]
+        elif element.tag == "node":
+            node_id = int(element.get("id"))
+            position = float(element.get("lat")), float(element.get("lon"))
+            if node_id in referenced:
+                coordinates[node_id] = position
+            tags = _tag_dict(element)
+            if tags:
+                yield {"type": "node", "id": node_id, "lat": position[0], "lon": position[1], "tags": tags}
+        elif element.tag == "way":
+            tags = _tag_dict(element)
+            if not element_categories({"tags": tags}):
+                continue
+            points = [coordinates[ref] for ref in (int(nd.get("ref")) for nd in element.findall("nd")) if ref in coordinates]
+            center = _bbox_center(points)
+            if center:
+                yield {"type": "way", "id": int(element.get("id")), "center": center, "tags": tags}
+
+
+def iter_osm_pbf(path: str) -> Iterator[dict]:
+    """Tagged legal-service nodes and ways of a PBF extract, via pyosmium."""
+    try:
+        import osmium
+    except ImportError:
+        raise ImportError("❌ Reading .pbf extracts needs pyosmium: pip install osmium") from None
+
+    wanted = {tag.partition("=")[0] for category in LEGAL_HELP_CATEGORIES.values() for tag in category["tags"]}
+    elements = []
+
+    class Handler(osmium.SimpleHandler):
+        def node(self, node):
+            if any(key in node.tags for key in wanted):
+                elements.append({
+                    "type": "node", "id": node.id, "lat": node.location.lat, "lon": node.location.lon,
+                    "tags": {tag.k: tag.v for tag in node.tags},
+                })
+
+        def way(self, way):
+            if any(key in way.tags for key in wanted):
+                center = _bbox_center([(nd.lat, nd.lon) for nd in way.nodes if nd.location.valid()])
+                if center:
+                    elements.append({"type": "way", "id": way.id, "center": center, "tags": {tag.k: tag.v for tag in way.tags}})
+
+    Handler().apply_file(path, locations=True)
+    yield from elements
+
+
+def iter_elements(file_paths: list[str], bounds: list) -> Iterator[dict]:
+    """Elements of every extract, chosen by file extension."""
+    for path in file_paths:
+        if path.endswith(".pbf"):
+            yield from iter_osm_pbf(path)
+        elif path.endswith((".osm", ".xml")):
+            yield from iter_osm_xml(path, bounds)
+        else:
+            yield from iter_overpass_json(path)
+
+
+def build_poi_index(
+    file_paths: list[str],
+    index_path: str,
+    cell_degrees: float = 0.02,
+    bounds: Iterable[float] | None = None,
+) -> dict:
+    """
+    Build the offline POI index from OSM extracts.
+
+    Args:
+        file_paths (list[str]): Overpass JSON, OSM XML or PBF files.
+        index_path (str): Output directory, later read via POI_INDEX_PATH.
+        cell_degrees (float): Grid cell size in degrees.
+        bounds (Iterable[float] | None): Area the extracts cover as
+            (min_lat, min_lon, max_lat, max_lon). Defaults to the OSM XML
+            <bounds>, else the bounding box of the places found. Searches
+            reaching outside it fall back to Overpass.
+
+    Returns:
+        dict: `places`, `rows` (place/category pairs) and `seconds`.
+    """
+    start = time.perf_counter()
+    categories = list(LEGAL_HELP_CATEGORIES)
+    file_bounds: list = []
+
+    lats, lons, codes, places = [], [], [], []
+    seen = set()
+    for element in iter_elements(file_paths, file_bounds):
+        key = (element.get("type"), element.get("id"))
+        names = element_categories(element)
+        if not names or key in seen:
+            continue
+        place = element_to_place(element)
+        if place is None:
+            continue
+        seen.add(key)
+        for name in names:
+            lats.append(place["lat"])
+            lons.append(place["lon"])
+            codes.append(categories.index(name))
+            places.append(place)
+
+    if bounds is None:
+        bounds = file_bounds or ([min(lats), min(lons), max(lats), max(lons)] if lats else [0.0, 0.0, 0.0, 0.0])
+
+    index = POIIndex(lats, lons, codes, places, categories, tuple(bounds), cell_degrees)
+    index.save(index_path, sources=[os.path.basename(path) for path in file_paths], built_at=int(time.time()))
+    return {"places": len(seen), "rows": len(index), "seconds": time.perf_counter() - start}
+
+
+def main(argv: Iterable[str] | None = None):
+    """Command-line entry point."""
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Build the offline legal-services POI index from OSM extracts.")
+    parser.add_argument("extracts", nargs="+", help="Overpass JSON, OSM XML (.osm) or PBF (.osm.pbf) files")
+    parser.add_argument("--index", default=os.getenv("POI_INDEX_PATH"))
+    parser.add_argument("--cell-degrees", type=float, default=0.02)
+    parser.add_argument("--bounds", type=float, nargs=4, metavar=("MIN_LAT", "MIN_LON", "MAX_LAT", "MAX_LON"))
+    args = parser.parse_args(argv)
+
+    if not args.index:
+        raise EnvironmentError("❌ Set --index or POI_INDEX_PATH.")
+
+    stats = build_poi_index(args.extracts, args.index, cell_degrees=args.cell_degrees, bounds=args.bounds)
+    print(f"✅ POI index built: {stats['places']} places ({stats['rows']} category entries) in {stats['seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+# precedent_corpus_builder.py
+#
+# Ingestion pipeline for the local precedent store. Bulk judgment dumps
+# (JSON arrays or JSONL, e.g. exports of Indian Kanoon or court websites)
+# are streamed, normalized to title/court/date/headnote/citation/link
+# records, de-duplicated and written as fixed-size shards. Each shard holds
+# a NumpyVectorIndex and a BM25 index, so search stays exact and memory-mapped
+# however large the corpus grows. Unchanged shards reuse their embeddings
+# on rebuild. Every build writes a new generation of shard directories and
+# then swaps the manifest, so a running app never reads a file mid-rewrite.
+#
+# Example:
+#   python precedent_corpus_builder.py data/sc_judgments.jsonl data/hc_delhi.json --shard-size 50000
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from collections.abc import Iterable, Iterator
+
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+
+from retrieval.bm25_index import BM25Index
+from retrieval.numpy_index import NumpyVectorIndex
+from retrieval.precedent_store import BM25_FILE, MANIFEST_FILE
+from statute_corpus_builder import _first_field, iter_records
+
+
+# Field names accepted for each part of a judgment record, in order of preference
+TITLE_FIELDS = ("title", "case_title", "case_name", "name")
+COURT_FIELDS = ("court", "court_name", "bench")
+DATE_FIELDS = ("date", "judgment_date", "decision_date", "date_of_judgment")
+HEADNOTE_FIELDS = ("headnote", "head_note", "summary", "abstract", "content")
+CITATION_FIELDS = ("citation", "citations", "neutral_citation")
+LINK_FIELDS = ("link", "url", "source_url")
+
+
+def record_to_precedent(record: dict) -> dict | None:
+    """
+    Normalize a judgment record from a bulk dump.
+
+    Args:
+        record (dict): Source record; see the *_FIELDS tuples for accepted keys.
+
+    Returns:
+        dict | None: `id`, `title`, `court`, `date`, `headnote`, `citation` and
+            `link`, or None when the record has no title or no headnote.
+    """
+    title = _first_field(record, TITLE_FIELDS)
+    headnote = _first_field(record, HEADNOTE_FIELDS)
+    if not title or not headnote:
+        return None
+
+    citation = _first_field(record, CITATION_FIELDS, "")
+    if isinstance(citation, list):
+        citation = "; ".join(str(item) for item in citation)
+    link = _first_field(record, LINK_FIELDS)
+    court = _first_field(record, COURT_FIELDS, "")
+    date = str(_first_field(record, DATE_FIELDS, ""))
+
+    # The same judgment appears in several dumps; its link, else its citation, identifies it
+    identity = link or citation or f"{title}|{court}|{date}"
+    return {
+        "id": hashlib.sha1(identity.strip().lower().encode("utf-8")).hexdigest()[:16],
+        "title": str(title).strip(),
+        "court": str(court).strip(),
+        "date": date.strip(),
+        "headnote": str(headnote).strip(),
+        "citation": str(citation).strip(),
+        "link": link,
+    }
+
+
+def precedent_text(precedent: dict) -> str:
+    """Text embedded and indexed for a precedent: title, court, date, citation and headnote."""
+    header = " | ".join(part for part in (precedent["court"], precedent["date"], precedent["citation"]) if part)
+    return f"{precedent['title']}\n{header}\n\n{precedent['headnote']}"
+
+
+def iter_precedents(file_paths: list[str]) -> Iterator[dict]:
+    """
+    Stream normalized, de-duplicated precedents from every dump.
+
+    Args:
+        file_paths (list[str]): JSON array or JSONL files.
+
+    Yields:
+        dict: Records from `record_to_precedent()`, first occurrence wins.
+    """
+    seen = set()
+    for file_path in file_paths:
+        for record in iter_records(file_path):
+            precedent = record_to_precedent(record)
+            if precedent is None or precedent["id"] in seen:
+                continue
+            seen.add(precedent["id"])
+            yield precedent
+
+
+def iter_shards(precedents: Iterable[dict], shard_size: int) -> Iterator[list[dict]]:
+    """Group precedents into shards of `shard_size`."""
+    shard = []
+    for precedent in precedents:
+        shard.append(precedent)
+        if len(shard) == shard_size:
+            yield shard
+            shard = []
+    if shard:
+        yield shard
+
+
+def shard_name(index: int, generation: int) -> str:
+    """Directory name of the shard at `index` in build `generation`."""
+    return f"shard-{index:05d}-g{generation}"
+
+
+def build_shard(precedents: list[dict], shard_dir: str, embeddings, previous_dir: str | None = None) -> int:
+    """
+    Write the vector and BM25 indexes of one shard.
+
+    Args:
+        precedents (list[dict]): Records of the shard.
+        shard_dir (str): Output directory; must not be a directory in use.
+        embeddings: LangChain embeddings.
+        previous_dir (str | None): The shard's previous build, whose vectors
+            are reused. Must have been built with the same embedding model.
+
+    Returns:
+        int: Number of precedents that had to be embedded (the rest were reused).
+    """
+    documents = [
+        Document(page_content=precedent_text(precedent), metadata=precedent)
+        for precedent in precedents
+    ]
+    # Vectors of precedents already in this shard from the previous build are reused
+    previous = NumpyVectorIndex.load(previous_dir) if previous_dir and NumpyVectorIndex.exists(previous_dir) else None
+    missing = len(previous.missing_documents(documents)) if previous is not None else len(documents)
+
+    index = NumpyVectorIndex.from_documents(documents, embeddings, previous=previous)
+    # Leftovers of an interrupted build under the same name are never read; start clean
+    shutil.rmtree(shard_dir, ignore_errors=True)
+    index.save(shard_dir)
+
+    lexical = BM25Index.from_texts([doc.page_content for doc in documents], [p["id"] for p in precedents])
+    lexical.save(os.path.join(shard_dir, BM25_FILE))
+    return missing
+
+
+def build_precedent_store(
+    file_paths: list[str],
+    store_path: str,
+    embeddings,
+    shard_size: int = 50_000,
+    model_name: str | None = None,
+) -> dict:
+    """
+    Build or refresh the sharded local precedent store.
+
+    Args:
+        file_paths (list[str]): Bulk judgment dumps, JSON array or JSONL.
+        store_path (str): Output directory, later read via PRECEDENT_STORE_PATH.
+        embeddings: LangChain embeddings used for the headnotes.
+        shard_size (int): Precedents per shard.
+        model_name (str | None): Embedding model name recorded in the manifest.
+            Shards built with another model are re-embedded in full.
+
+    Returns:
+        dict: `precedents`, `shards`, `embedded` and `seconds`.
+    """
+    start = time.perf_counter()
+    os.makedirs(store_path, exist_ok=True)
+    manifest_path = os.path.join(store_path, MANIFEST_FILE)
+
+    previous = {"generation": 0, "shards": []}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as file:
+            previous = json.load(file)
+    generation = previous.get("generation", 0) + 1
+
+    count = embedded = 0
+    shards = []
+    for index, shard in enumerate(iter_shards(iter_precedents(file_paths), shard_size)):
+        name = shard_name(index, generation)
+        # Vectors are only comparable within one embedding model, so reuse needs a matching one
+        previous_dir = None
+        if index < len(previous["shards"]):
+            old = previous["shards"][index]
+            if old.get("model", previous.get("model")) == model_name:
+                previous_dir = os.path.join(store_path, old["name"])
+        embedded += build_shard(shard, os.path.join(store_path, name), embeddings, previous_dir=previous_dir)
+        shards.append({"name": name, "count": len(shard), "model": model_name})
+        count += len(shard)
+        print(f"⏳ {name}: {len(shard)} precedents ({count} total)", flush=True)
+
+    # Only now do readers switch to the new shards: the manifest is replaced atomically
+    with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as file:
+        json.dump({"model": model_name, "generation": generation, "count": count, "shards": shards}, file, indent=2)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+
+    # The previous generation stays for readers still loading the old manifest; older ones are stale
+    keep = {shard["name"] for shard in shards} | {shard["name"] for shard in previous["shards"]}
+    for entry in os.listdir(store_path):
+        if entry.startswith("shard-") and entry not in keep:
+            shutil.rmtree(os.path.join(store_path, entry))
+
+    return {"precedents": count, "shards": len(shards), "embedded": embedded, "seconds": time.perf_counter() - start}
+
+
+def main(argv: Iterable[str] | None = None):
+    """Command-line entry point."""
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Build the local precedent store from bulk judgment dumps.")
+    parser.add_argument("dumps", nargs="+", help="JSON array or JSONL judgment files")
+    parser.add_argument("--store", default=os.getenv("PRECEDENT_STORE_PATH"))
+    parser.add_argument("--shard-size", type=int, default=50_000)
+    parser.add_argument("--model", default=None, help="HuggingFace embedding model name")
+    args = parser.parse_args(argv)
+
+    if not args.store:
+        raise EnvironmentError("❌ Set --store or PRECEDENT_STORE_PATH.")
+
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    embeddings = HuggingFaceEmbeddings(model_name=args.model) if args.model else HuggingFaceEmbeddings()
+    stats = build_precedent_store(args.dumps, args.store, embeddings, shard_size=args.shard_size, model_name=args.model)
+    print(
+        f"✅ Precedent store built: {stats['precedents']} precedents in {stats['shards']} shard(s), "
+        f"{stats['embedded']} newly embedded in {stats['seconds']:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
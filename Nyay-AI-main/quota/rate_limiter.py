@@ -0,0 +1,152 @@
+# rate_limiter.py
+#
+# Process-wide token buckets for the external APIs with quotas (Groq chat
+# completions, Tavily search). Every crew, tool call and batch worker in the
+# process draws from the same bucket, so running cases concurrently stays
+# under the account's requests- and tokens-per-minute limits instead of
+# tripping 429s.
+
+import os
+import threading
+import time
+
+
+# Budgets per minute applied when no environment override is set, by (API, unit).
+# Groq budgets are opt-in: paid tiers allow far more than the free tier, and
+# throttling to free-tier limits by default would slow every scan and crew run.
+# On the free tier of llama-3.3-70b-versatile set GROQ_REQUESTS_PER_MINUTE=30
+# and GROQ_TOKENS_PER_MINUTE=12000.
+DEFAULT_PER_MINUTE = {
+    ("tavily", "requests"): 100,
+}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. A caller
+    that finds the bucket short reserves its tokens anyway and sleeps until
+    they have refilled, so waiting callers are served in arrival order and a
+    burst never exceeds `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("❌ Token bucket rate and capacity must be positive.")
+        self.rate = rate
+        self.base_rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.waits = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0, timeout: float | None = None) -> float:
+        """
+        Take tokens, blocking until they are available.
+
+        Args:
+            amount (float): Tokens to take, e.g. 1 per request.
+            timeout (float | None): Longest acceptable wait in seconds.
+
+        Returns:
+            float: Seconds spent waiting.
+
+        Raises:
+            TimeoutError: If the tokens would not be available within `timeout`;
+                nothing is taken in that case.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait_seconds = max(0.0, (amount - self._tokens) / self.rate)
+            if timeout is not None and wait_seconds > timeout:
+                raise TimeoutError(f"❌ Rate limit would delay this call by {wait_seconds:.1f}s.")
+            self._tokens -= amount
+            self.acquired += 1
+            if wait_seconds:
+                self.waits += 1
+                self.waited_seconds += wait_seconds
+        if wait_seconds:
+            time.sleep(wait_seconds)
+        return wait_seconds
+
+    def adjust(self, amount: float):
+        """
+        Correct an earlier acquisition once the real cost is known, without waiting.
+
+        Args:
+            amount (float): Extra tokens to take (positive) or unused ones to
+                give back (negative).
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+    def slow_down(self, factor: float = 0.75, floor: float = 0.25):
+        """Cut the refill rate after the server pushed back, to no less than `floor` x the configured rate."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.base_rate * floor, self.rate * factor)
+
+    def recover(self, step: float = 0.05):
+        """Raise a reduced refill rate back towards the configured one by `step` x that rate."""
+        with self._lock:
+            if self.rate < self.base_rate:
+                self._refill(time.monotonic())
+                self.rate = min(self.base_rate, self.rate + self.base_rate * step)
+
+    def stats(self) -> dict:
+        """Calls served, how many had to wait and the total wait in seconds."""
+        with self._lock:
+            return {
+                "rate_per_minute": round(self.rate * 60, 2),
+                "capacity": self.capacity,
+                "acquired": self.acquired,
+                "waits": self.waits,
+                "waited_seconds": round(self.waited_seconds, 3),
+            }
+
+
+_rate_limiters: dict[tuple[str, str], TokenBucket | None] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, unit: str = "requests") -> TokenBucket | None:
+    """
+    Return the process-wide rate limiter for an API budget, or None when it is disabled.
+
+    Configured by <NAME>_<UNIT>_PER_MINUTE (see DEFAULT_PER_MINUTE; 0, the
+    default for budgets not listed there, disables the limiter), e.g.
+    GROQ_REQUESTS_PER_MINUTE, and
+    <NAME>_<UNIT>_BURST, the most taken back to back (default: one second's
+    worth of requests, at least 1, or a full minute's worth of tokens).
+
+    Args:
+        name (str): API name, e.g. "groq" or "tavily".
+        unit (str): What is budgeted: "requests" or "tokens".
+
+    Returns:
+        TokenBucket | None: The shared bucket.
+    """
+    key = (name, unit)
+    if key not in _rate_limiters:
+        with _rate_limiters_lock:
+            if key not in _rate_limiters:
+                prefix = f"{name}_{unit}".upper()
+                per_minute = float(os.getenv(f"{prefix}_PER_MINUTE", str(DEFAULT_PER_MINUTE.get(key, 0))))
+                if per_minute <= 0:
+                    _rate_limiters[key] = None
+                else:
+                    # Token budgets may be spent at once, as the server's per-minute window allows
+                    default_burst = per_minute if unit == "tokens" else max(1.0, per_minute / 60)
+                    burst = float(os.getenv(f"{prefix}_BURST", str(default_burst)))
+                    _rate_limiters[key] = TokenBucket(per_minute / 60, burst)
+    return _rate_limiters[key]
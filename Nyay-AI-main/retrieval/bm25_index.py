@@ -0,0 +1,208 @@
+# bm25_index.py
+
+import math
+import os
+import re
+
+import numpy as np
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Very common words that carry no lexical signal for statute lookup
+STOPWORDS = frozenset(
+    "a an and any are as at be by for from has have he her his if in into is it its "
+    "of on or shall she such that the their there this to was were which who whoever "
+    "with without".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lowercase the text and split it into alphanumeric tokens, dropping stopwords.
+
+    Args:
+        text (str): Text to tokenize.
+
+    Returns:
+        list[str]: Tokens in document order.
+    """
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 inverted index stored in CSR form.
+
+    Postings for term `t` are `doc_ids[indptr[t]:indptr[t + 1]]` with matching
+    `term_freqs`, so the whole index is a handful of flat integer arrays that
+    save to a single compressed `.npz` file.
+    """
+
+    def __init__(self, vocabulary, indptr, doc_ids, term_freqs, doc_lengths, doc_keys, k1=1.5, b=0.75):
+        self.vocabulary = {str(term): i for i, term in enumerate(vocabulary)}
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.term_freqs = term_freqs
+        self.doc_lengths = doc_lengths
+        self.doc_keys = [str(key) for key in doc_keys]
+        self.k1 = float(k1)
+        self.b = float(b)
+        self.avg_doc_length = float(doc_lengths.mean()) if len(doc_lengths) else 0.0
+
+    @classmethod
+    def from_texts(cls, texts: list[str], doc_keys: list, k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """
+        Build an index over the given texts.
+
+        Args:
+            texts (list[str]): Document texts.
+            doc_keys (list): Identifier for each text, e.g. the IPC section number.
+            k1 (float): BM25 term-frequency saturation.
+            b (float): BM25 length normalization.
+
+        Returns:
+            BM25Index: The built index.
+        """
+        postings: dict[str, dict[int, int]] = {}
+        doc_lengths = np.zeros(len(texts), dtype=np.int32)
+
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths[doc_id] = len(tokens)
+            for token in tokens:
+                term_postings = postings.setdefault(token, {})
+                term_postings[doc_id] = term_postings.get(doc_id, 0) + 1
+
+        vocabulary = sorted(postings)
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        doc_ids, term_freqs = [], []
+        for i, term in enumerate(vocabulary):
+            for doc_id, freq in sorted(postings[term].items()):
+                doc_ids.append(doc_id)
+                term_freqs.append(freq)
+            indptr[i + 1] = len(doc_ids)
+
+        return cls(
+            vocabulary,
+            indptr,
+            np.asarray(doc_ids, dtype=np.int32),
+            np.asarray(term_freqs, dtype=np.uint16),
+            doc_lengths,
+            doc_keys,
+            k1=k1,
+            b=b,
+        )
+
+    def save(self, file_path: str):
+        """
+        Write the index to a compressed `.npz` file.
+
+        Args:
+            file_path (str): Destination path.
+        """
+        vocabulary = sorted(self.vocabulary, key=self.vocabulary.get)
+        # Write through a file handle so NumPy keeps the configured path as-is,
+        # then rename over the old index so readers never see a partial file
+        with open(f"{file_path}.tmp", "wb") as file:
+            np.savez_compressed(
+                file,
+                vocabulary=np.asarray(vocabulary),
+                indptr=self.indptr,
+                doc_ids=self.doc_ids,
+                term_freqs=self.term_freqs,
+                doc_lengths=self.doc_lengths,
+                doc_keys=np.asarray(self.doc_keys),
+                params=np.asarray([self.k1, self.b]),
+            )
+        os.replace(f"{file_path}.tmp", file_path)
+
+    @classmethod
+    def load(cls, file_path: str) -> "BM25Index":
+        """
+        Load an index written by `save()`.
+
+        Args:
+            file_path (str): Path to the `.npz` file.
+
+        Returns:
+            BM25Index: The loaded index.
+        """
+        with np.load(file_path) as data:
+            k1, b = data["params"]
+            return cls(
+                data["vocabulary"],
+                data["indptr"],
+                data["doc_ids"],
+                data["term_freqs"],
+                data["doc_lengths"],
+                data["doc_keys"],
+                k1=k1,
+                b=b,
+            )
+
+    def scores(self, query: str) -> np.ndarray:
+        """
+        BM25 score of every document for the query.
+
+        Args:
+            query (str): Query text.
+
+        Returns:
+            np.ndarray: One float32 score per document.
+        """
+        n_docs = len(self.doc_lengths)
+        scores = np.zeros(n_docs, dtype=np.float32)
+        length_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / max(self.avg_doc_length, 1e-9))
+
+        for token in set(tokenize(query)):
+            term = self.vocabulary.get(token)
+            if term is None:
+                continue
+            start, end = self.indptr[term], self.indptr[term + 1]
+            docs = self.doc_ids[start:end]
+            freqs = self.term_freqs[start:end].astype(np.float32)
+
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            # Each document appears at most once per term, so plain fancy-index addition is safe
+            scores[docs] += idf * freqs * (self.k1 + 1) / (freqs + length_norm[docs])
+
+        return scores
+
+    def top_k(self, query: str, k: int) -> list[tuple[str, float]]:
+        """
+        Return the best matching document keys for the query.
+
+        Args:
+            query (str): Query text.
+            k (int): Maximum number of results.
+
+        Returns:
+            list[tuple[str, float]]: (document key, score) pairs with a positive score, best first.
+        """
+        scores = self.scores(query)
+        k = min(k, int(np.count_nonzero(scores)))
+        if k <= 0:
+            return []
+
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.doc_keys[row], float(scores[row])) for row in order]
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[str]:
+    """
+    Merge several ranked key lists with reciprocal rank fusion.
+
+    Args:
+        rankings (list[list[str]]): Ranked keys from each retriever, best first.
+        k (int): RRF damping constant; 60 is the value from the original paper.
+
+    Returns:
+        list[str]: Keys ordered by fused score, best first.
+    """
+    fused: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking):
+            fused[key] = fused.get(key, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused, key=fused.get, reverse=True)
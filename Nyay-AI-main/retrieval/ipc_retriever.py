@@ -0,0 +1,321 @@
+# ipc_retriever.py
+
+import os
+import re
+import threading
+
+from dotenv import load_dotenv
+from langchain_chroma import Chroma
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from cache.embedding_cache import cached_query_embeddings
+from ipc_vectordb_builder import load_ipc_data, prepare_documents
+from retrieval.bm25_index import BM25Index, reciprocal_rank_fusion
+from retrieval.numpy_index import NumpyVectorIndex
+
+
+# Supported values for the IPC_SEARCH_BACKEND environment variable
+SEARCH_BACKENDS = ("chroma", "numpy")
+
+# How many dense and lexical candidates are fused before truncating to top-k
+FUSION_CANDIDATES = 20
+
+# "section 379", "sections 379, 380 and 411", "u/s 498A", "IPC 302"
+SECTION_LIST_PATTERN = re.compile(
+    r"\b(?:sections?|secs?\.?|u/s\.?|ipc)\s*((?:\d{1,3}[a-z]{0,2}\b(?:\s*(?:,|and|&|/)\s*)?)+)",
+    re.IGNORECASE,
+)
+# "379 IPC", "302 of the IPC"
+SECTION_SUFFIX_PATTERN = re.compile(r"\b(\d{1,3}[a-z]{0,2})\s+(?:of\s+(?:the\s+)?)?ipc\b", re.IGNORECASE)
+SECTION_NUMBER_PATTERN = re.compile(r"\d{1,3}[a-z]{0,2}", re.IGNORECASE)
+# Mentions of the IPC itself
+IPC_CONTEXT_PATTERN = re.compile(r"\b(?:ipc|i\.\s?p\.\s?c\.?|(?:indian\s+)?penal\s+code)(?!\w)", re.IGNORECASE)
+# Mentions of another statute: a named "<Name> Act" ("Negotiable Instruments Act",
+# "NI Act", "N.I. Act"), never a bare "Act" or "the Act", or a common one written in lower case
+OTHER_ACT_PATTERN = re.compile(
+    r"\b(?:(?!(?:The|This|That|An?|Said|Such|Any|Its|His|Her|Their|My|Our|Your)\b)[A-Z][A-Za-z.]*\s+)+Act\b"
+    r"|(?i:\b(?:cr\.?\s?p\.?\s?c|c\.?p\.?c|bnss?|bsa|pocso|ndps|constitution|article"
+    r"|code\s+of\s+(?:criminal|civil)\s+procedure"
+    r"|(?:negotiable\s+instruments|n\.?\s?i|hindu\s+marriage|special\s+marriage|evidence|dowry\s+prohibition"
+    r"|domestic\s+violence|motor\s+vehicles|information\s+technology|it|contract|companies|arms)\s+act)\b)"
+)
+
+
+def section_key(section) -> str:
+    """Normalize an IPC section number (e.g. 379, "498a") to its lookup key."""
+    return str(section).strip().upper()
+
+
+def find_section_references(query: str) -> list[str]:
+    """
+    Extract explicitly named IPC section numbers from a query.
+
+    A bare "section N" only counts as an IPC section when the query mentions
+    the IPC or names no other statute, and never when another Act follows
+    it directly ("section 138 of the Negotiable Instruments Act").
+
+    Args:
+        query (str): User query in natural language.
+
+    Returns:
+        list[str]: Normalized section keys in the order they are mentioned.
+    """
+    ipc_context = IPC_CONTEXT_PATTERN.search(query) is not None
+    if not ipc_context and OTHER_ACT_PATTERN.search(query):
+        return []
+
+    found = []
+    for match in SECTION_LIST_PATTERN.finditer(query):
+        # The statute a reference belongs to is named right after it, before the next reference
+        following = query[match.end():match.end() + 60]
+        following = re.split(r"\b(?:sections?|secs?\.?|u/s)\b", following, maxsplit=1, flags=re.IGNORECASE)[0]
+        if match.group(0).lower().startswith("ipc") or not OTHER_ACT_PATTERN.search(following):
+            found.extend(SECTION_NUMBER_PATTERN.findall(match.group(1)))
+    found.extend(SECTION_SUFFIX_PATTERN.findall(query))
+    return list(dict.fromkeys(section_key(number) for number in found))
+
+
+def format_ipc_document(doc) -> dict:
+    """
+    Convert a retrieved IPC Document into the dict shape returned by the search tool.
+
+    Args:
+        doc (Document): LangChain document produced by `prepare_documents()`.
+
+    Returns:
+        dict: IPC section metadata and content.
+    """
+    return {
+        "section": doc.metadata.get("section"),
+        "section_title": doc.metadata.get("section_title"),
+        "chapter": doc.metadata.get("chapter"),
+        "chapter_title": doc.metadata.get("chapter_title"),
+        "content": doc.page_content
+    }
+
+
+class IPCRetriever:
+    """
+    Long-lived retriever over the IPC sections.
+
+    The embedding model and the search backend are loaded once when the
+    retriever is created and reused for every query afterwards. Any backend
+    exposing `similarity_search_by_vector(embedding, k)` works: the persisted
+    Chroma collection or the in-memory `NumpyVectorIndex`.
+
+    When a BM25 index is supplied the retriever runs in hybrid mode: dense and
+    lexical rankings are merged with reciprocal rank fusion, and queries that
+    name sections explicitly ("section 379") are answered from the section
+    table without embedding the query at all.
+    """
+
+    def __init__(self, embeddings, backend, lexical_index: BM25Index | None = None, documents: list | None = None):
+        self.embeddings = embeddings
+        self.backend = backend
+        self.lexical_index = lexical_index
+        self.sections = {section_key(doc.metadata["section"]): doc for doc in documents or []}
+
+    def _explicit_sections(self, query: str) -> list:
+        """Documents for the sections named in the query that exist in the IPC."""
+        return [self.sections[key] for key in find_section_references(query) if key in self.sections]
+
+    def _lexical_documents(self, query: str, depth: int) -> list:
+        """Top BM25 matches for the query as documents."""
+        return [self.sections[key] for key, _ in self.lexical_index.top_k(query, depth) if key in self.sections]
+
+    def _candidates(self, queries: list[str], depth: int) -> list[list]:
+        """
+        Ranked candidate documents for each query, `depth` deep.
+
+        Args:
+            queries (list[str]): Queries in natural language.
+            depth (int): Number of candidates to return per query.
+
+        Returns:
+            list[list[Document]]: Candidates per query, best first.
+        """
+        candidates = [None] * len(queries)
+        hybrid = self.lexical_index is not None
+
+        # Exact-match fast path: named sections first, topped up lexically
+        pending = []
+        for i, query in enumerate(queries):
+            explicit = self._explicit_sections(query) if hybrid else []
+            if explicit:
+                named = {id(doc) for doc in explicit}
+                extra = [doc for doc in self._lexical_documents(query, depth) if id(doc) not in named]
+                candidates[i] = (explicit + extra)[:depth]
+            else:
+                pending.append(i)
+
+        if not pending:
+            return candidates
+
+        pending_queries = [queries[i] for i in pending]
+        dense_depth = max(depth, FUSION_CANDIDATES) if hybrid else depth
+
+        # One batched forward pass (and one search pass where supported) for every remaining query
+        if len(pending_queries) == 1:
+            vectors = [self.embeddings.embed_query(pending_queries[0])]
+        else:
+            vectors = self.embeddings.embed_documents(pending_queries)
+
+        if len(vectors) > 1 and hasattr(self.backend, "batch_similarity_search_by_vectors"):
+            dense = self.backend.batch_similarity_search_by_vectors(vectors, k=dense_depth)
+        else:
+            dense = [self.backend.similarity_search_by_vector(vector, k=dense_depth) for vector in vectors]
+
+        for i, query, dense_docs in zip(pending, pending_queries, dense):
+            if not hybrid:
+                candidates[i] = dense_docs[:depth]
+                continue
+
+            lexical_docs = self._lexical_documents(query, dense_depth)
+            by_key = {section_key(doc.metadata["section"]): doc for doc in lexical_docs + dense_docs}
+            fused = reciprocal_rank_fusion([
+                [section_key(doc.metadata["section"]) for doc in dense_docs],
+                [section_key(doc.metadata["section"]) for doc in lexical_docs],
+            ])
+            candidates[i] = [by_key[key] for key in fused[:depth]]
+
+        return candidates
+
+    def search(self, query: str, top_k: int = 3) -> list[dict]:
+        """
+        Return the `top_k` IPC sections most similar to the query.
+
+        Args:
+            query (str): User query in natural language.
+            top_k (int): Number of sections to return.
+
+        Returns:
+            list[dict]: Matching IPC sections with metadata and content.
+        """
+        docs = self._candidates([query], top_k)[0]
+        return [format_ipc_document(doc) for doc in docs]
+
+    def search_many(self, queries: list[str], top_k: int = 3) -> list[dict]:
+        """
+        Search several related queries together.
+
+        All queries that need embedding are embedded in one batched model call
+        and searched in one pass when the backend supports it. A section is reported only once,
+        under the query that ranks it highest, and each query is topped back up
+        from its next-best candidates so it still gets `top_k` distinct sections.
+
+        Args:
+            queries (list[str]): Queries in natural language.
+            top_k (int): Number of sections to return per query.
+
+        Returns:
+            list[dict]: One entry per query with its `query` and matching `sections`.
+        """
+        if not queries:
+            return []
+
+        # Fetch deep enough that every query can be topped up after deduplication
+        fetch_k = top_k * len(queries)
+        candidates = self._candidates(queries, fetch_k)
+
+        # Hand out sections rank by rank so a shared section goes to the query ranking it highest
+        seen = set()
+        sections = [[] for _ in queries]
+        for rank in range(fetch_k):
+            for i, docs in enumerate(candidates):
+                if len(sections[i]) >= top_k or rank >= len(docs):
+                    continue
+                key = section_key(docs[rank].metadata.get("section"))
+                if key in seen:
+                    continue
+                seen.add(key)
+                sections[i].append(format_ipc_document(docs[rank]))
+
+        return [
+            {"query": query, "sections": query_sections}
+            for query, query_sections in zip(queries, sections)
+        ]
+
+
+# Process-wide retriever shared by every Streamlit session and crew run
+_retriever = None
+_retriever_lock = threading.Lock()
+
+
+def create_ipc_retriever(backend: str | None = None) -> IPCRetriever:
+    """
+    Build a new retriever from the environment configuration.
+
+    Args:
+        backend (str | None): "chroma" or "numpy". Defaults to the
+            IPC_SEARCH_BACKEND environment variable, then "chroma".
+
+    Returns:
+        IPCRetriever: A freshly loaded retriever (not the shared instance).
+    """
+    load_dotenv()
+
+    backend = (backend or os.getenv("IPC_SEARCH_BACKEND") or "chroma").lower()
+    if backend not in SEARCH_BACKENDS:
+        raise ValueError(f"❌ Unknown IPC search backend '{backend}'. Use one of {SEARCH_BACKENDS}.")
+
+    embeddings = HuggingFaceEmbeddings()
+    # Repeated queries are served from the two-tier embedding cache without running the model
+    query_embeddings = cached_query_embeddings(embeddings)
+
+    # Hybrid lexical + dense retrieval is enabled when a BM25 index has been built
+    lexical_index, documents = None, None
+    bm25_index_path = os.getenv("IPC_BM25_INDEX_PATH")
+    if bm25_index_path and os.path.exists(bm25_index_path):
+        ipc_json_path = os.getenv("IPC_JSON_PATH")
+        if not ipc_json_path:
+            raise EnvironmentError("❌ 'IPC_JSON_PATH' is required for hybrid search")
+        lexical_index = BM25Index.load(bm25_index_path)
+        documents = prepare_documents(load_ipc_data(ipc_json_path))
+
+    if backend == "numpy":
+        index_dir = os.getenv("IPC_NUMPY_INDEX_PATH")
+        if not index_dir:
+            raise EnvironmentError("❌ 'IPC_NUMPY_INDEX_PATH' is not set in .env")
+        return IPCRetriever(query_embeddings, NumpyVectorIndex.load(index_dir), lexical_index, documents)
+
+    persist_dir_path = os.getenv("PERSIST_DIRECTORY_PATH")
+    if not persist_dir_path:
+        raise EnvironmentError("❌ 'PERSIST_DIRECTORY_PATH' is not set in .env")
+
+    collection_name = os.getenv("IPC_COLLECTION_NAME")
+
+    vector_db = Chroma(
+        collection_name=collection_name,
+        persist_directory=persist_dir_path,
+        embedding_function=embeddings
+    )
+    return IPCRetriever(query_embeddings, vector_db, lexical_index, documents)
+
+
+def get_ipc_retriever() -> IPCRetriever:
+    """
+    Return the shared retriever, loading it on first use.
+
+    Returns:
+        IPCRetriever: The process-wide retriever instance.
+    """
+    global _retriever
+    if _retriever is None:
+        with _retriever_lock:
+            # Another thread may have finished loading while we waited
+            if _retriever is None:
+                _retriever = create_ipc_retriever()
+    return _retriever
+
+
+def warm_ipc_retriever() -> IPCRetriever:
+    """
+    Load the shared retriever and run one throwaway query so the model
+    weights and index pages are resident before the first real request.
+
+    Returns:
+        IPCRetriever: The warmed process-wide retriever.
+    """
+    retriever = get_ipc_retriever()
+    retriever.search("theft", top_k=1)
+    return retriever
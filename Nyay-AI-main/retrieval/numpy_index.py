@@ -0,0 +1,220 @@
+# numpy_index.py
+
+import json
+import os
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+EMBEDDINGS_FILE = "embeddings.npy"
+RECORDS_FILE = "records.json"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize vectors along the last axis so dot products are cosine similarities."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _content_key(record: dict) -> str:
+    """Identity of a record for vector reuse: its text plus canonical metadata."""
+    return json.dumps([record["page_content"], record["metadata"]], sort_keys=True, ensure_ascii=False)
+
+
+class NumpyVectorIndex:
+    """
+    Exact in-memory vector index.
+
+    All document embeddings live in one contiguous float32 matrix, so a query
+    is a single matrix-vector product followed by `argpartition` for top-k.
+    For a corpus the size of the IPC this is both exact and well under a
+    millisecond per search.
+    """
+
+    def __init__(self, matrix: np.ndarray, records: list[dict]):
+        if len(matrix) != len(records):
+            raise ValueError("❌ Embedding matrix and records are out of sync.")
+        self.matrix = matrix
+        self.records = records
+
+    @classmethod
+    def from_documents(cls, documents: list[Document], embeddings, previous: "NumpyVectorIndex | None" = None) -> "NumpyVectorIndex":
+        """
+        Embed documents and build an index over them.
+
+        Args:
+            documents (list[Document]): Documents to index.
+            embeddings: LangChain embeddings used to embed the page contents.
+                Only used for documents that `previous` does not already hold.
+            previous (NumpyVectorIndex | None): Earlier build whose vectors are
+                reused for documents with identical content and metadata. It
+                must come from the same embedding model as `embeddings`.
+
+        Returns:
+            NumpyVectorIndex: Index holding normalized float32 embeddings.
+        """
+        records = [{"page_content": doc.page_content, "metadata": doc.metadata} for doc in documents]
+        if not records:
+            return cls(np.empty((0, 0), dtype=np.float32), records)
+
+        reusable = previous._rows_by_content() if previous is not None else {}
+
+        missing = [i for i, record in enumerate(records) if _content_key(record) not in reusable]
+        new_vectors = None
+        if missing:
+            vectors = embeddings.embed_documents([records[i]["page_content"] for i in missing])
+            new_vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+
+        if new_vectors is not None and reusable and new_vectors.shape[1] != previous.matrix.shape[1]:
+            raise ValueError("❌ Previous index was built with a different embedding model; rebuild without reuse.")
+
+        dim = new_vectors.shape[1] if new_vectors is not None else previous.matrix.shape[1]
+        matrix = np.empty((len(records), dim), dtype=np.float32)
+        for i, record in enumerate(records):
+            row = reusable.get(_content_key(record))
+            if row is not None:
+                matrix[i] = previous.matrix[row]
+        if missing:
+            matrix[missing] = new_vectors
+
+        return cls(matrix, records)
+
+    @staticmethod
+    def exists(index_dir: str) -> bool:
+        """Whether a saved index is present in `index_dir`."""
+        return all(os.path.exists(os.path.join(index_dir, name)) for name in (EMBEDDINGS_FILE, RECORDS_FILE))
+
+    def _rows_by_content(self) -> dict[str, int]:
+        """Map each record's content key to its row in the matrix."""
+        return {_content_key(record): row for row, record in enumerate(self.records)}
+
+    def missing_documents(self, documents: list[Document]) -> list[Document]:
+        """
+        Documents whose exact content and metadata are not in this index.
+
+        Args:
+            documents (list[Document]): Documents of the next build.
+
+        Returns:
+            list[Document]: Documents that would have to be embedded.
+        """
+        rows = self._rows_by_content()
+        return [
+            doc for doc in documents
+            if _content_key({"page_content": doc.page_content, "metadata": doc.metadata}) not in rows
+        ]
+
+    def save(self, index_dir: str):
+        """
+        Persist the index as `embeddings.npy` plus a JSON file of document records.
+
+        Each file is written next to its destination and renamed into place, so
+        a process that has the old matrix memory-mapped keeps reading intact data.
+
+        Args:
+            index_dir (str): Directory to write the index files into.
+        """
+        os.makedirs(index_dir, exist_ok=True)
+        embeddings_path = os.path.join(index_dir, EMBEDDINGS_FILE)
+        with open(f"{embeddings_path}.tmp", "wb") as file:
+            np.save(file, self.matrix)
+        os.replace(f"{embeddings_path}.tmp", embeddings_path)
+
+        records_path = os.path.join(index_dir, RECORDS_FILE)
+        with open(f"{records_path}.tmp", "w", encoding="utf-8") as file:
+            json.dump(self.records, file, ensure_ascii=False)
+        os.replace(f"{records_path}.tmp", records_path)
+
+    @classmethod
+    def load(cls, index_dir: str) -> "NumpyVectorIndex":
+        """
+        Load a saved index, memory-mapping the embedding matrix.
+
+        Args:
+            index_dir (str): Directory written by `save()`.
+
+        Returns:
+            NumpyVectorIndex: The loaded index.
+        """
+        matrix = np.load(os.path.join(index_dir, EMBEDDINGS_FILE), mmap_mode="r")
+        with open(os.path.join(index_dir, RECORDS_FILE), "r", encoding="utf-8") as file:
+            records = json.load(file)
+        return cls(matrix, records)
+
+    def top_k(self, vector, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Exact top-k search by cosine similarity.
+
+        Args:
+            vector: Query embedding.
+            k (int): Number of results to return.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Row indices and scores, best first.
+        """
+        query = _normalize(np.asarray(vector, dtype=np.float32))
+        scores = self.matrix @ query
+        k = min(k, len(scores))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return order, scores[order]
+
+    def batch_top_k(self, vectors, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Exact top-k search for several queries with one matrix-matrix product.
+
+        Args:
+            vectors: Query embeddings, one per row.
+            k (int): Number of results per query.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Row indices and scores of shape
+                (n_queries, k), best first within each row.
+        """
+        queries = _normalize(np.asarray(vectors, dtype=np.float32))
+        scores = queries @ self.matrix.T
+        k = min(k, scores.shape[1])
+        if k <= 0:
+            empty = np.empty((len(queries), 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind="stable")
+        rows = np.take_along_axis(candidates, order, axis=1)
+        return rows, np.take_along_axis(candidate_scores, order, axis=1)
+
+    def similarity_search_by_vector(self, embedding, k: int = 4) -> list[Document]:
+        """
+        Return the `k` documents closest to the embedding.
+
+        Mirrors `Chroma.similarity_search_by_vector` so either can back the retriever.
+
+        Args:
+            embedding: Query embedding.
+            k (int): Number of documents to return.
+
+        Returns:
+            list[Document]: Matching documents, most similar first.
+        """
+        rows, _ = self.top_k(embedding, k)
+        return [Document(**self.records[row]) for row in rows]
+
+    def batch_similarity_search_by_vectors(self, embeddings, k: int = 4) -> list[list[Document]]:
+        """
+        Return the `k` closest documents for each of several embeddings.
+
+        Args:
+            embeddings: Query embeddings, one per query.
+            k (int): Number of documents per query.
+
+        Returns:
+            list[list[Document]]: Matching documents per query, most similar first.
+        """
+        rows, _ = self.batch_top_k(embeddings, k)
+        return [[Document(**self.records[row]) for row in query_rows] for query_rows in rows]
@@ -0,0 +1,166 @@
+# precedent_store.py
+
+import json
+import os
+import threading
+
+import numpy as np
+from dotenv import load_dotenv
+
+from retrieval.bm25_index import BM25Index, reciprocal_rank_fusion
+from retrieval.numpy_index import NumpyVectorIndex
+
+
+MANIFEST_FILE = "manifest.json"
+BM25_FILE = "bm25.npz"
+
+# Candidates taken from each retriever before fusion
+FUSION_CANDIDATES = 20
+
+
+def format_precedent(record: dict) -> dict:
+    """
+    Shape a stored precedent like a result of the precedent search tool.
+
+    Args:
+        record (dict): Precedent metadata from the store.
+
+    Returns:
+        dict: `title`, `summary` and `link`, plus `court`, `date`, `citation` and `source`.
+    """
+    return {
+        "title": record["title"],
+        "summary": record["headnote"],
+        "link": record.get("link"),
+        "court": record.get("court"),
+        "date": record.get("date"),
+        "citation": record.get("citation"),
+        "source": "local",
+    }
+
+
+class PrecedentStore:
+    """
+    Offline precedent search over the shards written by precedent_corpus_builder.py.
+
+    Every shard is searched exactly (dense and BM25), the per-shard candidates
+    are merged globally and the two rankings are fused with reciprocal rank
+    fusion. A query whose best dense match falls below `min_similarity` is a
+    miss, so callers can fall back to a web search.
+    """
+
+    def __init__(self, shards: list[tuple[NumpyVectorIndex, BM25Index]], embeddings, min_similarity: float = 0.45):
+        self.shards = shards
+        self.embeddings = embeddings
+        self.min_similarity = min_similarity
+        self._records = {
+            record["metadata"]["id"]: record["metadata"]
+            for vectors, _ in shards
+            for record in vectors.records
+        }
+
+    @classmethod
+    def load(cls, store_path: str, embeddings, min_similarity: float = 0.45) -> "PrecedentStore":
+        """
+        Load every shard listed in the store's manifest.
+
+        Args:
+            store_path (str): Directory written by `build_precedent_store()`.
+            embeddings: Query embeddings; must match the model the store was built with.
+            min_similarity (float): Cosine similarity below which a query is a miss.
+
+        Returns:
+            PrecedentStore: The loaded store.
+        """
+        with open(os.path.join(store_path, MANIFEST_FILE), "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+        shards = []
+        for shard in manifest["shards"]:
+            shard_dir = os.path.join(store_path, shard["name"])
+            shards.append((NumpyVectorIndex.load(shard_dir), BM25Index.load(os.path.join(shard_dir, BM25_FILE))))
+        return cls(shards, embeddings, min_similarity)
+
+    @staticmethod
+    def exists(store_path: str) -> bool:
+        """Whether a built store is present at `store_path`."""
+        return os.path.exists(os.path.join(store_path, MANIFEST_FILE))
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def search(self, query: str, top_k: int = 5) -> list[dict]:
+        """
+        Find the precedents most relevant to a legal issue.
+
+        Args:
+            query (str): Legal issue or case summary.
+            top_k (int): Number of precedents to return.
+
+        Returns:
+            list[dict]: Results of `format_precedent()`, best first; empty on a miss.
+        """
+        if not self._records:
+            return []
+
+        vector = self.embeddings.embed_query(query)
+        dense_ids, dense_scores, lexical_hits = [], [], []
+        for vectors, lexical in self.shards:
+            rows, scores = vectors.top_k(vector, FUSION_CANDIDATES)
+            dense_ids.extend(vectors.records[row]["metadata"]["id"] for row in rows)
+            dense_scores.extend(scores.tolist())
+            lexical_hits.extend(lexical.top_k(query, FUSION_CANDIDATES))
+
+        if not dense_scores or max(dense_scores) < self.min_similarity:
+            return []
+
+        order = np.argsort(-np.asarray(dense_scores), kind="stable")[:FUSION_CANDIDATES]
+        dense_ranking = [dense_ids[i] for i in order]
+        lexical_ranking = [key for key, score in sorted(lexical_hits, key=lambda hit: -hit[1])[:FUSION_CANDIDATES] if score > 0]
+
+        fused = reciprocal_rank_fusion([dense_ranking, lexical_ranking])
+        return [format_precedent(self._records[key]) for key in fused[:top_k]]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_precedent_store() -> PrecedentStore | None:
+    """
+    Return the shared precedent store, or None when none has been built.
+
+    The store is read from PRECEDENT_STORE_PATH; PRECEDENT_MIN_SIMILARITY
+    (default 0.45) sets the miss threshold. Query embeddings are shared with
+    the IPC retriever when the store uses the default model.
+
+    Returns:
+        PrecedentStore | None: The process-wide store.
+    """
+    global _store
+    load_dotenv()
+
+    store_path = os.getenv("PRECEDENT_STORE_PATH")
+    if not store_path or not PrecedentStore.exists(store_path):
+        return None
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                with open(os.path.join(store_path, MANIFEST_FILE), "r", encoding="utf-8") as file:
+                    model_name = json.load(file).get("model")
+                if model_name:
+                    from langchain_huggingface import HuggingFaceEmbeddings
+
+                    from cache.embedding_cache import cached_query_embeddings
+
+                    embeddings = cached_query_embeddings(HuggingFaceEmbeddings(model_name=model_name))
+                else:
+                    from retrieval.ipc_retriever import get_ipc_retriever
+
+                    embeddings = get_ipc_retriever().embeddings
+                _store = PrecedentStore.load(
+                    store_path,
+                    embeddings,
+                    min_similarity=float(os.getenv("PRECEDENT_MIN_SIMILARITY", "0.45")),
+                )
+    return _store
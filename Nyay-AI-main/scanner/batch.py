@@ -0,0 +1,261 @@
+# batch.py
+#
+# Headless bulk scanning for the Document Scanner: walk a folder of
+# contracts, extract and analyze them on bounded worker pools, and append
+# one JSON line per document to a results file that doubles as the
+# checkpoint, so an interrupted overnight run resumes where it stopped.
+# PDF and text reports are written next to the results.
+
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from groq import Groq
+
+from scanner.extraction import DOCX_MIME, PDF_MIME, TXT_MIME, iter_document_chunks
+from scanner.report import render_pdf_report, render_text_report
+from scanner.risk_analyzer import MODEL, analyze_document, create_groq_client
+
+
+MIME_TYPES = {".pdf": PDF_MIME, ".docx": DOCX_MIME, ".txt": TXT_MIME}
+RESULTS_FILE = "results.jsonl"
+SUMMARY_FILE = "summary.json"
+REPORTS_DIR = "reports"
+
+
+def iter_documents(root: str) -> Iterator[str]:
+    """
+    Supported documents under a folder, recursively, in a stable order.
+
+    Args:
+        root (str): Folder to scan.
+
+    Yields:
+        str: Paths relative to `root`.
+    """
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in MIME_TYPES:
+                yield os.path.relpath(os.path.join(directory, name), root)
+
+
+def document_fingerprint(path: str) -> dict:
+    """Size and modification time, so an edited document is scanned again."""
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+class BatchCheckpoint:
+    """
+    Append-only JSONL of scanned documents that doubles as the resume point.
+
+    A document counts as done when a successful line with the same path and
+    fingerprint exists. Failed documents are retried on the next run.
+    Lines are flushed and fsynced as they are written, so at most the
+    documents in flight are lost when a run is killed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.done: dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A run killed mid-write leaves a partial last line
+                        continue
+                    if record.get("status") == "ok":
+                        self.done[record["path"]] = record["fingerprint"]
+                    else:
+                        self.done.pop(record.get("path"), None)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def is_done(self, relative_path: str, fingerprint: dict) -> bool:
+        """Whether a document was already scanned successfully in its current form."""
+        return self.done.get(relative_path) == fingerprint
+
+    def write(self, record: dict):
+        """Append one document's record and make it durable."""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            if record["status"] == "ok":
+                self.done[record["path"]] = record["fingerprint"]
+
+    def close(self):
+        """Close the results file."""
+        self._file.close()
+
+
+def scan_document(root: str, relative_path: str, client: Groq, chunk_workers: int, model: str, use_cache: bool) -> dict:
+    """
+    Extract and analyze one document.
+
+    Args:
+        root (str): Folder being scanned.
+        relative_path (str): Document path relative to `root`.
+        client (Groq): Chat completion client shared by all documents.
+        chunk_workers (int): Concurrent LLM requests for this document.
+        model (str): Groq model name.
+        use_cache (bool): Use the persistent clause verdict cache.
+
+    Returns:
+        dict: The document's results record (status "ok" or "failed").
+    """
+    path = os.path.join(root, relative_path)
+    record = {"path": relative_path, "fingerprint": document_fingerprint(path)}
+    start = time.perf_counter()
+    try:
+        chunks = iter_document_chunks(path, MIME_TYPES[os.path.splitext(path)[1].lower()])
+        report = analyze_document(chunks, client=client, workers=chunk_workers, model=model, use_cache=use_cache)
+    except Exception as error:
+        record.update(status="failed", error=str(error) or type(error).__name__)
+    else:
+        record.update(status="ok", **{key: value for key, value in report.items() if key != "seconds"})
+    record.update(seconds=round(time.perf_counter() - start, 3), analyzed_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    return record
+
+
+def _pdf_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool for PDF report rendering."""
+    # Spawn rather than fork: this process already runs worker threads
+    return ProcessPoolExecutor(max_workers=max(1, workers), mp_context=multiprocessing.get_context("spawn"))
+
+
+def _write_reports(output_dir: str, record: dict, pdf_pool: ProcessPoolExecutor | None) -> Future | None:
+    """Write the text report now and the PDF report (possibly in the pool); returns the pending PDF render."""
+    # Keep the source extension so contract.pdf and contract.docx do not collide
+    base = os.path.join(output_dir, REPORTS_DIR, f"{record['path']}.risk")
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    name = os.path.basename(record["path"])
+    with open(f"{base}.txt", "w", encoding="utf-8") as file:
+        file.write(render_text_report(record["results"], name, record["analyzed_at"]))
+    if pdf_pool is None:
+        return None
+
+    future = pdf_pool.submit(render_pdf_report, record["results"], name, record["analyzed_at"])
+
+    def save(done: Future):
+        if done.exception() is None:
+            with open(f"{base}.pdf", "wb") as file:
+                file.write(done.result())
+
+    future.add_done_callback(save)
+    return future
+
+
+def scan_directory(
+    root: str,
+    output_dir: str,
+    document_workers: int = 4,
+    chunk_workers: int = 4,
+    pdf_workers: int = 1,
+    write_pdf: bool = True,
+    model: str = MODEL,
+    use_cache: bool = True,
+    limit: int | None = None,
+    on_document: Callable[[dict, dict], None] | None = None,
+) -> dict:
+    """
+    Scan every supported document under a folder, resuming an earlier run.
+
+    Up to `document_workers` documents are extracted and analyzed at once,
+    each with up to `chunk_workers` concurrent LLM requests, so at most
+    document_workers x chunk_workers requests are in flight. PDF reports are
+    rendered in a pool of `pdf_workers` processes; if a renderer process
+    dies, the PDFs it took down count as `pdf_failures` and the pool is
+    restarted for the remaining documents.
+
+    Args:
+        root (str): Folder of PDF, DOCX and TXT documents.
+        output_dir (str): Receives results.jsonl, summary.json and reports/.
+        document_workers (int): Documents processed concurrently.
+        chunk_workers (int): Concurrent LLM requests per document.
+        pdf_workers (int): PDF rendering processes.
+        write_pdf (bool): Render a PDF report per document.
+        model (str): Groq model name.
+        use_cache (bool): Use the persistent clause verdict cache.
+        limit (int | None): Scan at most this many new documents.
+        on_document (Callable[[dict, dict], None] | None): Called with each
+            document's record and the running totals.
+
+    Returns:
+        dict: Totals: `documents`, `skipped`, `failed`, `clauses`, `tokens`,
+            `cached_clauses`, `pdf_failures`, `seconds` and `documents_per_minute`.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint = BatchCheckpoint(os.path.join(output_dir, RESULTS_FILE))
+    client = create_groq_client()
+    totals = {"documents": 0, "skipped": 0, "failed": 0, "clauses": 0, "tokens": 0, "cached_clauses": 0}
+
+    pending_paths = []
+    for relative_path in iter_documents(root):
+        if checkpoint.is_done(relative_path, document_fingerprint(os.path.join(root, relative_path))):
+            totals["skipped"] += 1
+        elif limit is None or len(pending_paths) < limit:
+            pending_paths.append(relative_path)
+
+    start = time.perf_counter()
+    pdf_pool = _pdf_pool(pdf_workers) if write_pdf else None
+    pdf_renders = []
+    documents = ThreadPoolExecutor(max_workers=max(1, document_workers), thread_name_prefix="scan-document")
+    try:
+        paths = iter(pending_paths)
+        running = set()
+        while True:
+            # Submit lazily so an interrupt leaves nothing queued behind the documents in flight
+            while len(running) < max(1, document_workers):
+                relative_path = next(paths, None)
+                if relative_path is None:
+                    break
+                running.add(documents.submit(scan_document, root, relative_path, client, chunk_workers, model, use_cache))
+            if not running:
+                break
+
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                record = future.result()
+                if record["status"] == "ok":
+                    try:
+                        pdf_renders.append(_write_reports(output_dir, record, pdf_pool))
+                    except BrokenProcessPool as error:
+                        # A renderer that died takes the whole pool with it; later documents get a fresh one
+                        pdf_pool.shutdown(wait=False)
+                        pdf_pool = _pdf_pool(pdf_workers)
+                        failed_render = Future()
+                        failed_render.set_exception(error)
+                        pdf_renders.append(failed_render)
+                    totals["documents"] += 1
+                    totals["clauses"] += record["clauses"]
+                    totals["tokens"] += record["tokens"]
+                    totals["cached_clauses"] += record["cached_clauses"]
+                else:
+                    totals["failed"] += 1
+                checkpoint.write(record)
+                if on_document:
+                    on_document(record, totals)
+    finally:
+        documents.shutdown(wait=True, cancel_futures=True)
+        if pdf_pool is not None:
+            pdf_pool.shutdown(wait=True)
+        checkpoint.close()
+
+    totals["pdf_failures"] = sum(1 for render in pdf_renders if render is not None and render.exception() is not None)
+    totals["seconds"] = round(time.perf_counter() - start, 3)
+    processed = totals["documents"] + totals["failed"]
+    totals["documents_per_minute"] = round(processed / totals["seconds"] * 60, 2) if totals["seconds"] else 0.0
+    with open(os.path.join(output_dir, SUMMARY_FILE), "w", encoding="utf-8") as file:
+        json.dump(totals, file, indent=2)
+    return totals
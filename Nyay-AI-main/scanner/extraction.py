@@ -0,0 +1,220 @@
+# extraction.py
+#
+# Streaming text extraction for Document Scanner uploads. Every format is
+# exposed as a generator of page (PDF) or paragraph (DOCX, TXT) chunks, so
+# callers can start analyzing before the last page is read and join the
+# text once instead of growing a string page by page. Large PDFs are
+# extracted page-parallel in a pool of worker processes.
+
+import io
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO
+
+import docx
+import PyPDF2
+
+
+PDF_MIME = "application/pdf"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+TXT_MIME = "text/plain"
+
+# Below this many pages starting worker processes costs more than it saves
+PARALLEL_MIN_PAGES = 24
+MIN_PAGES_PER_TASK = 16
+TEXT_BLOCK_LINES = 200
+# Characters of text shown in the upload preview
+PREVIEW_CHARS = 2000
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _extract_page_range(pdf_path: str, start: int, stop: int) -> list[str]:
+    """Extract pages [start, stop) of a PDF on disk. Runs inside a worker process."""
+    reader = PyPDF2.PdfReader(pdf_path)
+    return [(reader.pages[number].extract_text() or "") for number in range(start, stop)]
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Shared extraction pool of `workers` processes, started on first use and kept for later uploads.
+
+    Asking for a different size replaces the pool; extractions already
+    submitted to the old one still finish.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # Spawn rather than fork: the Streamlit server process is multi-threaded
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def iter_pdf_pages(source: BinaryIO | str, workers: int | None = None) -> Iterator[str]:
+    """
+    Yield the text of each PDF page in order.
+
+    Small PDFs are extracted in-process. Larger ones are spooled to a
+    temporary file (never held twice in memory) and extracted in page ranges
+    by worker processes, yielding each range as soon as it and every earlier
+    range are done.
+
+    Args:
+        source (BinaryIO | str): Uploaded file object or path to the PDF.
+        workers (int | None): Extraction processes; defaults to
+            SCANNER_EXTRACT_WORKERS, then CPU count - 1.
+
+    Yields:
+        str: Text of one page ("" for pages without a text layer).
+    """
+    workers = workers or int(os.getenv("SCANNER_EXTRACT_WORKERS", "0")) or max(1, (os.cpu_count() or 2) - 1)
+
+    owns_file = not isinstance(source, str)
+    if owns_file:
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as spool:
+            shutil.copyfileobj(source, spool)
+        pdf_path = spool.name
+    else:
+        pdf_path = source
+
+    try:
+        reader = PyPDF2.PdfReader(pdf_path)
+        page_count = len(reader.pages)
+        if workers == 1 or page_count < PARALLEL_MIN_PAGES:
+            for page in reader.pages:
+                yield page.extract_text() or ""
+            return
+
+        # Every task re-parses the PDF structure, so hand out a few large ranges per worker
+        pages_per_task = max(MIN_PAGES_PER_TASK, -(-page_count // (workers * 4)))
+        starts = range(0, page_count, pages_per_task)
+        pool = _get_pool(workers)
+        # map() keeps submission order, so pages come back in document order
+        for pages in pool.map(
+            _extract_page_range,
+            [pdf_path] * len(starts),
+            starts,
+            [min(start + pages_per_task, page_count) for start in starts],
+        ):
+            yield from pages
+    finally:
+        if owns_file:
+            os.remove(pdf_path)
+
+
+def iter_docx_paragraphs(source: BinaryIO | str) -> Iterator[str]:
+    """
+    Yield the text of each DOCX paragraph in order.
+
+    Args:
+        source (BinaryIO | str): Uploaded file object or path to the document.
+
+    Yields:
+        str: Paragraph text; empty paragraphs are kept as clause separators.
+    """
+    for paragraph in docx.Document(source).paragraphs:
+        yield paragraph.text
+
+
+def iter_txt_blocks(source: BinaryIO | str, encoding: str = "utf-8") -> Iterator[str]:
+    """
+    Yield a plain-text file in blocks of lines, decoding as it reads.
+
+    Args:
+        source (BinaryIO | str): Uploaded file object or path to the file.
+        encoding (str): Text encoding; undecodable bytes are replaced.
+
+    Yields:
+        str: Blocks of up to TEXT_BLOCK_LINES lines, without trailing newline.
+    """
+    stream = open(source, "rb") if isinstance(source, str) else source
+    text = io.TextIOWrapper(stream, encoding=encoding, errors="replace")
+    try:
+        block = []
+        for line in text:
+            block.append(line.rstrip("\n"))
+            if len(block) == TEXT_BLOCK_LINES:
+                yield "\n".join(block)
+                block = []
+        if block:
+            yield "\n".join(block)
+    finally:
+        # Leave a caller's upload object open
+        text.detach()
+        if isinstance(source, str):
+            stream.close()
+
+
+def iter_document_chunks(source: BinaryIO | str, mime_type: str, workers: int | None = None) -> Iterator[str]:
+    """
+    Stream the text of an uploaded PDF, DOCX or TXT file.
+
+    Args:
+        source (BinaryIO | str): Uploaded file object (e.g. Streamlit's UploadedFile) or path.
+        mime_type (str): MIME type of the upload.
+        workers (int | None): PDF extraction processes, see `iter_pdf_pages()`.
+
+    Yields:
+        str: Page or paragraph chunks in document order.
+    """
+    if mime_type == PDF_MIME:
+        return iter_pdf_pages(source, workers)
+    if mime_type == DOCX_MIME:
+        return iter_docx_paragraphs(source)
+    if mime_type == TXT_MIME:
+        return iter_txt_blocks(source)
+    raise ValueError(f"❌ Unsupported document type '{mime_type}'. Upload a PDF, DOCX or TXT file.")
+
+
+def read_preview(source: BinaryIO | str, mime_type: str, max_chars: int = PREVIEW_CHARS) -> tuple[list[str], bool]:
+    """
+    Read chunks from the start of a document until there is enough text to preview.
+
+    PDFs are read in-process, so only the first pages are ever extracted.
+    A document with no text is read to the end, which is how an empty
+    (e.g. image-only) upload is recognized before any analysis starts.
+
+    Args:
+        source (BinaryIO | str): Uploaded file object or path.
+        mime_type (str): MIME type of the upload.
+        max_chars (int): Characters of text (ignoring surrounding whitespace) to collect.
+
+    Returns:
+        tuple[list[str], bool]: The chunks read and whether they are the whole document.
+    """
+    chunks, size = [], 0
+    stream = iter_document_chunks(source, mime_type, workers=1)
+    try:
+        for chunk in stream:
+            chunks.append(chunk)
+            size += len(chunk.strip())
+            if size >= max_chars:
+                return chunks, False
+        return chunks, True
+    finally:
+        stream.close()
+
+
+def extract_text(source: BinaryIO | str, mime_type: str, workers: int | None = None) -> str:
+    """
+    Extract the full text of a document with a single join.
+
+    Args:
+        source (BinaryIO | str): Uploaded file object or path.
+        mime_type (str): MIME type of the upload.
+        workers (int | None): PDF extraction processes.
+
+    Returns:
+        str: Chunks joined by newlines.
+    """
+    return "\n".join(iter_document_chunks(source, mime_type, workers))
@@ -0,0 +1,100 @@
+# json_stream.py
+#
+# Incremental, tolerant extraction of JSON objects from streamed LLM output.
+# The model is asked for a JSON array of verdicts, but responses arrive
+# token by token, may be wrapped in ```json fences or prose, and may be cut
+# off by the token limit. Rather than parsing the whole response at the end,
+# the parser emits every top-level object the moment its closing brace
+# arrives, and reports whether the response ended inside an object.
+
+import json
+import re
+
+
+TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def _decode_object(text: str) -> dict | None:
+    """Decode one object, repairing trailing commas; None if it is still not valid JSON."""
+    for candidate in (text, TRAILING_COMMA.sub(r"\1", text)):
+        try:
+            value = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        return value if isinstance(value, dict) else None
+    return None
+
+
+class JSONObjectStream:
+    """
+    Push parser yielding each complete top-level JSON object in a text stream.
+
+    Anything outside objects (fences, array brackets, commas, prose) is
+    skipped, so "[{...}, {...}]", fenced output and bare objects all work.
+    Objects that fail to decode even after repair are counted in `malformed`
+    and skipped, without affecting the objects around them.
+
+    Example:
+        stream = JSONObjectStream()
+        for delta in completion_stream:
+            for verdict in stream.feed(delta):
+                ...
+        if stream.truncated:
+            ...  # the response stopped inside an object
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.objects = 0
+        self.malformed = 0
+
+    @property
+    def truncated(self) -> bool:
+        """Whether the text so far ends inside an unfinished object."""
+        return self._depth > 0
+
+    def feed(self, text: str) -> list[dict]:
+        """
+        Consume the next piece of the response.
+
+        Args:
+            text (str): Newly received text.
+
+        Returns:
+            list[dict]: Objects completed by this piece, in order.
+        """
+        completed = []
+        for char in text:
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._buffer = [char]
+                continue
+
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    value = _decode_object("".join(self._buffer))
+                    self._buffer = []
+                    if value is None:
+                        self.malformed += 1
+                    else:
+                        self.objects += 1
+                        completed.append(value)
+        return completed
+
@@ -0,0 +1,307 @@
+# report.py
+#
+# PDF and text reports for Document Scanner results. Paragraph and table
+# styles are built once per process, rendered PDFs are memoized by a hash
+# of their content so Streamlit reruns never re-render an identical report,
+# and many reports can be rendered at once in a pool of worker processes.
+
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+
+RISK_SECTIONS = (
+    ("HIGH", "🔴 HIGH RISK ITEMS"),
+    ("MODERATE", "🟡 MODERATE RISK ITEMS"),
+    ("SAFE", "🟢 SAFE ITEMS"),
+)
+
+_styles = None
+_styles_lock = threading.Lock()
+
+_pdf_cache: OrderedDict[str, bytes] = OrderedDict()
+_pdf_cache_lock = threading.Lock()
+
+
+def _risk_style(name: str, parent: ParagraphStyle, background: str, border: str) -> ParagraphStyle:
+    """Highlighted clause style of one risk level."""
+    return ParagraphStyle(
+        name,
+        parent=parent,
+        fontSize=10,
+        leading=14,
+        backColor=colors.HexColor(background),
+        borderColor=colors.HexColor(border),
+        borderWidth=1,
+        borderPadding=8,
+        spaceAfter=10,
+    )
+
+
+def get_report_styles() -> dict:
+    """
+    Return the report's paragraph and table styles, built on first use.
+
+    ReportLab only reads styles while building a document, so one set is
+    shared by every report in the process.
+
+    Returns:
+        dict: Paragraph styles by role (`title`, `subtitle`, `heading`,
+            `explanation`, and `HIGH`/`MODERATE`/`SAFE` clause styles) plus
+            the `info_table` and `summary_table` TableStyles.
+    """
+    global _styles
+    if _styles is None:
+        with _styles_lock:
+            if _styles is None:
+                sample = getSampleStyleSheet()
+                _styles = {
+                    "title": ParagraphStyle(
+                        "CustomTitle",
+                        parent=sample["Heading1"],
+                        fontSize=24,
+                        textColor=colors.HexColor("#1a1a1a"),
+                        spaceAfter=30,
+                        alignment=TA_CENTER,
+                    ),
+                    "subtitle": sample["Heading2"],
+                    "heading": ParagraphStyle(
+                        "CustomHeading",
+                        parent=sample["Heading2"],
+                        fontSize=16,
+                        textColor=colors.HexColor("#2c3e50"),
+                        spaceAfter=12,
+                        spaceBefore=12,
+                    ),
+                    "SAFE": _risk_style("Safe", sample["Normal"], "#d4edda", "#28a745"),
+                    "MODERATE": _risk_style("Moderate", sample["Normal"], "#fff3cd", "#ffc107"),
+                    "HIGH": _risk_style("High", sample["Normal"], "#f8d7da", "#dc3545"),
+                    "explanation": ParagraphStyle(
+                        "Explanation",
+                        parent=sample["Normal"],
+                        fontSize=9,
+                        textColor=colors.HexColor("#555555"),
+                        leftIndent=20,
+                        spaceAfter=15,
+                    ),
+                    "info_table": TableStyle([
+                        ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#f0f0f0")),
+                        ("TEXTCOLOR", (0, 0), (-1, -1), colors.black),
+                        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+                        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+                        ("FONTSIZE", (0, 0), (-1, -1), 10),
+                        ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+                        ("TOPPADDING", (0, 0), (-1, -1), 8),
+                        ("GRID", (0, 0), (-1, -1), 1, colors.grey),
+                    ]),
+                    "summary_table": TableStyle([
+                        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2c3e50")),
+                        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                        ("FONTSIZE", (0, 0), (-1, 0), 12),
+                        ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+                        ("BACKGROUND", (0, 1), (-1, 1), colors.HexColor("#d4edda")),
+                        ("BACKGROUND", (0, 2), (-1, 2), colors.HexColor("#fff3cd")),
+                        ("BACKGROUND", (0, 3), (-1, 3), colors.HexColor("#f8d7da")),
+                        ("GRID", (0, 0), (-1, -1), 1, colors.grey),
+                        ("FONTSIZE", (0, 1), (-1, -1), 10),
+                        ("TOPPADDING", (0, 1), (-1, -1), 8),
+                        ("BOTTOMPADDING", (0, 1), (-1, -1), 8),
+                    ]),
+                }
+    return _styles
+
+
+def risk_counts(analysis_results: list[dict]) -> dict[str, int]:
+    """Number of clauses per risk level."""
+    counts = {level: 0 for level, _ in RISK_SECTIONS}
+    for item in analysis_results:
+        if item["risk"] in counts:
+            counts[item["risk"]] += 1
+    return counts
+
+
+def report_key(analysis_results: list[dict], doc_name: str, analysis_date: str) -> str:
+    """
+    Content hash identifying a report.
+
+    Args:
+        analysis_results (list[dict]): Verdicts from `analyze_document()`.
+        doc_name (str): Document name shown in the report.
+        analysis_date (str): Analysis date shown in the report.
+
+    Returns:
+        str: SHA-256 hex digest.
+    """
+    payload = json.dumps([doc_name, analysis_date, analysis_results], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def render_pdf_report(analysis_results: list[dict], doc_name: str, analysis_date: str | None = None) -> bytes:
+    """
+    Render the color-coded PDF report.
+
+    Args:
+        analysis_results (list[dict]): Verdicts with `line`, `risk` and `explanation`.
+        doc_name (str): Document name shown in the report.
+        analysis_date (str | None): Date shown in the report; defaults to now.
+
+    Returns:
+        bytes: The PDF file.
+    """
+    styles = get_report_styles()
+    analysis_date = analysis_date or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+
+    elements = [
+        Paragraph("⚖️ NYAY AI", styles["title"]),
+        Paragraph("Legal Document Risk Analysis Report", styles["subtitle"]),
+        Spacer(1, 0.3 * inch),
+    ]
+
+    info_table = Table(
+        [["Document:", doc_name], ["Analysis Date:", analysis_date], ["Total Clauses:", str(len(analysis_results))]],
+        colWidths=[2 * inch, 4 * inch],
+    )
+    info_table.setStyle(styles["info_table"])
+    elements += [info_table, Spacer(1, 0.3 * inch)]
+
+    counts = risk_counts(analysis_results)
+    total = len(analysis_results) or 1
+    summary_table = Table(
+        [
+            ["Risk Level", "Count", "Percentage"],
+            ["🟢 Safe", str(counts["SAFE"]), f"{counts['SAFE'] / total * 100:.1f}%"],
+            ["🟡 Moderate Risk", str(counts["MODERATE"]), f"{counts['MODERATE'] / total * 100:.1f}%"],
+            ["🔴 High Risk", str(counts["HIGH"]), f"{counts['HIGH'] / total * 100:.1f}%"],
+        ],
+        colWidths=[2.5 * inch, 1.5 * inch, 1.5 * inch],
+    )
+    summary_table.setStyle(styles["summary_table"])
+    elements += [summary_table, Spacer(1, 0.4 * inch)]
+
+    elements += [Paragraph("DETAILED FINDINGS", styles["heading"]), Spacer(1, 0.2 * inch)]
+    for risk_level, risk_name in RISK_SECTIONS:
+        filtered = [item for item in analysis_results if item["risk"] == risk_level]
+        if not filtered:
+            continue
+        elements += [Paragraph(f"{risk_name} ({len(filtered)})", styles["heading"]), Spacer(1, 0.1 * inch)]
+        for idx, item in enumerate(filtered, 1):
+            # Model output is plain text; unescaped "<" or "&" would break ReportLab's markup
+            elements.append(Paragraph(f"<b>{idx}.</b> {escape(item['line'])}", styles[risk_level]))
+            elements.append(Paragraph(f"<i>💡 Analysis:</i> {escape(item['explanation'])}", styles["explanation"]))
+        elements.append(Spacer(1, 0.2 * inch))
+
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def get_pdf_report(analysis_results: list[dict], doc_name: str, analysis_date: str) -> bytes:
+    """
+    Return the PDF report, rendering it only if an identical one is not memoized.
+
+    Up to PDF_REPORT_CACHE_SIZE (default 8) reports are kept per process,
+    least recently used first out.
+
+    Args:
+        analysis_results (list[dict]): Verdicts from `analyze_document()`.
+        doc_name (str): Document name shown in the report.
+        analysis_date (str): Analysis date shown in the report.
+
+    Returns:
+        bytes: The PDF file.
+    """
+    key = report_key(analysis_results, doc_name, analysis_date)
+    with _pdf_cache_lock:
+        if key in _pdf_cache:
+            _pdf_cache.move_to_end(key)
+            return _pdf_cache[key]
+
+    pdf = render_pdf_report(analysis_results, doc_name, analysis_date)
+    with _pdf_cache_lock:
+        _pdf_cache[key] = pdf
+        while len(_pdf_cache) > int(os.getenv("PDF_REPORT_CACHE_SIZE", "8")):
+            _pdf_cache.popitem(last=False)
+    return pdf
+
+
+def render_text_report(analysis_results: list[dict], doc_name: str, analysis_date: str | None = None) -> str:
+    """
+    Render the plain-text report.
+
+    Args:
+        analysis_results (list[dict]): Verdicts with `line`, `risk` and `explanation`.
+        doc_name (str): Document name shown in the report.
+        analysis_date (str | None): Date shown in the report; defaults to now.
+
+    Returns:
+        str: The report text.
+    """
+    analysis_date = analysis_date or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    counts = risk_counts(analysis_results)
+    parts = [f"""NYAY AI - Legal Document Risk Analysis Report
+Document: {doc_name}
+Analysis Date: {analysis_date}
+
+SUMMARY
+========
+Total Clauses Analyzed: {len(analysis_results)}
+Safe: {counts['SAFE']}
+Moderate Risk: {counts['MODERATE']}
+High Risk: {counts['HIGH']}
+
+DETAILED FINDINGS
+=================
+
+"""]
+    for risk_level, _ in RISK_SECTIONS:
+        filtered = [item for item in analysis_results if item["risk"] == risk_level]
+        if filtered:
+            parts.append(f"\n{risk_level} RISK ITEMS ({len(filtered)})\n{'-' * 50}\n\n")
+            for idx, item in enumerate(filtered, 1):
+                parts.append(f"{idx}. {item['line']}\n   Analysis: {item['explanation']}\n\n")
+    return "".join(parts)
+
+
+def _render_job(job: tuple) -> bytes:
+    """Render one (analysis_results, doc_name, analysis_date) job. Runs inside a worker process."""
+    return render_pdf_report(*job)
+
+
+def render_pdf_reports(jobs: list[tuple[list[dict], str, str | None]], workers: int | None = None) -> list[bytes]:
+    """
+    Render many PDF reports in parallel worker processes.
+
+    Each worker builds the styles once and reuses them for every report it
+    renders. With one worker (or one job) everything runs in-process.
+
+    Args:
+        jobs (list[tuple[list[dict], str, str | None]]): (analysis_results, doc_name, analysis_date) per report.
+        workers (int | None): Worker processes; defaults to CPU count.
+
+    Returns:
+        list[bytes]: PDFs in job order.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        return [_render_job(job) for job in jobs]
+
+    # Spawn rather than fork: callers such as the Streamlit server are multi-threaded
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return list(pool.map(_render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
@@ -0,0 +1,469 @@
+# risk_analyzer.py
+#
+# Map-reduce legal risk analysis for the Document Scanner. The document is
+# split into clauses, the clauses are numbered and packed into overlapping
+# chunks, the chunks are analyzed concurrently on a bounded thread pool
+# through the shared LLM gateway (budgets, rate-limit-aware retries), and
+# the per-clause verdicts are merged back into document order. Responses are streamed and parsed verdict by
+# verdict, so a truncated response only costs a re-request of its tail.
+
+import hashlib
+import queue
+import re
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import httpx
+from groq import APIError, Groq
+
+from cache.clause_risk_cache import get_clause_risk_cache, normalize_clause
+from gateway.llm_gateway import estimate_tokens, get_llm_gateway
+from scanner.json_stream import JSONObjectStream
+
+
+MODEL = "llama-3.3-70b-versatile"
+RISK_LEVELS = ("SAFE", "MODERATE", "HIGH")
+
+SYSTEM_PROMPT = "You are a legal expert who analyzes documents for legal risks. Always respond with valid JSON."
+
+PROMPT_TEMPLATE = """You are a legal expert analyzing a document for potential legal risks.
+
+Below is an excerpt of a larger document, split into numbered clauses like [12]. Classify each significant clause into one of three risk categories:
+
+🟢 SAFE - No legal risks detected, standard language
+🟡 MODERATE - Needs review, ambiguous terms, or minor concerns
+🔴 HIGH RISK - Serious legal issues, unfavorable terms, or problematic clauses
+
+For each clause you classify, provide:
+1. The clause number from the brackets
+2. The line/clause text (keep it concise, max 100 chars)
+3. Risk level (SAFE, MODERATE, or HIGH)
+4. Brief explanation (1-2 sentences)
+
+Format your response as a JSON array like this:
+[
+  {{"id": 1, "line": "clause text", "risk": "SAFE", "explanation": "why"}},
+  {{"id": 2, "line": "clause text", "risk": "MODERATE", "explanation": "why"}},
+  {{"id": 3, "line": "clause text", "risk": "HIGH", "explanation": "why"}}
+]
+
+Only analyze substantive legal clauses. Skip headers, page numbers, and formatting elements.
+
+DOCUMENT EXCERPT TO ANALYZE:
+{clauses}"""
+
+# Starts of numbered clauses: "1.", "12.3", "(a)", "(iv)", "Clause 5", "Section 7", "Article II"
+CLAUSE_START = re.compile(
+    r"^\s*(?:\d+(?:\.\d+)*[.)]?\s|\([a-z0-9]{1,4}\)\s|(?:clause|section|article)\s+[\dIVXLC]+\b)",
+    re.IGNORECASE,
+)
+SENTENCE_END = re.compile(r"(?<=[.;:])\s+(?=[A-Z(\"'])")
+
+
+def _bound_clause(clause: str, max_clause_chars: int) -> Iterator[str]:
+    """Split an over-long clause at sentence boundaries, cutting hard only inside a single huge sentence."""
+    if len(clause) <= max_clause_chars:
+        yield clause
+        return
+    piece = ""
+    for sentence in SENTENCE_END.split(clause):
+        if piece and len(piece) + len(sentence) + 1 > max_clause_chars:
+            yield piece
+            piece = ""
+        piece = f"{piece} {sentence}".strip()
+        while len(piece) > max_clause_chars:
+            yield piece[:max_clause_chars]
+            piece = piece[max_clause_chars:]
+    if piece:
+        yield piece
+
+
+def iter_clauses(lines: Iterable[str], max_clause_chars: int = 1500) -> Iterator[str]:
+    """
+    Stream clauses out of document lines.
+
+    A new clause starts at a blank line or at a numbered heading such as
+    "4.2", "(b)" or "Clause 7". Clauses longer than `max_clause_chars` are
+    split further at sentence boundaries.
+
+    Args:
+        lines (Iterable[str]): Document lines, e.g. from extracted pages.
+        max_clause_chars (int): Soft upper bound on clause length.
+
+    Yields:
+        str: Clauses in document order, whitespace-collapsed.
+    """
+    current = []
+    for line in lines:
+        if not line.strip() or CLAUSE_START.match(line):
+            clause = " ".join(" ".join(current).split())
+            current.clear()
+            if clause:
+                yield from _bound_clause(clause, max_clause_chars)
+        if line.strip():
+            current.append(line.strip())
+    clause = " ".join(" ".join(current).split())
+    if clause:
+        yield from _bound_clause(clause, max_clause_chars)
+
+
+def iter_chunks(
+    clauses: Iterable[tuple[int, str]], max_chars: int = 6000, overlap: int = 1
+) -> Iterator[list[tuple[int, str]]]:
+    """
+    Pack numbered clauses into chunks of at most `max_chars`, overlapping by `overlap` clauses.
+
+    The overlap gives the model the context of the preceding clause; the
+    duplicate verdicts it produces are removed by `merge_results()`.
+
+    Args:
+        clauses (Iterable[tuple[int, str]]): (clause id, clause text) pairs in document order.
+        max_chars (int): Character budget of the clause text per chunk.
+        overlap (int): Clauses repeated from the end of the previous chunk.
+
+    Yields:
+        list[tuple[int, str]]: A chunk of (clause id, clause text).
+    """
+    current, size, fresh = [], 0, 0
+    for clause_id, clause in clauses:
+        # Only close a chunk that holds new clauses, never one made of overlap alone
+        if fresh and size + len(clause) > max_chars:
+            yield current
+            current = current[-overlap:] if overlap else []
+            size = sum(len(text) for _, text in current)
+            fresh = 0
+        current.append((clause_id, clause))
+        size += len(clause)
+        fresh += 1
+    if fresh:
+        yield current
+
+
+def prompt_version(model: str = MODEL) -> str:
+    """Fingerprint of the prompts and model; cached clause verdicts are only reused under the same one."""
+    return hashlib.sha256(f"{model}\n{SYSTEM_PROMPT}\n{PROMPT_TEMPLATE}".encode("utf-8")).hexdigest()[:16]
+
+
+def format_chunk(chunk: list[tuple[int, str]]) -> str:
+    """Render a chunk as the numbered clause list sent to the model."""
+    return "\n\n".join(f"[{clause_id}] {text}" for clause_id, text in chunk)
+
+
+def create_groq_client() -> Groq:
+    """
+    Groq client for the scanner: the LLM gateway's shared client on its pooled connections.
+
+    Configured from OPENAI_API_KEY and the optional GROQ_BASE_URL. The client's
+    own retries are disabled; the gateway retries with backoff instead.
+
+    Returns:
+        Groq: The client.
+    """
+    return get_llm_gateway().groq_client()
+
+
+def _stream_verdicts(
+    client: Groq,
+    chunk: list[tuple[int, str]],
+    model: str,
+    max_tokens: int,
+    max_retries: int,
+    base_delay: float,
+    on_verdict: Callable[[dict], None] | None,
+) -> tuple[list[dict], int, bool]:
+    """
+    One streamed request: verdicts as parsed, tokens used and whether the response was cut short.
+
+    The request goes through the LLM gateway, which holds a "scanner"
+    concurrency slot while the stream is read and retries a failed start
+    (429s, server errors, timeouts) with backoff, never sooner than Retry-After.
+    """
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": PROMPT_TEMPLATE.format(clauses=format_chunk(chunk))},
+    ]
+    parser = JSONObjectStream()
+    verdicts, tokens, finish_reason = [], 0, None
+    with get_llm_gateway().request("scanner", estimate_tokens(messages, max_tokens)) as request:
+        stream = request.send(
+            client.chat.completions.create,
+            model=model,
+            messages=messages,
+            temperature=0.3,
+            max_tokens=max_tokens,
+            stream=True,
+            max_retries=max_retries,
+            base_delay=base_delay,
+        )
+        try:
+            for event in stream:
+                usage = getattr(getattr(event, "x_groq", None), "usage", None) or getattr(event, "usage", None)
+                if usage is not None:
+                    tokens = usage.total_tokens or tokens
+                if not event.choices:
+                    continue
+                choice = event.choices[0]
+                finish_reason = choice.finish_reason or finish_reason
+                for verdict in parser.feed(choice.delta.content or ""):
+                    verdicts.append(verdict)
+                    if on_verdict:
+                        on_verdict(verdict)
+        except (APIError, httpx.HTTPError):
+            # A dropped stream is handled like a truncated one: keep what arrived
+            finish_reason = None
+        request.record_usage(tokens)
+    if parser.malformed and not verdicts:
+        raise ValueError("❌ The AI response did not contain valid JSON verdicts.")
+    # No finish_reason means the stream ended before its final event
+    return verdicts, tokens, finish_reason in (None, "length") or parser.truncated
+
+
+def analyze_chunk(
+    client: Groq,
+    chunk: list[tuple[int, str]],
+    model: str = MODEL,
+    max_retries: int = 5,
+    base_delay: float = 1.0,
+    max_tokens: int = 4000,
+    max_continuations: int = 3,
+    on_verdict: Callable[[dict], None] | None = None,
+) -> tuple[list[dict], int, list[int]]:
+    """
+    Classify the clauses of one chunk from a streamed completion.
+
+    Verdicts are parsed as each JSON object closes. If the response is cut
+    off (token limit, dropped connection), only the clauses after the last
+    classified one are sent again, up to `max_continuations` times.
+
+    Args:
+        client (Groq): Chat completion client.
+        chunk (list[tuple[int, str]]): Numbered clauses from `iter_chunks()`.
+        model (str): Groq model name.
+        max_retries (int): Retries of a failed request before giving up.
+        base_delay (float): First backoff delay in seconds.
+        max_tokens (int): Completion token budget per request.
+        max_continuations (int): Follow-up requests for a truncated tail.
+        on_verdict (Callable[[dict], None] | None): Called with each verdict as it is parsed.
+
+    Returns:
+        tuple[list[dict], int, list[int]]: Verdicts with `id`, `line`, `risk`
+            and `explanation`; total tokens used; ids of clauses left
+            unanalyzed because the tail could not be recovered.
+    """
+    verdicts, tokens = [], 0
+    pending = chunk
+    for _ in range(max_continuations + 1):
+        received, used, truncated = _stream_verdicts(
+            client, pending, model, max_tokens, max_retries, base_delay, on_verdict
+        )
+        verdicts.extend(received)
+        tokens += used
+        if not truncated:
+            return verdicts, tokens, []
+
+        # The model answers in clause order, so everything after the last id it reached is missing
+        pending_ids = {clause_id for clause_id, _ in pending}
+        reached = [item.get("id") for item in received if isinstance(item, dict) and item.get("id") in pending_ids]
+        if reached:
+            pending = [(clause_id, text) for clause_id, text in pending if clause_id > max(reached)]
+        if not pending:
+            return verdicts, tokens, []
+
+    if not verdicts:
+        raise ValueError("❌ The AI response was cut off before any clause was classified.")
+    return verdicts, tokens, [clause_id for clause_id, _ in pending]
+
+
+def merge_results(chunk_results: list[list[dict]], clauses: list[str]) -> list[dict]:
+    """
+    Merge per-chunk verdicts into one list in document order.
+
+    Clauses analyzed twice because of chunk overlap keep their most severe
+    verdict. Verdicts without a usable clause id are de-duplicated by text.
+
+    Args:
+        chunk_results (list[list[dict]]): Verdicts of each chunk.
+        clauses (list[str]): All clauses, so ids can be validated.
+
+    Returns:
+        list[dict]: `line`, `risk`, `explanation` and `id` per analyzed clause.
+    """
+    by_id, by_text = {}, {}
+    for results in chunk_results:
+        for item in results:
+            if not isinstance(item, dict):
+                continue
+            risk = str(item.get("risk", "")).upper()
+            if risk not in RISK_LEVELS:
+                continue
+            verdict = {
+                "id": item.get("id"),
+                "line": str(item.get("line", "")),
+                "risk": risk,
+                "explanation": str(item.get("explanation", "")),
+            }
+
+            clause_id = verdict["id"]
+            if isinstance(clause_id, int) and 1 <= clause_id <= len(clauses):
+                target, key = by_id, clause_id
+            else:
+                verdict["id"] = None
+                target, key = by_text, " ".join(verdict["line"].lower().split())
+
+            previous = target.get(key)
+            if previous is None or RISK_LEVELS.index(risk) > RISK_LEVELS.index(previous["risk"]):
+                target[key] = verdict
+
+    return [by_id[key] for key in sorted(by_id)] + list(by_text.values())
+
+
+def analyze_document(
+    text: str | Iterable[str],
+    client: Groq | None = None,
+    workers: int = 4,
+    max_chunk_chars: int = 6000,
+    overlap: int = 1,
+    model: str = MODEL,
+    use_cache: bool = True,
+    on_progress: Callable[[int, int], None] | None = None,
+    on_verdict: Callable[[dict], None] | None = None,
+) -> dict:
+    """
+    Analyze a whole document for legal risks.
+
+    Chunks are submitted as soon as they are filled, so when `text` is a
+    generator of extracted pages the first requests are in flight while later
+    pages are still being extracted. Reading pauses while twice as many
+    chunks as workers are waiting, so extraction never races far ahead of
+    the model and progress is reported throughout. Clauses with a verdict in the clause
+    cache, and repeats of a clause earlier in the same document, are never
+    sent to the model. Verdicts are streamed: `on_verdict` sees each one as
+    soon as the model finishes it, on the calling thread, so a UI can show
+    results while later chunks are still being analyzed.
+
+    Args:
+        text (str | Iterable[str]): Extracted document text, or its page/paragraph chunks.
+        client (Groq | None): Chat completion client; defaults to `create_groq_client()`.
+        workers (int): Chunks analyzed concurrently.
+        max_chunk_chars (int): Clause text per request.
+        overlap (int): Clauses shared between neighbouring chunks.
+        model (str): Groq model name.
+        use_cache (bool): Read and update the persistent clause verdict cache.
+        on_progress (Callable[[int, int], None] | None): Called as (chunks done, total chunks).
+        on_verdict (Callable[[dict], None] | None): Called with each raw verdict
+            (`id`, `risk`, ...) as it arrives, cached ones included.
+
+    Returns:
+        dict: `results` (merged verdicts), `clauses` and `chunks` counts,
+            `cached_clauses` and `duplicate_clauses` that needed no request,
+            `tokens` used, `failed_chunks` (index and error of chunks that
+            could not be analyzed), `unanalyzed_clauses` (ids lost to a
+            truncated response that could not be recovered) and `seconds`.
+    """
+    start = time.perf_counter()
+    client = client or create_groq_client()
+    cache = get_clause_risk_cache(prompt_version(model)) if use_cache else None
+    lines = text.splitlines() if isinstance(text, str) else (line for part in text for line in part.splitlines())
+
+    clauses = []
+    cached_verdicts = []
+    cached_count = 0
+    first_seen: dict[str, int] = {}
+    duplicates: dict[int, int] = {}
+    # Workers hand verdicts over here; callbacks run on the caller's thread
+    arrivals: queue.SimpleQueue = queue.SimpleQueue()
+
+    def unseen(clause_stream: Iterable[str]) -> Iterator[tuple[int, str]]:
+        """Number clauses, answer known ones from the cache and pass on the rest."""
+        nonlocal cached_count
+        for clause_id, clause in enumerate(clause_stream, 1):
+            clauses.append(clause)
+            known = cache.get(clause) if cache is not None else None
+            if known is not None:
+                cached_count += 1
+                if known["risk"] is not None:
+                    cached_verdicts.append({**known, "id": clause_id})
+                    arrivals.put(cached_verdicts[-1])
+                continue
+            # Boilerplate repeated within the document is analyzed once
+            normalized = normalize_clause(clause)
+            if normalized in first_seen:
+                duplicates[clause_id] = first_seen[normalized]
+                continue
+            first_seen[normalized] = clause_id
+            yield clause_id, clause
+
+    failed = []
+    tokens = 0
+    unanalyzed: set[int] = set()
+    chunks = {}
+    chunk_results: dict[int, list[dict]] = {}
+    analyzed = []
+    pending = set()
+
+    def deliver():
+        while not arrivals.empty():
+            verdict = arrivals.get()
+            if on_verdict:
+                on_verdict(verdict)
+
+    def collect(timeout: float):
+        """Wait up to `timeout` for running chunks, then report verdicts and finished chunks."""
+        nonlocal pending, tokens
+        finished, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        deliver()
+        for future in finished:
+            index, chunk = chunks[future]
+            try:
+                chunk_results[index], used, missing = future.result()
+                tokens += used
+                unanalyzed.update(missing)
+                analyzed.append((chunk, set(missing)))
+            except Exception as error:
+                # One bad chunk must not discard the verdicts of all the others
+                failed.append({"chunk": index, "error": str(error) or type(error).__name__})
+            # The total grows while the document is still being read
+            if on_progress:
+                on_progress(len(chunks) - len(pending), len(chunks))
+
+    max_workers = max(1, workers)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="risk-chunk") as pool:
+        for index, chunk in enumerate(iter_chunks(unseen(iter_clauses(lines)), max_chars=max_chunk_chars, overlap=overlap)):
+            future = pool.submit(analyze_chunk, client, chunk, model, on_verdict=arrivals.put)
+            chunks[future] = index, chunk
+            pending.add(future)
+            # Report progress between submissions, and stop reading ahead while every worker is busy
+            collect(timeout=0)
+            while len(pending) >= 2 * max_workers:
+                collect(timeout=0.1)
+        while pending:
+            collect(timeout=0.1)
+        deliver()
+
+    results = merge_results([chunk_results.get(index, []) for index in range(len(chunks))] + [cached_verdicts], clauses)
+    by_id = {item["id"]: item for item in results if item["id"] is not None}
+
+    if cache is not None:
+        for chunk, missing in analyzed:
+            for clause_id, clause in chunk:
+                # A clause cut off by truncation was never judged, so it must not be remembered as skipped
+                if clause_id in missing and clause_id not in by_id:
+                    continue
+                cache.put(clause, by_id.get(clause_id))
+
+    for clause_id, original_id in duplicates.items():
+        if original_id in by_id:
+            by_id[clause_id] = {**by_id[original_id], "id": clause_id}
+
+    return {
+        "results": [by_id[key] for key in sorted(by_id)] + [item for item in results if item["id"] is None],
+        "clauses": len(clauses),
+        "chunks": len(chunks),
+        "cached_clauses": cached_count,
+        "duplicate_clauses": len(duplicates),
+        "tokens": tokens,
+        "failed_chunks": sorted(failed, key=lambda item: item["chunk"]),
+        "unanalyzed_clauses": sorted(unanalyzed - set(by_id)),
+        "seconds": time.perf_counter() - start,
+    }
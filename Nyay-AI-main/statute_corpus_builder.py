@@ -0,0 +1,419 @@
+# statute_corpus_builder.py
+#
+# Streaming build pipeline for statute corpora larger than the IPC (BNS,
+# CrPC/BNSS, Evidence Act, state amendments, ...). Source files are read
+# lazily, embedded in batches across a pool of CPU worker processes and
+# upserted into the Chroma collection chunk by chunk. Progress is
+# checkpointed so an interrupted build resumes where it stopped.
+#
+# Example:
+#   python statute_corpus_builder.py bns=data/bns.jsonl bnss=data/bnss.json --batch-size 64 --workers 4
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import chromadb
+from dotenv import load_dotenv
+
+
+JSON_READ_SIZE = 1 << 20
+# Whitespace and the separating comma between JSON array elements
+JSON_SEPARATOR = re.compile(r"\s*,?\s*")
+# Text that could still be part of a number cut off at the read boundary ("12." of "12.5")
+NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+
+# Field names accepted for each part of a statute section, in order of preference
+SECTION_FIELDS = ("Section", "section", "section_number")
+TITLE_FIELDS = ("section_title", "title")
+TEXT_FIELDS = ("section_desc", "description", "text", "content")
+
+
+def iter_json_array(file_path: str) -> Iterator[dict]:
+    """
+    Yield the elements of a top-level JSON array one at a time.
+
+    Only one read buffer and the element being decoded are held in memory,
+    so arbitrarily large exports can be streamed.
+
+    Args:
+        file_path (str): Path to a file containing a JSON array.
+
+    Yields:
+        dict: Each array element.
+    """
+    decoder = json.JSONDecoder()
+    with open(file_path, "r", encoding="utf-8") as file:
+        buffer = file.read(JSON_READ_SIZE).lstrip()
+        if not buffer.startswith("["):
+            raise ValueError(f"❌ '{file_path}' does not contain a JSON array.")
+        # Decode in place from an offset; the buffer is only compacted when more text is read
+        position = 1
+        eof = False
+
+        def read_more() -> bool:
+            nonlocal buffer, position, eof
+            chunk = file.read(JSON_READ_SIZE)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            return bool(chunk)
+
+        while True:
+            position = JSON_SEPARATOR.match(buffer, position).end()
+            if buffer.startswith("]", position):
+                return
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The element straddles the read boundary; pull in more text
+                if eof:
+                    raise
+                read_more()
+                continue
+            if not eof and NUMBER_TAIL.fullmatch(buffer, end) and read_more():
+                # A scalar may continue past the read boundary; decode it again with more text
+                continue
+            yield element
+            position = end
+
+
+def iter_jsonl(file_path: str) -> Iterator[dict]:
+    """
+    Yield one record per non-empty line of a JSONL file.
+
+    Args:
+        file_path (str): Path to the JSONL file.
+
+    Yields:
+        dict: Each decoded line.
+    """
+    with open(file_path, "r", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_records(file_path: str) -> Iterator[dict]:
+    """
+    Lazily read statute records from a JSON array or JSONL file.
+
+    Args:
+        file_path (str): Path ending in `.json` or `.jsonl`.
+
+    Yields:
+        dict: Each statute section record.
+    """
+    if file_path.endswith(".jsonl"):
+        return iter_jsonl(file_path)
+    return iter_json_array(file_path)
+
+
+def _first_field(record: dict, fields: tuple[str, ...], default=None):
+    """Return the value of the first of `fields` present in the record."""
+    for field in fields:
+        if record.get(field) not in (None, ""):
+            return record[field]
+    return default
+
+
+def record_to_document(record: dict, act: str, occurrence: int = 1) -> dict:
+    """
+    Convert a statute record into the id/text/metadata triple stored in Chroma.
+
+    Uses the same text layout as `prepare_documents()` in ipc_vectordb_builder.py,
+    and the same "<act>-<section>" IDs, so the IPC can be built either way.
+    Later records repeating a section number in the same act, such as state
+    amendments, get "<act>-<section>-<occurrence>" IDs instead.
+
+    Args:
+        record (dict): Source record with a section number, title and text.
+        act (str): Short name of the act, e.g. "ipc", "bns" or "bnss".
+        occurrence (int): How many records of this act so far, this one
+            included, carried the same section number.
+
+    Returns:
+        dict: `id`, `text` and `metadata` for the section.
+    """
+    section = _first_field(record, SECTION_FIELDS)
+    if section is None:
+        raise ValueError(f"❌ Record without a section number in '{act}': {record}")
+    title = _first_field(record, TITLE_FIELDS, "")
+    text = _first_field(record, TEXT_FIELDS, "")
+
+    metadata = {
+        "act": act,
+        "chapter": record.get("chapter"),
+        "chapter_title": record.get("chapter_title"),
+        "section": section,
+        "section_title": title,
+        "occurrence": occurrence if occurrence > 1 else None,
+    }
+    return {
+        "id": f"{act}-{section}" if occurrence == 1 else f"{act}-{section}-{occurrence}",
+        "text": f"Section {section}: {title}\n\n{text}",
+        # Chroma rejects None metadata values
+        "metadata": {key: value for key, value in metadata.items() if value is not None},
+    }
+
+
+def iter_batches(sources: list[tuple[str, str]], batch_size: int) -> Iterator[list[dict]]:
+    """
+    Stream documents from every source, grouped into fixed-size batches.
+
+    Batch numbering and document IDs are deterministic for a given source
+    list and batch size, which is what makes checkpoint-based resume possible.
+    Repeated section numbers are reported as they are found.
+
+    Args:
+        sources (list[tuple[str, str]]): (act, file path) pairs.
+        batch_size (int): Documents per batch.
+
+    Yields:
+        list[dict]: Batches of documents from `record_to_document()`.
+    """
+    batch = []
+    # Occurrences of each section number per act, so repeats get distinct IDs
+    occurrences: dict[tuple[str, str], int] = {}
+    for act, file_path in sources:
+        for record in iter_records(file_path):
+            section = str(_first_field(record, SECTION_FIELDS, "")).strip()
+            occurrence = occurrences[act, section] = occurrences.get((act, section), 0) + 1
+            if occurrence > 1:
+                print(f"⚠️ Section {section} appears {occurrence} times in '{act}'; indexing it as {act}-{section}-{occurrence}")
+            batch.append(record_to_document(record, act, occurrence))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+class BuildCheckpoint:
+    """
+    Record of finished batches, persisted after every write.
+
+    Stored compactly as a watermark (every batch below it is done) plus the
+    few batches that finished out of order above it.
+    """
+
+    def __init__(self, path: str, signature: dict, fresh: bool = False):
+        self.path = path
+        self.signature = signature
+        self.watermark = 0
+        self.done_above = set()
+
+        if fresh:
+            self.clear()
+        elif os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                state = json.load(file)
+            # A checkpoint from a different source list or batch size cannot be trusted
+            if state.get("signature") == signature:
+                self.watermark = state["watermark"]
+                self.done_above = set(state["done_above"])
+
+    def is_done(self, batch_index: int) -> bool:
+        """Whether the batch was written by an earlier run."""
+        return batch_index < self.watermark or batch_index in self.done_above
+
+    def mark_done(self, batch_index: int):
+        """Record a written batch and persist the checkpoint."""
+        self.done_above.add(batch_index)
+        while self.watermark in self.done_above:
+            self.done_above.remove(self.watermark)
+            self.watermark += 1
+        self._save()
+
+    def _save(self):
+        """Atomically write the checkpoint file."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"signature": self.signature, "watermark": self.watermark, "done_above": sorted(self.done_above)},
+                file,
+            )
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Delete the checkpoint file, e.g. once a build has completed."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# Embedding model loaded once per worker process
+_worker_embeddings = None
+
+
+def _init_worker(model_name: str | None, torch_threads: int):
+    """Process-pool initializer: load the embedding model once per worker."""
+    global _worker_embeddings
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    _worker_embeddings = HuggingFaceEmbeddings(model_name=model_name) if model_name else HuggingFaceEmbeddings()
+
+
+def _embed_batch(batch_index: int, texts: list[str]) -> tuple[int, list[list[float]]]:
+    """Embed one batch inside a worker process."""
+    return batch_index, _worker_embeddings.embed_documents(texts)
+
+
+def print_progress(done: int, skipped: int, elapsed: float):
+    """Default progress reporter."""
+    rate = done / elapsed if elapsed else 0.0
+    print(f"⏳ {done} embedded, {skipped} skipped (already built) - {rate:.1f} docs/s", flush=True)
+
+
+def build_statute_vectordb(
+    sources: list[tuple[str, str]],
+    persist_dir_path: str,
+    collection_name: str,
+    batch_size: int = 64,
+    workers: int | None = None,
+    model_name: str | None = None,
+    checkpoint_path: str | None = None,
+    fresh: bool = False,
+    on_progress: Callable[[int, int, float], None] | None = print_progress,
+) -> dict:
+    """
+    Stream, embed and upsert statute sections into a Chroma collection.
+
+    At most two batches per worker are in flight at any time, so memory use
+    stays flat regardless of corpus size. Upserts are keyed by section ID and
+    therefore idempotent: re-processing a batch after a crash is harmless.
+
+    Args:
+        sources (list[tuple[str, str]]): (act, file path) pairs to index.
+        persist_dir_path (str): Chroma persistence directory.
+        collection_name (str): Target collection.
+        batch_size (int): Documents per embedding call and per upsert.
+        workers (int | None): Embedding processes; defaults to CPU count - 1.
+        model_name (str | None): HuggingFace model; defaults to the library default.
+        checkpoint_path (str | None): Resume file; defaults to one next to the collection.
+        fresh (bool): Ignore any existing checkpoint and start over.
+        on_progress (Callable | None): Called as (embedded, skipped, elapsed_seconds).
+
+    Returns:
+        dict: `embedded`, `skipped`, `seconds` and `docs_per_second` for the run.
+    """
+    workers = workers or max(1, (os.cpu_count() or 2) - 1)
+    checkpoint_path = checkpoint_path or os.path.join(persist_dir_path, f"{collection_name}_build_checkpoint.json")
+
+    os.makedirs(persist_dir_path, exist_ok=True)
+    checkpoint = BuildCheckpoint(
+        checkpoint_path,
+        signature={"sources": [list(source) for source in sources], "batch_size": batch_size, "model": model_name},
+        fresh=fresh,
+    )
+
+    collection = chromadb.PersistentClient(path=persist_dir_path).get_or_create_collection(collection_name)
+
+    embedded = skipped = 0
+    start = time.perf_counter()
+    pending = {}
+    max_in_flight = workers * 2
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    def drain(block_until: int):
+        """Write finished batches until fewer than `block_until` remain in flight."""
+        nonlocal embedded
+        while len(pending) >= block_until and pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                batch = pending.pop(future)
+                batch_index, vectors = future.result()
+                collection.upsert(
+                    ids=[doc["id"] for doc in batch],
+                    embeddings=vectors,
+                    documents=[doc["text"] for doc in batch],
+                    metadatas=[doc["metadata"] for doc in batch],
+                )
+                checkpoint.mark_done(batch_index)
+                embedded += len(batch)
+                if on_progress:
+                    on_progress(embedded, skipped, time.perf_counter() - start)
+
+    # Spawn rather than fork so worker processes never inherit a half-initialised torch runtime
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(model_name, torch_threads),
+    ) as pool:
+        for batch_index, batch in enumerate(iter_batches(sources, batch_size)):
+            if checkpoint.is_done(batch_index):
+                skipped += len(batch)
+                continue
+            future = pool.submit(_embed_batch, batch_index, [doc["text"] for doc in batch])
+            pending[future] = batch
+            drain(max_in_flight)
+        drain(1)
+
+    # A completed build needs no resume state
+    checkpoint.clear()
+
+    seconds = time.perf_counter() - start
+    return {
+        "embedded": embedded,
+        "skipped": skipped,
+        "seconds": seconds,
+        "docs_per_second": embedded / seconds if seconds else 0.0,
+    }
+
+
+def parse_source(value: str) -> tuple[str, str]:
+    """Parse an `act=path` command-line argument."""
+    act, sep, file_path = value.partition("=")
+    if not sep or not act or not file_path:
+        raise argparse.ArgumentTypeError(f"expected ACT=PATH, got '{value}'")
+    return act.lower(), file_path
+
+
+def main(argv: Iterable[str] | None = None):
+    """Command-line entry point."""
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Build a Chroma collection from statute JSON/JSONL files.")
+    parser.add_argument("sources", nargs="+", type=parse_source, help="ACT=PATH, e.g. bns=data/bns.jsonl")
+    parser.add_argument("--persist-dir", default=os.getenv("PERSIST_DIRECTORY_PATH"))
+    parser.add_argument("--collection", default=os.getenv("STATUTE_COLLECTION_NAME"))
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--model", default=None, help="HuggingFace embedding model name")
+    parser.add_argument("--checkpoint", default=None)
+    parser.add_argument("--fresh", action="store_true", help="ignore any saved checkpoint")
+    args = parser.parse_args(argv)
+
+    if not args.persist_dir or not args.collection:
+        raise EnvironmentError("❌ Set --persist-dir/--collection or PERSIST_DIRECTORY_PATH/STATUTE_COLLECTION_NAME.")
+
+    stats = build_statute_vectordb(
+        args.sources,
+        args.persist_dir,
+        args.collection,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        model_name=args.model,
+        checkpoint_path=args.checkpoint,
+        fresh=args.fresh,
+    )
+    print(
+        f"✅ Collection '{args.collection}' built: {stats['embedded']} embedded, "
+        f"{stats['skipped']} resumed, {stats['docs_per_second']:.1f} docs/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ from crewai import Task
 from agents.case_intake_agent import case_intake_agent
 
 case_intake_task = Task(
+    name="case_intake",
     agent=case_intake_agent,
     description=(
         "The user has submitted the following legal querry.\n\n"
@@ -3,12 +3,14 @@ from agents.ipc_section_agent import ipc_section_agent
 from tasks.case_intake_task import case_intake_task
 
 ipc_section_task = Task(
+    name="ipc_section",
     agent=ipc_section_agent,
     context=[case_intake_task],
     description=(
         "You are provided with the structured legal context generated from the previous task.\n\n"
         "Your job is to identify and retrieve the most relevant sections from the Indian Penal Code (IPC) "
-        "that apply to this legal issue. Use your tool to search and extract the top 3 most relevant IPC sections.\n\n"
+        "that apply to this legal issue. Use your tool to search and extract the top 3 most relevant IPC sections.\n"
+        "If the issue involves several distinct offences, search for all of them together in a single batch search.\n\n"
         "Return the results in clean JSON format with the following fields:\n"
         "- `section`\n"
         "- `section_title`\n"
@@ -8,6 +8,7 @@ from tasks.ipc_section_task import ipc_section_task
 from tasks.legal_precedent_task import legal_precedent_task
 
 legal_drafter_task = Task(
+    name="legal_drafter",
     agent=legal_drafter_agent,
     description=(
         "Based on the legal case summary, IPC sections, and precedents retrieved form the previous tasks, draft a formal legal document (e.g., FIR or legal notice) "
@@ -3,9 +3,9 @@
 from crewai import Task
 from agents.legal_precedent_agent import legal_precedent_agent
 from tasks.case_intake_task import case_intake_task
-from tasks.ipc_section_task import ipc_section_task
 
 legal_precedent_task = Task(
+    name="legal_precedent",
     agent=legal_precedent_agent,
     description=(
         "You are provided with a brief legal summary of the issue. Based on this, search for relevant Indian legal precedents.\n\n"
@@ -17,5 +17,6 @@ legal_precedent_task = Task(
     expected_output=(
         "A detailed paragraph summarizing the most relevant precedent cases and explaining their legal relevance to the current issue."
     ),
-    context=[case_intake_task, ipc_section_task]
+    # Only the intake summary is needed, so this can run alongside the IPC section task
+    context=[case_intake_task]
 )
\ No newline at end of file
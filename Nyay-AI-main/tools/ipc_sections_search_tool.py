@@ -1,11 +1,8 @@
 # ipc_sections_search_tool.py
 
-import os
-
-from dotenv import load_dotenv
 from crewai.tools import tool
-from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
+
+from retrieval.ipc_retriever import get_ipc_retriever
 
 
 @tool("IPC Sections Search Tool")
@@ -19,42 +16,27 @@ def search_ipc_sections(query: str) -> list[dict]:
     Returns:
         list[dict]: List of matching IPC sections with metadata and content.
     """
-    # Load environment variables
-    load_dotenv()
-
-    # Resolve vector DB path
-    persist_dir = os.getenv("PERSIST_DIRECTORY_PATH")
-    if not persist_dir:
-        raise EnvironmentError("❌ 'PERSIST_DIRECTORY_PATH' is not set in .env")
+    top_k = 3 # can be passed as an argument for flexibility
 
-    persist_dir_path = os.getenv("PERSIST_DIRECTORY_PATH")
-    collection_name = os.getenv("IPC_COLLECTION_NAME")
+    # The embedding model and vectorstore are loaded once per process and shared
+    return get_ipc_retriever().search(query, top_k=top_k)
 
-    embedding_function = HuggingFaceEmbeddings()
 
-    # Load vectorstore
-    vector_db = Chroma(
-        collection_name=collection_name,
-        persist_directory=persist_dir_path,
-        embedding_function=embedding_function
-    )
+@tool("IPC Sections Batch Search Tool")
+def search_ipc_sections_batch(queries: list[str]) -> list[dict]:
+    """
+    Search IPC vector database for several related legal issues in one call.
+    Use this when a case involves more than one offence, e.g. ["theft", "trespass", "criminal intimidation"].
 
-    top_k = 3 # can be passed as an argument for flexibility
+    Args:
+        queries (list[str]): Separate legal issues in natural language.
 
-    # Perform similarity search
-    docs = vector_db.similarity_search(query, k=top_k)
+    Returns:
+        list[dict]: One entry per query with its matching IPC sections. A section is listed only once across all queries.
+    """
+    top_k = 3
 
-    # Format results
-    return [
-        {
-            "section": doc.metadata.get("section"),
-            "section_title": doc.metadata.get("section_title"),
-            "chapter": doc.metadata.get("chapter"),
-            "chapter_title": doc.metadata.get("chapter_title"),
-            "content": doc.page_content
-        }
-        for doc in docs
-    ]
+    return get_ipc_retriever().search_many(queries, top_k=top_k)
 
 
 # Example usage of the IPC Section Search Tool - uncomment for testing the tool functionality
@@ -62,5 +44,3 @@ def search_ipc_sections(query: str) -> list[dict]:
 # results = search_ipc_sections.func(query)
 # for r in results:
 #     print(r)
-
-# NOTE: Retrieval is a bit slower. Can be improved by caching the vectordb and using GPU for embedding. 
\ No newline at end of file
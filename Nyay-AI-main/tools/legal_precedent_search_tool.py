@@ -5,6 +5,10 @@ from dotenv import load_dotenv
 from crewai.tools import tool
 from tavily import TavilyClient
 
+from cache.precedent_search_cache import get_precedent_search_cache
+from quota.rate_limiter import get_rate_limiter
+from retrieval.precedent_store import get_precedent_store
+
 load_dotenv()
 
 # 🔧 Trusted Indian legal domains — you can add more here anytime
@@ -17,18 +21,8 @@ def _is_legal_source(url: str) -> bool:
     return any(domain in url for domain in LEGAL_SOURCES)
 
 
-@tool("Legal Precedent Search Tool")
-def search_legal_precedents(query: str) -> list[dict]:
-    """
-    Use Tavily Search to find precedent legal cases for a given legal issue.
-    sample tool input: "Home trespassing and theft - precedent cases in India"
-
-    Args:
-        query (str): The structured legal issue or case summary.
-
-    Returns:
-        list[dict]: Relevant case titles, summaries, and links from trusted Indian legal sources.
-    """
+def _search_tavily(query: str) -> list[dict]:
+    """Live Tavily search restricted to the trusted legal domains."""
     api_key = os.getenv("TAVILY_API_KEY")
     if not api_key:
         raise ValueError("❌ 'TAVILY_API_KEY' not found in .env file")
@@ -38,13 +32,18 @@ def search_legal_precedents(query: str) -> list[dict]:
     # 🔍 Restrict search to only trusted legal domains
     search_query = f"site:{' OR site:'.join(LEGAL_SOURCES)} {query}"
 
+    # ⏳ Shared Tavily quota across every concurrent crew in the process
+    limiter = get_rate_limiter("tavily")
+    if limiter is not None:
+        limiter.acquire()
+
     response = client.search(
         query=search_query,
         max_results=10
     )
 
     raw_results = response.get("results", [])
-    legal_results = [
+    return [
         {
             "title": item.get("title"),
             "summary": item.get("content"),
@@ -54,6 +53,34 @@ def search_legal_precedents(query: str) -> list[dict]:
         if _is_legal_source(item.get("url", ""))
     ]
 
+
+@tool("Legal Precedent Search Tool")
+def search_legal_precedents(query: str) -> list[dict]:
+    """
+    Find precedent legal cases for a given legal issue.
+    Searches the local precedent store first and falls back to Tavily Search on a miss.
+    sample tool input: "Home trespassing and theft - precedent cases in India"
+
+    Args:
+        query (str): The structured legal issue or case summary.
+
+    Returns:
+        list[dict]: Relevant case titles, summaries, and links from trusted Indian legal sources.
+    """
+    # 📚 Offline lookup: no network round-trip when the local corpus covers the issue
+    store = get_precedent_store()
+    if store is not None:
+        local_results = store.search(query, top_k=int(os.getenv("PRECEDENT_TOP_K", "5")))
+        if local_results:
+            return local_results
+
+    # 🌐 Web fallback, cached and coalesced across concurrent sessions
+    cache = get_precedent_search_cache()
+    if cache is not None:
+        legal_results = cache.get_or_fetch(query, LEGAL_SOURCES, _search_tavily)
+    else:
+        legal_results = _search_tavily(query)
+
     return legal_results if legal_results else [{
         "title": "No relevant legal precedents found",
         "summary": "No matching results found from trusted Indian legal sources.",